@@ -2,8 +2,7 @@
 import os
 import datetime
 
-from flask import Flask, send_from_directory
-from whitenoise import WhiteNoise
+from flask import Flask, jsonify, abort
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 
@@ -11,6 +10,7 @@ from flask_cors import CORS
 from backend.extensions import db, security, api, migrate,cache
 from backend.config import LocalDevelopmentConfig, ProductionConfig
 from backend.security import user_datastore
+from backend.static_assets import spa_shell_response
 
 
 
@@ -20,10 +20,11 @@ def createApp():
     """
     app = Flask(
         __name__,
-        static_folder='frontend',      # serves static files from frontend/
-        template_folder='frontend',
-        static_url_path=''             # keep as you had it so root serves index.html
+        static_folder=None,            # no Flask static route: WhiteNoise serves frontend/ (backend/static_assets.py)
+        template_folder='frontend'
     )
+    # Still the frontend root for uploads and the asset build; without the route, SPA paths reach serve_vue_app
+    app.static_folder = 'frontend'
 
     # Choose config
     if os.environ.get('FLASK_ENV') == 'production':
@@ -39,17 +40,42 @@ def createApp():
     else:
         app.config.from_object(LocalDevelopmentConfig)
 
+    # Queued logging plus per-endpoint latency/DB/cache metrics (GET /api/admin/metrics).
+    # First, so its before_request hook runs ahead of Flask-Security's user loading
+    from backend.instrumentation import init_app as init_instrumentation
+    init_instrumentation(app)
+    # Opt-in per-request SQL profiling / N+1 detection (X-Query-Profile header)
+    from backend.query_profiler import init_app as init_query_profiler
+    init_query_profiler(app)
+
     # Initialize extensions
     db.init_app(app)
+    # Roll each request's session back when the request fails (pool options: backend/config.py)
+    from backend.database import init_app as init_database
+    init_database(app)
+    # Read-only views go to DATABASE_REPLICA_URL when it is set and healthy
+    from backend.replica import init_app as init_replica
+    init_replica(app)
     api.init_app(app)
     migrate.init_app(app, db)
     cache.init_app(app)
     security.init_app(app, user_datastore)
-    cache.init_app(app)
+
+    # Cache verified auth tokens in front of Flask-Security's per-request user load
+    from backend.auth_cache import init_app as init_auth_cache
+    init_auth_cache(app)
 
     # JWT
     JWTManager(app)
 
+    # Celery for background jobs (worker: celery -A backend.worker worker)
+    from backend.jobs import celery_init_app
+    celery_init_app(app)
+
+    # flask CLI maintenance commands (e.g. `flask rebuild-ratings`)
+    from backend.commands import init_app as register_commands
+    register_commands(app)
+
     # CORS: move here (and restrict origin in production)
     # Example: allowed = os.environ.get("FRONTEND_ORIGIN", "*")
     cors_origins = os.environ.get("FRONTEND_ORIGIN", "*")
@@ -58,31 +84,35 @@ def createApp():
     # Register routes (only import when app exists)
     with app.app_context():
         from backend import routes  # ensure your blueprint registrations run
-        from backend.create_initial_data import init_app as initalize_database
-        try:
-            initalize_database(app)
-        except Exception as e:
-            print(f"Error during initial data creation: {e}")
+
+    # Roles/default users: `flask seed-initial-data`, or once per deploy at startup (SEED_ON_STARTUP)
+    from backend.create_initial_data import seed_once
+    seed_once(app)
+
+    # WhiteNoise serves frontend/: hashed, immutable, gzip/brotli copies and a rewritten index.html
+    from backend.static_assets import init_app as init_static_assets
+    init_static_assets(app)
     return app
 
 
 # Create the application instance at module import so gunicorn can load it:
 app = createApp()
 
-# Use WhiteNoise to serve static assets (explicit root and index_file)
-# In production you may prefer CloudFront + S3, but WhiteNoise is OK for Lightsail demo.
-app.wsgi_app = WhiteNoise(app.wsgi_app, root='frontend', index_file=True)
+# Unknown API paths get a JSON 404 instead of the SPA shell (GET only, so a
+# wrong method on a real endpoint still answers 405)
+@app.route('/api/<path:path>')
+def api_not_found(path):
+    return jsonify({"message": "Not found."}), 404
 
 
-# Single-page app catch-all route (Vue router)
+# Single-page app catch-all route (Vue router). Files are served by WhiteNoise
+# before a request gets here, so a path that looks like a file is missing.
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_vue_app(path):
-    # serve static files directly if they exist in the frontend folder
-    requested = os.path.join(app.static_folder, path)
-    if path and os.path.exists(requested):
-        return send_from_directory(app.static_folder, path)
-    return send_from_directory(app.static_folder, 'index.html')
+    if '.' in path.rsplit('/', 1)[-1]:
+        abort(404)
+    return spa_shell_response()
 
 
 # Health check
@@ -0,0 +1,138 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import update, select, insert, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .models import db, Restaurant, Review, MenuItem, Order, OrderItem, MenuItemDailyCount
+
+
+# --- Restaurant rating aggregates ---
+# Restaurant.rating_sum / rating_count mirror SUM(rating) / COUNT(*) over the
+# restaurant's reviews. They are adjusted with a single atomic UPDATE inside the
+# same transaction as the review insert/delete, and can be rebuilt in bulk with
+# `flask rebuild-ratings` if they ever drift.
+
+def record_review(restaurant_id, rating):
+    """ Adds one review's rating to the restaurant counters. Caller commits. """
+    db.session.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(rating_sum=Restaurant.rating_sum + rating, rating_count=Restaurant.rating_count + 1)
+    )
+
+
+def forget_review(restaurant_id, rating):
+    """ Removes one review's rating from the restaurant counters. Caller commits. """
+    db.session.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id, Restaurant.rating_count > 0)
+        .values(rating_sum=Restaurant.rating_sum - rating, rating_count=Restaurant.rating_count - 1)
+    )
+
+
+def rebuild_rating_aggregates():
+    """ Recomputes every restaurant's counters from the review table in one statement. """
+    rating_sum = select(func.coalesce(func.sum(Review.rating), 0))\
+        .where(Review.restaurant_id == Restaurant.id).scalar_subquery()
+    rating_count = select(func.count(Review.id))\
+        .where(Review.restaurant_id == Restaurant.id).scalar_subquery()
+    result = db.session.execute(
+        update(Restaurant).values(rating_sum=rating_sum, rating_count=rating_count),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+# --- Counter tables ---
+
+def add_to_counters(model, rows, key_names, counter_names):
+    """
+    Adds each row's `counter_names` values to the row with the same key
+    columns, inserting the row as given when there is none. Uses INSERT ...
+    ON CONFLICT DO UPDATE where the database has it, UPDATE-then-INSERT
+    elsewhere. Caller commits.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        statement = (sqlite if dialect == 'sqlite' else postgresql).insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=key_names,
+            set_={name: table.c[name] + statement.excluded[name] for name in counter_names}
+        )
+        db.session.execute(statement, rows)
+        return
+    for row in rows:
+        result = db.session.execute(
+            update(table)
+            .where(*[table.c[name] == row[name] for name in key_names])
+            .values({name: table.c[name] + row[name] for name in counter_names})
+        )
+        if result.rowcount == 0:
+            db.session.execute(insert(table).values(**row))
+
+
+# --- Popular items ---
+# MenuItemDailyCount holds, per menu item and UTC day, how many orders
+# contained the item. place_order bumps it in the order's own transaction;
+# the dashboard sums the last POPULAR_ITEMS_WINDOW_DAYS days, so its cost is
+# bounded by menu size x window instead of growing with order history. Days
+# that fall out of the window are deleted by the popular-items-prune sweep.
+
+def record_order_items(restaurant_id, menu_item_ids, placed_at=None):
+    """ Counts one order for each distinct menu item in it. Caller commits. """
+    day = (placed_at or datetime.utcnow()).date()
+    rows = [{'menu_item_id': menu_item_id, 'day': day, 'restaurant_id': restaurant_id, 'orders': 1}
+            for menu_item_id in sorted(set(menu_item_ids))]
+    add_to_counters(MenuItemDailyCount, rows, ['menu_item_id', 'day'], ['orders'])
+
+
+def popular_items(restaurant_id, limit=5, today=None):
+    """ [(name, orders)] for the restaurant's most ordered items within the rolling window. """
+    today = today or datetime.utcnow().date()
+    since = today - timedelta(days=current_app.config['POPULAR_ITEMS_WINDOW_DAYS'] - 1)
+    total = func.sum(MenuItemDailyCount.orders)
+    return db.session.query(MenuItem.name, total) \
+        .select_from(MenuItemDailyCount) \
+        .join(MenuItem, MenuItem.id == MenuItemDailyCount.menu_item_id) \
+        .filter(MenuItemDailyCount.restaurant_id == restaurant_id, MenuItemDailyCount.day >= since) \
+        .group_by(MenuItem.name) \
+        .order_by(total.desc()).limit(limit).all()
+
+
+def prune_popular_items(today=None):
+    """ Deletes counter days older than the rolling window. Caller commits. """
+    today = today or datetime.utcnow().date()
+    since = today - timedelta(days=current_app.config['POPULAR_ITEMS_WINDOW_DAYS'] - 1)
+    result = db.session.execute(delete(MenuItemDailyCount).where(MenuItemDailyCount.day < since))
+    return result.rowcount
+
+
+def rebuild_popular_items(today=None):
+    """ Recomputes the counters for the rolling window from the order tables. Returns rows written. """
+    today = today or datetime.utcnow().date()
+    since = today - timedelta(days=current_app.config['POPULAR_ITEMS_WINDOW_DAYS'] - 1)
+    start = datetime.combine(since, datetime.min.time())
+
+    # One row per (order, item) so an item listed twice in an order counts once
+    pairs = db.session.query(OrderItem.menu_item_id, Order.restaurant_id, Order.id, Order.created_at) \
+        .join(Order, OrderItem.order_id == Order.id) \
+        .filter(Order.created_at >= start) \
+        .distinct()
+    counts = Counter()
+    for menu_item_id, restaurant_id, _, created_at in pairs.execution_options(yield_per=5000):
+        counts[(menu_item_id, created_at.date(), restaurant_id)] += 1
+
+    db.session.execute(delete(MenuItemDailyCount))
+    if counts:
+        db.session.execute(insert(MenuItemDailyCount.__table__), [
+            {'menu_item_id': menu_item_id, 'day': day, 'restaurant_id': restaurant_id, 'orders': orders}
+            for (menu_item_id, day, restaurant_id), orders in counts.items()
+        ])
+    db.session.commit()
+    return len(counts)
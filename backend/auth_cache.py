@@ -0,0 +1,247 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request, has_app_context
+from flask_security.core import _request_loader
+from flask_security.utils import config_value, get_request_attr, set_request_attr, parse_auth_token
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from .extensions import cache
+from .models import db, User
+from .instrumentation import record_cache
+
+logger = logging.getLogger(__name__)
+
+# --- Authentication token cache ---
+# Flask-Security normally verifies the Authentication-Token signature, loads
+# the User and then its roles on every @auth_required('token') request. Here
+# the outcome of a successful verification (user id, active flag, role names,
+# fs_uniquifier) is kept in a per-process LRU keyed by a digest of the token,
+# for AUTH_CACHE_TTL_SECONDS, and requests that hit it are served a TokenUser
+# that answers id/roles/has_role without touching the database. Anything else
+# (name, email, favorites, ...) loads the real User by primary key on first use.
+#
+# Each entry remembers the user's generation token, stored in the shared cache
+# (Redis when REDIS_URL is set), and is only used while that generation is
+# current. Changing a user's active flag, password or fs_uniquifier, or
+# deleting the user, writes a new generation after the commit, so every
+# process stops trusting its entries at once. With the in-memory cache other
+# processes only find out when their entries expire.
+
+GENERATION_PREFIX = 'auth-gen:'
+_WATCHED_FIELDS = ('active', 'password', 'fs_uniquifier')
+
+
+class CachedRole:
+    """ The part of Role that Flask-Security's permission checks use. """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def get_permissions(self):
+        return set()
+
+    def __eq__(self, other):
+        return getattr(other, 'name', other) == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+class TokenUser:
+    """ current_user for a cache hit; loads and defers to the real User for anything not cached. """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, entry):
+        object.__setattr__(self, 'id', entry['user_id'])
+        object.__setattr__(self, 'fs_uniquifier', entry['fs_uniquifier'])
+        object.__setattr__(self, 'active', entry['active'])
+        object.__setattr__(self, 'roles', [CachedRole(name) for name in entry['roles']])
+        object.__setattr__(self, '_user', None)
+
+    @property
+    def is_active(self):
+        return self.active
+
+    def get_id(self):
+        return str(self.fs_uniquifier)
+
+    def has_role(self, role):
+        return getattr(role, 'name', role) in (cached.name for cached in self.roles)
+
+    def _load(self):
+        if self._user is None:
+            object.__setattr__(self, '_user', db.session.get(User, self.id))
+        return self._user
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+
+class TokenCache:
+    """ Thread-safe LRU of token digest -> verified user snapshot, with a TTL per entry. """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires'] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, token_exp=0):
+        # Never outlive the token's own expiry ('exp' is a Unix timestamp, 0 if none)
+        lifetime = self.ttl if not token_exp else min(self.ttl, token_exp - time.time())
+        entry['expires'] = time.monotonic() + lifetime
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def forget_user(self, fs_uniquifier):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry['fs_uniquifier'] == fs_uniquifier]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_token_cache(app=None):
+    app = app or current_app._get_current_object()
+    return app.extensions['auth_token_cache']
+
+
+def _new_generation():
+    return format(time.time_ns(), 'x')
+
+
+def _generation(fs_uniquifier):
+    """ The user's current generation token, created if missing so a cache flush cannot revive old entries. """
+    key = GENERATION_PREFIX + fs_uniquifier
+    try:
+        generation = cache.get(key)
+        if generation is None:
+            cache.add(key, _new_generation(), timeout=0)
+            generation = cache.get(key)
+        return generation
+    except Exception:
+        return None
+
+
+def invalidate_user(fs_uniquifier):
+    """ Makes every process drop its cached verification of this user's tokens. """
+    get_token_cache().forget_user(fs_uniquifier)
+    try:
+        cache.set(GENERATION_PREFIX + fs_uniquifier, _new_generation(), timeout=0)
+    except Exception as e:
+        logger.warning("Auth cache invalidation failed for user %s: %s", fs_uniquifier, e)
+
+
+def _request_token():
+    """ The token the same way Flask-Security finds it: JSON body, then ?auth_token=, then the header. """
+    args_key = config_value('TOKEN_AUTHENTICATION_KEY')
+    token = request.args.get(args_key, request.headers.get(config_value('TOKEN_AUTHENTICATION_HEADER')))
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        if isinstance(data, dict):
+            token = data.get(args_key, token)
+    return token
+
+
+def cached_request_loader(req):
+    """ Flask-Login request loader: a cache hit returns a TokenUser, a miss defers to Flask-Security. """
+    if get_request_attr('fs_authn_via') == 'token':
+        return _request_loader(req) # Already verified in this request
+    token = _request_token()
+    if not token:
+        return _request_loader(req)
+
+    token_cache = get_token_cache()
+    key = hashlib.sha256(token.encode()).hexdigest()
+    entry = token_cache.get(key)
+    hit = entry is not None and entry['generation'] is not None \
+        and entry['generation'] == _generation(entry['fs_uniquifier'])
+    record_cache(hit)
+    if hit:
+        set_request_attr('fs_authn_via', 'token')
+        return TokenUser(entry)
+
+    user = _request_loader(req)
+    if user is not None:
+        token_cache.put(key, {
+            'user_id': user.id,
+            'fs_uniquifier': user.fs_uniquifier,
+            'active': user.active,
+            'roles': [role.name for role in user.roles],
+            'generation': _generation(user.fs_uniquifier)
+        }, token_exp=parse_auth_token(token).get('exp', 0))
+    return user
+
+
+# --- Invalidation ---
+# Any flush that changes a watched field or deletes a user queues the user's
+# fs_uniquifier (old and new) on the session; the queue is acted on once the
+# transaction commits, so a concurrent request cannot re-cache the old state.
+
+def _queue_invalidation(target, include_history):
+    pending = object_session(target).info.setdefault('auth_cache_invalidate', set())
+    state = db.inspect(target)
+    uniquifiers = {target.fs_uniquifier}
+    if include_history:
+        uniquifiers.update(state.attrs.fs_uniquifier.history.deleted or ())
+    pending.update(uniquifier for uniquifier in uniquifiers if uniquifier)
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    state = db.inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _WATCHED_FIELDS):
+        _queue_invalidation(target, include_history=True)
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    _queue_invalidation(target, include_history=False)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    pending = session.info.pop('auth_cache_invalidate', None)
+    if pending and has_app_context() and 'auth_token_cache' in current_app.extensions:
+        for fs_uniquifier in pending:
+            invalidate_user(fs_uniquifier)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop('auth_cache_invalidate', None)
+
+
+def init_app(app):
+    """ Puts the cache in front of Flask-Security's token loader (AUTH_CACHE_TTL_SECONDS = 0 turns it off). """
+    if not app.config['AUTH_CACHE_TTL_SECONDS']:
+        return
+    app.extensions['auth_token_cache'] = TokenCache(app.config['AUTH_CACHE_MAX_ENTRIES'],
+                                                    app.config['AUTH_CACHE_TTL_SECONDS'])
+    app.login_manager.request_loader(cached_request_loader)
@@ -0,0 +1,93 @@
+import functools
+import logging
+import time
+
+from flask import current_app, request, make_response
+
+from .extensions import cache
+from .instrumentation import record_cache
+
+logger = logging.getLogger(__name__)
+
+# --- Tag-based view caching ---
+# Every tag has a generation token stored in the cache. A cached view's key
+# embeds the current generation of each of its tags, so invalidating a tag is
+# a single write of a new token: old entries simply stop being addressable and
+# age out on their own TTL. Tokens never expire and are never reused, so a
+# cache restart cannot resurrect stale entries.
+
+TAG_PREFIX = 'tag-gen:'
+VIEW_PREFIX = 'tagged-view:'
+
+FEATURED_TAG = 'featured'
+
+
+def restaurant_tag(restaurant_id):
+    """ Restaurant profile, fees and rating. """
+    return f'restaurant:{restaurant_id}'
+
+
+def _new_generation():
+    return format(time.time_ns(), 'x')
+
+
+def tag_generations(tags):
+    """ Current generation token of each tag, creating tokens for unseen tags. """
+    keys = [TAG_PREFIX + tag for tag in tags]
+    values = list(cache.get_many(*keys)) if keys else []
+    missing = {}
+    for position, value in enumerate(values):
+        if value is None:
+            values[position] = missing[keys[position]] = _new_generation()
+    if missing:
+        cache.set_many(missing, timeout=0)
+    return [str(value) for value in values]
+
+
+def invalidate_tags(*tags):
+    """ Invalidates every cached view carrying any of the tags (one cache write). """
+    if not tags:
+        return
+    try:
+        generation = _new_generation()
+        cache.set_many({TAG_PREFIX + tag: generation for tag in tags}, timeout=0)
+    except Exception as e:
+        logger.warning("Cache invalidation failed for %s: %s", tags, e)
+
+
+def cached_view(tags=(), timeout=None, query_string=False):
+    """
+    Caches a view's successful response under its request path and the current
+    generations of its tags. Tags are format strings filled from the view's
+    URL arguments, e.g. cached_view(tags=['restaurant:{restaurant_id}']).
+    The timeout defaults to CACHE_VIEW_TIMEOUT.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                view_tags = [tag.format(**kwargs) for tag in tags]
+                key = VIEW_PREFIX + request.path
+                if query_string and request.args:
+                    key += '?' + '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+                key += '#' + ','.join(tag_generations(view_tags))
+                hit = cache.get(key)
+            except Exception as e:
+                logger.warning("Cache lookup failed for %s: %s", request.path, e)
+                return view(*args, **kwargs)
+
+            record_cache(hit is not None)
+            if hit is not None:
+                body, mimetype = hit
+                return current_app.response_class(body, status=200, mimetype=mimetype)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.direct_passthrough:
+                try:
+                    ttl = timeout if timeout is not None else current_app.config['CACHE_VIEW_TIMEOUT']
+                    cache.set(key, (response.get_data(), response.mimetype), timeout=ttl)
+                except Exception as e:
+                    logger.warning("Cache store failed for %s: %s", request.path, e)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,93 @@
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .aggregates import rebuild_rating_aggregates, rebuild_popular_items
+from .jobs import purge_jobs
+from .sales_rollup import rebuild_daily_sales
+from .scheduler import run_sweeps, SWEEPS
+from .static_assets import reload_static_assets
+from .create_initial_data import init_app as seed_initial_data
+
+
+@click.command('rebuild-ratings')
+@with_appcontext
+def rebuild_ratings_command():
+    """ Rebuilds Restaurant.rating_sum/rating_count from the review table. """
+    updated = rebuild_rating_aggregates()
+    click.echo(f"Rebuilt rating aggregates for {updated} restaurants.")
+
+
+@click.command('rebuild-popular-items')
+@with_appcontext
+def rebuild_popular_items_command():
+    """ Rebuilds the dashboard's popular-item counters from recent orders. """
+    written = rebuild_popular_items()
+    days = current_app.config['POPULAR_ITEMS_WINDOW_DAYS']
+    click.echo(f"Rebuilt {written} popular-item counters covering the last {days} days.")
+
+
+@click.command('rebuild-daily-sales')
+@with_appcontext
+def rebuild_daily_sales_command():
+    """ Rebuilds the daily_restaurant_sales rollup from completed orders. """
+    written = rebuild_daily_sales()
+    click.echo(f"Rebuilt {written} daily sales rows.")
+
+
+@click.command('purge-jobs')
+@click.option('--older-than', type=int, default=None, help='Age in hours (defaults to JOB_RETENTION_HOURS).')
+@with_appcontext
+def purge_jobs_command(older_than):
+    """ Deletes finished background jobs and their artifacts. """
+    hours = older_than if older_than is not None else current_app.config['JOB_RETENTION_HOURS']
+    deleted = purge_jobs(hours)
+    click.echo(f"Deleted {deleted} finished jobs older than {hours} hours.")
+
+
+@click.command('run-sweeps')
+@click.option('--loop', is_flag=True, help='Keep running every SWEEP_INTERVAL_SECONDS (use when Celery beat is not deployed).')
+@click.option('--only', multiple=True, type=click.Choice(sorted(SWEEPS)), help='Run only this sweep (repeatable).')
+@with_appcontext
+def run_sweeps_command(loop, only):
+    """ Runs the delayed-action sweeps (OTP expiry, unpaid order cancellation). Run one instance only. """
+    interval = current_app.config['SWEEP_INTERVAL_SECONDS']
+    while True:
+        results = run_sweeps(names=only or None)
+        summary = ', '.join(f"{name}: {'failed' if count is None else count}" for name, count in results.items())
+        if not loop or any(results.values()):
+            click.echo(summary)
+        if not loop:
+            break
+        time.sleep(interval)
+
+
+@click.command('seed-initial-data')
+@with_appcontext
+def seed_initial_data_command():
+    """ Creates any missing roles, default users and the sample restaurant (safe to re-run). """
+    if not seed_initial_data(current_app._get_current_object()):
+        raise click.ClickException("Initial data setup did not complete; see the log for the errors.")
+    click.echo("Initial data is in place.")
+
+
+@click.command('reload-static')
+@with_appcontext
+def reload_static_command():
+    """ Rebuilds the hashed frontend assets and tells running workers to reload them (needs a shared cache). """
+    build_id = reload_static_assets()
+    click.echo(f"Static assets rebuilt ({build_id or 'hashing disabled'}); workers reload within "
+               f"{current_app.config['STATIC_RELOAD_CHECK_SECONDS']} s.")
+
+
+def init_app(app):
+    """ Registers the maintenance commands on the app's `flask` CLI. """
+    app.cli.add_command(rebuild_ratings_command)
+    app.cli.add_command(rebuild_popular_items_command)
+    app.cli.add_command(rebuild_daily_sales_command)
+    app.cli.add_command(purge_jobs_command)
+    app.cli.add_command(run_sweeps_command)
+    app.cli.add_command(reload_static_command)
+    app.cli.add_command(seed_initial_data_command)
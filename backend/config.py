@@ -4,6 +4,34 @@ from dotenv import load_dotenv
 # Load environment variables from a .env file (good for local development)
 load_dotenv()
 
+
+def engine_options(url):
+    """
+    SQLAlchemy engine options for a database URL. Server databases get a sized
+    connection pool that tests connections before use and replaces them before
+    the server or a proxy drops them; PostgreSQL also gets connect and
+    statement timeouts. SQLite keeps SQLAlchemy's defaults.
+    """
+    if url.startswith('sqlite'):
+        return {}
+    options = {
+        # Size the pool to the threads per worker (gunicorn --threads) so requests never queue for a connection
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+    if url.startswith('postgresql'):
+        connect_args = {'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 10))}
+        # Long maintenance commands can lift it: DB_STATEMENT_TIMEOUT_MS=0 flask rebuild-daily-sales
+        statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+        if statement_timeout:
+            connect_args['options'] = f'-c statement_timeout={statement_timeout}'
+        options['connect_args'] = connect_args
+    return options
+
+
 class Config:
     """Base configuration."""
     # These will be None if environment variables aren't set
@@ -14,6 +42,20 @@ class Config:
     if database_url.startswith('postgres://'):
         database_url = database_url.replace('postgres://', 'postgresql://', 1)
     SQLALCHEMY_DATABASE_URI = database_url
+    # Pool size, overflow, pre-ping, recycle and timeouts (DB_* environment variables)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(database_url)
+
+    # --- Read replica (backend/replica.py) ---
+    # Read-only views read from here when set; unset, everything uses the primary
+    replica_url = os.environ.get('DATABASE_REPLICA_URL')
+    if replica_url and replica_url.startswith('postgres://'):
+        replica_url = replica_url.replace('postgres://', 'postgresql://', 1)
+    SQLALCHEMY_BINDS = {'replica': {'url': replica_url, **engine_options(replica_url)}} if replica_url else {}
+    # Fall back to the primary when the replica is further behind than this
+    DATABASE_REPLICA_MAX_LAG_SECONDS = float(os.environ.get('DATABASE_REPLICA_MAX_LAG_SECONDS', 10))
+    REPLICA_HEALTH_CHECK_SECONDS = float(os.environ.get('REPLICA_HEALTH_CHECK_SECONDS', 5))
+    # After a user writes (e.g. places an order), their routed reads stay on the primary this long
+    READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 30))
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
@@ -25,6 +67,9 @@ class Config:
         CACHE_REDIS_URL = REDIS_URL
     else:
         CACHE_TYPE = os.environ.get('CACHE_TYPE', 'SimpleCache')
+    # Tagged public views (restaurant details, featured) are invalidated on write,
+    # so they can live much longer than a plain TTL cache would allow.
+    CACHE_VIEW_TIMEOUT = int(os.environ.get('CACHE_VIEW_TIMEOUT', 6 * 60 * 60))
 
 
     # --- Flask-Security-Too Configuration ---
@@ -33,6 +78,9 @@ class Config:
     SECURITY_TOKEN_AUTHENTICATION_HEADER = "Authentication-Token"
     WTF_CSRF_ENABLED = False
     SECURITY_CSRF_IGNORE_UNAUTH_ENDPOINTS = True
+    # Verified Authentication-Tokens are cached per process (backend/auth_cache.py); 0 disables it
+    AUTH_CACHE_TTL_SECONDS = int(os.environ.get('AUTH_CACHE_TTL_SECONDS', 30))
+    AUTH_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_CACHE_MAX_ENTRIES', 10000))
 
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
@@ -42,6 +90,110 @@ class Config:
     RAZORPAY_KEY_ID = os.environ.get('RAZORPAY_KEY_ID')
     RAZORPAY_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET')
 
+    # --- Payment gateway (backend/payments.py) ---
+    # 'razorpay' or 'fake'; unset picks Razorpay when both keys are configured
+    PAYMENT_GATEWAY = os.environ.get('PAYMENT_GATEWAY')
+    RAZORPAY_BASE_URL = os.environ.get('RAZORPAY_BASE_URL') # e.g. a local stub; defaults to the live API
+    PAYMENT_GATEWAY_CONNECT_TIMEOUT = float(os.environ.get('PAYMENT_GATEWAY_CONNECT_TIMEOUT', 3.05))
+    PAYMENT_GATEWAY_READ_TIMEOUT = float(os.environ.get('PAYMENT_GATEWAY_READ_TIMEOUT', 8))
+    PAYMENT_GATEWAY_MAX_ATTEMPTS = int(os.environ.get('PAYMENT_GATEWAY_MAX_ATTEMPTS', 3))
+    PAYMENT_GATEWAY_BACKOFF_SECONDS = float(os.environ.get('PAYMENT_GATEWAY_BACKOFF_SECONDS', 0.25))
+    PAYMENT_GATEWAY_BACKOFF_MAX_SECONDS = float(os.environ.get('PAYMENT_GATEWAY_BACKOFF_MAX_SECONDS', 2))
+    # Pooled connections to the gateway per process (size to gunicorn --threads)
+    PAYMENT_GATEWAY_POOL_SIZE = int(os.environ.get('PAYMENT_GATEWAY_POOL_SIZE', 10))
+    # Fail fast for PAYMENT_CIRCUIT_RESET_SECONDS after this many consecutive gateway failures
+    PAYMENT_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('PAYMENT_CIRCUIT_FAILURE_THRESHOLD', 5))
+    PAYMENT_CIRCUIT_RESET_SECONDS = float(os.environ.get('PAYMENT_CIRCUIT_RESET_SECONDS', 30))
+
+    # --- Nearby restaurant search ---
+    NEARBY_DEFAULT_RADIUS_KM = float(os.environ.get('NEARBY_DEFAULT_RADIUS_KM', 7))
+    NEARBY_MAX_RADIUS_KM = float(os.environ.get('NEARBY_MAX_RADIUS_KM', 50))
+    NEARBY_DEFAULT_LIMIT = int(os.environ.get('NEARBY_DEFAULT_LIMIT', 50))
+    NEARBY_MAX_LIMIT = int(os.environ.get('NEARBY_MAX_LIMIT', 200))
+    # In-process grid index; set to 'false' to use the SQL bounding-box query instead
+    NEARBY_USE_GRID_INDEX = os.environ.get('NEARBY_USE_GRID_INDEX', 'true').lower() == 'true'
+    # Max seconds a worker serves its grid before reloading (picks up other workers' changes)
+    GEO_INDEX_MAX_AGE = int(os.environ.get('GEO_INDEX_MAX_AGE', 300))
+
+    # --- Admin list pagination ---
+    ADMIN_PAGE_DEFAULT_LIMIT = int(os.environ.get('ADMIN_PAGE_DEFAULT_LIMIT', 50))
+    ADMIN_PAGE_MAX_LIMIT = int(os.environ.get('ADMIN_PAGE_MAX_LIMIT', 200))
+    # Rows fetched per round trip by the streaming admin exports
+    EXPORT_YIELD_PER = int(os.environ.get('EXPORT_YIELD_PER', 1000))
+
+    # --- Delayed actions (sweeps) ---
+    SWEEP_INTERVAL_SECONDS = int(os.environ.get('SWEEP_INTERVAL_SECONDS', 30))
+    SWEEP_BATCH_SIZE = int(os.environ.get('SWEEP_BATCH_SIZE', 500))
+    # How long a verified order's OTP stays readable before it is cleared
+    OTP_CLEAR_DELAY_SECONDS = int(os.environ.get('OTP_CLEAR_DELAY_SECONDS', 60))
+    # Cancel orders still placed and unpaid after this many minutes; 0 disables it
+    UNPAID_ORDER_CANCEL_MINUTES = int(os.environ.get('UNPAID_ORDER_CANCEL_MINUTES', 0))
+
+    # --- Restaurant dashboard ---
+    # "Popular items" covers orders from this many most recent days (counters older than that are pruned)
+    POPULAR_ITEMS_WINDOW_DAYS = int(os.environ.get('POPULAR_ITEMS_WINDOW_DAYS', 30))
+
+    # --- Uploaded images (backend/images.py) ---
+    # Threads per process that resize/encode uploads; 0 processes them in the request thread
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+    IMAGE_PROCESSING_TIMEOUT = int(os.environ.get('IMAGE_PROCESSING_TIMEOUT', 30))
+
+    # --- Startup ---
+    # 'once': seed roles/default users at startup once per SEED_VERSION and DEPLOY_ID
+    # (backend/create_initial_data.py); 'off': only via `flask seed-initial-data`
+    SEED_ON_STARTUP = os.environ.get('SEED_ON_STARTUP', 'once').lower()
+    # Identifies a deploy (e.g. the git SHA); a new value seeds again under 'once'
+    DEPLOY_ID = os.environ.get('DEPLOY_ID', '')
+
+    # --- Static assets (backend/static_assets.py) ---
+    # Serve content-hashed, precompressed copies of frontend/ (rebuilt at startup when files change)
+    STATIC_ASSET_HASHING = os.environ.get('STATIC_ASSET_HASHING', 'true').lower() == 'true'
+    # Where builds are written; defaults to instance/static
+    STATIC_BUILD_DIR = os.environ.get('STATIC_BUILD_DIR')
+    # How often each worker checks whether another one reloaded the assets (0 = never)
+    STATIC_RELOAD_CHECK_SECONDS = int(os.environ.get('STATIC_RELOAD_CHECK_SECONDS', 10))
+
+    # --- Background jobs (Celery) ---
+    # Without a broker, jobs run in-process at submit time ("eager" mode, also used by tests)
+    CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'false' if REDIS_URL else 'true').lower() == 'true'
+    CELERY = {
+        'broker_url': os.environ.get('CELERY_BROKER_URL', REDIS_URL or 'memory://'),
+        'task_always_eager': CELERY_TASK_ALWAYS_EAGER,
+        'task_ignore_result': True,
+        # Delayed actions (see backend/scheduler.py): celery -A backend.worker beat
+        'beat_schedule': {
+            'run-sweeps': {
+                'task': 'backend.scheduler.run_sweeps',
+                'schedule': SWEEP_INTERVAL_SECONDS,
+            },
+        },
+    }
+    # Where job artifacts and pending uploads live; defaults to <instance>/jobs.
+    # Must be shared by the web and worker processes.
+    JOB_ARTIFACT_DIR = os.environ.get('JOB_ARTIFACT_DIR')
+    JOB_RETENTION_HOURS = int(os.environ.get('JOB_RETENTION_HOURS', 24))
+
+    # --- Live order queue (Server-Sent Events) ---
+    # 'memory' only reaches streams served by the same process; use 'redis' with several web workers
+    ORDER_EVENTS_BROKER = os.environ.get('ORDER_EVENTS_BROKER', 'redis' if REDIS_URL else 'memory')
+    ORDER_STREAM_KEEPALIVE_SECONDS = int(os.environ.get('ORDER_STREAM_KEEPALIVE_SECONDS', 15))
+    # Streams are closed after this long and the browser reconnects, so no worker is held forever
+    ORDER_STREAM_MAX_SECONDS = int(os.environ.get('ORDER_STREAM_MAX_SECONDS', 300))
+
+    # --- Logging and request instrumentation (backend/instrumentation.py) ---
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    # Fraction of requests logged as a JSON line; errors and slow requests are always logged
+    REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', 0.01))
+    REQUEST_LOG_SLOW_MS = int(os.environ.get('REQUEST_LOG_SLOW_MS', 1000))
+
+    # --- SQL query profiler (backend/query_profiler.py) ---
+    # Profile every request, or only those sending an X-Query-Profile header (if allowed)
+    QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'false').lower() == 'true'
+    QUERY_PROFILER_HEADER_ENABLED = os.environ.get('QUERY_PROFILER_HEADER_ENABLED', 'false').lower() == 'true'
+    # A SELECT run this many times in one request is reported as a likely N+1
+    QUERY_PROFILER_N_PLUS_ONE_THRESHOLD = int(os.environ.get('QUERY_PROFILER_N_PLUS_ONE_THRESHOLD', 5))
+    QUERY_PROFILER_KEEP = int(os.environ.get('QUERY_PROFILER_KEEP', 50))
+
 
 class ProductionConfig(Config):
     """Production configuration (used by Render)."""
@@ -65,6 +217,9 @@ class LocalDevelopmentConfig(Config):
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'dev-jwt-key-replace-if-you-want')
     # --- END OF FIX ---
 
+    # Any request can ask for a query profile with an X-Query-Profile header
+    QUERY_PROFILER_HEADER_ENABLED = os.environ.get('QUERY_PROFILER_HEADER_ENABLED', 'true').lower() == 'true'
+
     # The .env file can still override the keys above
     # DATABASE_URL="sqlite:///./instance/local.db"
     # This will create a local.db file in an 'instance' folder.
\ No newline at end of file
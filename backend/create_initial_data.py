@@ -1,11 +1,38 @@
+import logging
 import os # <-- 1. ADD THIS IMPORT
-from .models import db, User, Role, Restaurant, Category, MenuItem
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .models import db, User, Role, Restaurant, Category, MenuItem, SetupMarker
 from .security import user_datastore
-import sys
+
+logger = logging.getLogger(__name__)
+
+# --- Initial data (roles, default users, a sample restaurant) ---
+# Seeding is idempotent (find-or-create) but costs a dozen queries and
+# commits, so it no longer runs in every process at startup:
+#   - `flask seed-initial-data` runs it explicitly (init_app() below);
+#   - with SEED_ON_STARTUP=once, seed_once() runs it at most once per
+#     SEED_VERSION and DEPLOY_ID. A row in setup_marker records the run, so
+#     later workers only pay one primary-key lookup. On PostgreSQL an advisory
+#     lock makes sure only one process seeds; the others start without
+#     waiting. Other databases seed unlocked, which is safe because every
+#     step is find-or-create.
+# The steps log and roll back their own errors instead of raising, so the
+# marker is only written once seed_complete() finds every seeded row; a seed
+# that failed part-way is retried by the next process to start.
+
+# Bump when the seed data changes so SEED_ON_STARTUP=once runs again
+SEED_VERSION = 1
+SEED_LOCK_KEY = 0x63726176 # pg_try_advisory_lock key ("crav")
+# Default users and the role each must have
+SEED_USER_ROLES = {'admin@crav.com': 'admin', 'owner1@email.com': 'owner', 'customer1@email.com': 'customer'}
 
 def create_roles(ds):
     """Finds or creates the 'admin', 'owner', and 'customer' roles."""
-    print("Finding or creating roles...")
+    logger.info("Finding or creating roles...")
     roles_to_create = {
         "admin": "Full administrative access",
         "owner": "Restaurant owner access",
@@ -18,17 +45,17 @@ def create_roles(ds):
         if not role:
             try:
                 role = ds.create_role(name=role_name, description=role_desc)
-                print(f"Role '{role_name}' created.")
+                logger.info("Role '%s' created.", role_name)
             except Exception as e:
-                print(f"Error creating role '{role_name}': {e}")
+                logger.error("Error creating role '%s': %s", role_name, e)
                 continue
         role_objects[role_name] = role
         
     try:
         db.session.commit()
-        print("Roles check/creation complete.")
+        logger.info("Roles check/creation complete.")
     except Exception as e:
-        print(f"Error committing roles: {e}")
+        logger.error("Error committing roles: %s", e)
         db.session.rollback()
         
     return role_objects
@@ -38,7 +65,7 @@ def create_users_and_data(ds, roles):
     Finds or creates default users and sample restaurant data.
     """
     
-    print("Finding, creating, or updating users...")
+    logger.info("Finding, creating, or updating users...")
     
     # --- 2. USE ENVIRONMENT VARIABLES FOR PASSWORDS ---
     admin_pass = os.environ.get('DEFAULT_ADMIN_PASS', 'admin123')
@@ -56,13 +83,13 @@ def create_users_and_data(ds, roles):
                 password=admin_pass, # <-- USE VARIABLE
                 name="Admin User"
             )
-            print(f"Admin user '{admin_email}' created.")
+            logger.info("Admin user '%s' created.", admin_email)
         
         if not admin_user.has_role("admin"):
             ds.add_role_to_user(admin_user, roles["admin"])
-            print(f"Added 'admin' role to '{admin_email}'.")
+            logger.info("Added 'admin' role to '%s'.", admin_email)
     except Exception as e:
-        print(f"Error with admin user: {e}")
+        logger.error("Error with admin user: %s", e)
 
     # --- Owner User ---
     owner_email = "owner1@email.com"
@@ -75,13 +102,13 @@ def create_users_and_data(ds, roles):
                 password=owner_pass, # <-- USE VARIABLE
                 name="Owner One"
             )
-            print(f"Owner user '{owner_email}' created.")
+            logger.info("Owner user '%s' created.", owner_email)
             
         if not owner_user.has_role("owner"):
             ds.add_role_to_user(owner_user, roles["owner"])
-            print(f"Added 'owner' role to '{owner_email}'.")
+            logger.info("Added 'owner' role to '%s'.", owner_email)
     except Exception as e:
-        print(f"Error with owner user: {e}")
+        logger.error("Error with owner user: %s", e)
     
     # --- Customer User ---
     cust_email = "customer1@email.com"
@@ -94,19 +121,19 @@ def create_users_and_data(ds, roles):
                 password=cust_pass, # <-- USE VARIABLE
                 name="Customer One"
             )
-            print(f"Customer user '{cust_email}' created.")
+            logger.info("Customer user '%s' created.", cust_email)
             
         if not cust_user.has_role("customer"):
             ds.add_role_to_user(cust_user, roles["customer"])
-            print(f"Added 'customer' role to '{cust_email}'.")
+            logger.info("Added 'customer' role to '%s'.", cust_email)
     except Exception as e:
-        print(f"Error with customer user: {e}")
+        logger.error("Error with customer user: %s", e)
     
     try:
         db.session.commit()
-        print("Users check/creation/update complete.")
+        logger.info("Users check/creation/update complete.")
     except Exception as e:
-        print(f"Error committing users: {e}")
+        logger.error("Error committing users: %s", e)
         db.session.rollback()
 
     # --- Create Restaurant Data ---
@@ -114,7 +141,7 @@ def create_users_and_data(ds, roles):
     try:
         owner_user_from_db = ds.find_user(email=owner_email) 
 
-        print("Finding or creating sample restaurant data...")
+        logger.info("Finding or creating sample restaurant data...")
         if owner_user_from_db and not Restaurant.query.filter_by(owner_id=owner_user_from_db.id).first():
             new_resto = Restaurant(
                 owner_id=owner_user_from_db.id,
@@ -131,14 +158,14 @@ def create_users_and_data(ds, roles):
             )
             db.session.add(new_resto)
             db.session.commit()
-            print(f"Restaurant '{new_resto.name}' created.")
+            logger.info("Restaurant '%s' created.", new_resto.name)
 
             # Create Categories
             cat1 = Category(name="Appetizers", restaurant_id=new_resto.id)
             cat2 = Category(name="Main Courses", restaurant_id=new_resto.id)
             db.session.add_all([cat1, cat2])
             db.session.commit()
-            print("Sample categories created.")
+            logger.info("Sample categories created.")
 
             # Create Menu Items
             item1 = MenuItem(name="Spring Rolls", description="Crispy fried rolls with vegetable filling.", price=5.99, category_id=cat1.id, restaurant_id=new_resto.id, food_type='Veg')
@@ -146,26 +173,89 @@ def create_users_and_data(ds, roles):
             item3 = MenuItem(name="Pasta Carbonara", description="Creamy pasta with bacon and parmesan.", price=15.50, category_id=cat2.id, restaurant_id=new_resto.id, food_type='Non-Veg')
             db.session.add_all([item1, item2, item3])
             db.session.commit()
-            print("Sample menu items created.")
+            logger.info("Sample menu items created.")
         else:
-            print("Sample restaurant data already exists or owner not found.")
+            logger.info("Sample restaurant data already exists or owner not found.")
     except Exception as e:
-        print(f"Error creating restaurant data: {e}")
+        logger.error("Error creating restaurant data: %s", e)
         db.session.rollback()
 
+def seed_complete():
+    """ Whether every default user has its role and the sample restaurant exists. """
+    for email, role in SEED_USER_ROLES.items():
+        user = user_datastore.find_user(email=email)
+        if user is None or not user.has_role(role):
+            return False
+    owner = user_datastore.find_user(email='owner1@email.com')
+    return Restaurant.query.filter_by(owner_id=owner.id).first() is not None
+
+
+def seed_initial_data():
+    """ Creates any missing roles, default users and sample data (needs an app context). Returns seed_complete(). """
+    logger.info("--- Starting Initial Data Setup ---")
+    roles = create_roles(user_datastore)
+    create_users_and_data(user_datastore, roles)
+    if not seed_complete():
+        logger.error("--- Data Setup Incomplete (see the errors above) ---")
+        return False
+    logger.info("--- Data Setup Complete ---")
+    return True
+
+
 def init_app(app):
     """
-    Main function to initialize data. 
-    This is called by our temporary route.
+    Seeds the initial data now, whatever SEED_ON_STARTUP says
+    (`flask seed-initial-data`, benchmarks). Returns whether it completed.
     """
     with app.app_context():
         try:
-            print("--- Starting Initial Data Setup ---")
-            
-            roles = create_roles(user_datastore)
-            create_users_and_data(user_datastore, roles)
-            print("--- Data Setup Complete ---")
-        except Exception as e:
-            print(f"An error occurred during data setup: {e}", file=sys.stderr)
+            return seed_initial_data()
+        except Exception:
+            logger.exception("An error occurred during data setup")
             db.session.rollback()
-            # Don't re-raise the exception - let the route handle it
\ No newline at end of file
+            return False
+
+
+def seed_marker_name(app):
+    return f"initial-data:v{SEED_VERSION}:{app.config['DEPLOY_ID']}"
+
+
+def _is_marked(name):
+    return db.session.get(SetupMarker, name) is not None
+
+
+def seed_once(app):
+    """ Startup hook: seeds once per SEED_VERSION/DEPLOY_ID when SEED_ON_STARTUP is 'once'. """
+    if app.config['SEED_ON_STARTUP'] != 'once':
+        return
+    name = seed_marker_name(app)
+    with app.app_context():
+        try:
+            if _is_marked(name):
+                return
+        except SQLAlchemyError:
+            db.session.rollback()
+            logger.warning("Skipping initial data: the database is not migrated yet (flask db upgrade)")
+            return
+
+        with db.engine.connect() as lock_connection:
+            locking = lock_connection.dialect.name == 'postgresql'
+            if locking and not lock_connection.execute(text('SELECT pg_try_advisory_lock(:key)'),
+                                                       {'key': SEED_LOCK_KEY}).scalar():
+                logger.info("Another process is seeding the initial data; not waiting for it")
+                return
+            try:
+                db.session.rollback() # Re-read after taking the lock
+                if _is_marked(name):
+                    return
+                if not seed_initial_data():
+                    db.session.rollback()
+                    return # Not marked, so the next process to start tries again
+                db.session.add(SetupMarker(name=name, completed_at=datetime.utcnow()))
+                db.session.commit()
+            except Exception:
+                logger.exception("An error occurred during data setup")
+                db.session.rollback()
+            finally:
+                if locking:
+                    lock_connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': SEED_LOCK_KEY})
@@ -0,0 +1,39 @@
+import logging
+
+from .extensions import db
+
+logger = logging.getLogger(__name__)
+
+# --- Request-scoped session hygiene ---
+# Flask-SQLAlchemy gives each request its own session and removes it when the
+# app context ends. A request that fails part-way (an unhandled exception, or a
+# handler that catches one and answers 5xx) is rolled back here first, so the
+# aborted transaction is never flushed by a later teardown and the connection
+# goes back to the pool clean. Handlers no longer need their own "rollback to
+# unblock the database" calls for that; they still roll back when they go on to
+# use the session after an error.
+#
+# Pool sizing, pre-ping, recycling and timeouts come from engine_options() in
+# backend/config.py.
+
+
+def _rollback(reason):
+    try:
+        db.session.rollback()
+    except Exception:
+        logger.exception("Rollback after %s failed", reason)
+
+
+def init_app(app):
+    """ Rolls the request's session back when the request ends in an error. """
+
+    @app.after_request
+    def _rollback_failed_response(response):
+        if response.status_code >= 500:
+            _rollback(f'{response.status_code} response')
+        return response
+
+    @app.teardown_request
+    def _rollback_on_exception(exc):
+        if exc is not None:
+            _rollback(type(exc).__name__)
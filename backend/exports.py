@@ -0,0 +1,305 @@
+import csv
+import io
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from flask import current_app, request, stream_with_context
+from sqlalchemy import func
+
+from .models import db, User, Role, Restaurant, Order
+
+logger = logging.getLogger(__name__)
+
+# --- Streaming admin exports ---
+# Rows are read as plain column tuples through a server-side cursor
+# (yield_per), so no ORM objects pile up in the session, and are written out
+# as they arrive: CSV goes straight to the client in chunks; XLSX goes through
+# openpyxl's write-only mode into a temporary file that is then streamed back
+# and deleted. Memory stays flat however many rows are exported.
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+EXPORT_MIMETYPES = {'xlsx': XLSX_MIMETYPE, 'csv': 'text/csv'}
+EXPORT_FORMATS = tuple(EXPORT_MIMETYPES)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ExportError(Exception):
+    """ Raised for invalid export parameters. """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class ExportFilters:
+    """ Filters shared by all exports: a half-open date range, a restaurant and an order status. """
+
+    def __init__(self, start=None, end=None, restaurant_id=None, status=None):
+        self.start = start
+        self.end = end
+        self.restaurant_id = restaurant_id
+        self.status = status
+
+    @classmethod
+    def from_request(cls):
+        """ Reads ?from=YYYY-MM-DD&to=YYYY-MM-DD (inclusive), ?restaurant_id and ?status. """
+        args = request.args
+        try:
+            start = datetime.strptime(args['from'], '%Y-%m-%d') if args.get('from') else None
+            end = datetime.strptime(args['to'], '%Y-%m-%d') + timedelta(days=1) if args.get('to') else None
+        except ValueError:
+            raise ExportError("Dates must be in YYYY-MM-DD format.")
+        if start and end and start >= end:
+            raise ExportError("'from' must not be after 'to'.")
+        try:
+            restaurant_id = int(args['restaurant_id']) if args.get('restaurant_id') else None
+        except ValueError:
+            raise ExportError("restaurant_id must be a number.")
+        status = args.get('status')
+        status = status.lower() if status and status != 'All' else None
+        return cls(start, end, restaurant_id, status)
+
+    def to_dict(self):
+        """ JSON-safe form, for handing the filters to a background job. """
+        return {
+            'start': self.start.isoformat() if self.start else None,
+            'end': self.end.isoformat() if self.end else None,
+            'restaurant_id': self.restaurant_id,
+            'status': self.status
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            datetime.fromisoformat(data['start']) if data.get('start') else None,
+            datetime.fromisoformat(data['end']) if data.get('end') else None,
+            data.get('restaurant_id'),
+            data.get('status')
+        )
+
+    def apply_to_orders(self, query):
+        if self.start:
+            query = query.filter(Order.created_at >= self.start)
+        if self.end:
+            query = query.filter(Order.created_at < self.end)
+        if self.restaurant_id:
+            query = query.filter(Order.restaurant_id == self.restaurant_id)
+        if self.status:
+            query = query.filter(Order.status == self.status)
+        return query
+
+
+def export_filename(name, fmt):
+    return f'{name}_export.{fmt}'
+
+
+def export_format():
+    fmt = (request.args.get('format') or 'xlsx').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unsupported export format '{fmt}'.")
+    return fmt
+
+
+def _stream(query):
+    """ Executes a column query through a server-side cursor, yield_per rows at a time. """
+    batch = current_app.config['EXPORT_YIELD_PER']
+    return db.session.execute(query.statement.execution_options(yield_per=batch))
+
+
+# --- Row sources ---
+# Each export has a query builder (also used to count rows for job progress)
+# and a generator yielding the header row followed by the data rows.
+
+def restaurant_query(filters):
+    # Performance metrics over completed orders in the window
+    order_metrics = filters.apply_to_orders(db.session.query(
+        Order.restaurant_id,
+        func.count(Order.id).label('total_orders'),
+        func.sum(Order.total_amount).label('total_revenue')
+    ).filter(Order.status == 'completed')).group_by(Order.restaurant_id).subquery()
+
+    query = db.session.query(
+        Restaurant.id, Restaurant.name, User.email, Restaurant.city, Restaurant.is_verified, User.active,
+        func.coalesce(order_metrics.c.total_orders, 0),
+        func.coalesce(order_metrics.c.total_revenue, 0)
+    ).outerjoin(User, Restaurant.owner_id == User.id) \
+     .outerjoin(order_metrics, Restaurant.id == order_metrics.c.restaurant_id) \
+     .order_by(Restaurant.id)
+    if filters.restaurant_id:
+        query = query.filter(Restaurant.id == filters.restaurant_id)
+    return query
+
+
+def restaurant_rows(filters):
+    yield ["ID", "Name", "Owner Email", "City", "Status", "Total Orders", "Total Revenue"]
+    for restaurant_id, name, owner_email, city, is_verified, owner_active, total_orders, total_revenue in _stream(restaurant_query(filters)):
+        status = "Pending"
+        if is_verified and owner_email is not None and owner_active:
+            status = "Verified"
+        elif owner_email is not None and not owner_active:
+            status = "Blocked"
+        yield [restaurant_id, name, owner_email or 'N/A', city, status, total_orders, round(float(total_revenue), 2)]
+
+
+def user_query(filters):
+    # Order stats in the window (and at the restaurant, if one is given)
+    orders_subquery = filters.apply_to_orders(db.session.query(
+        Order.user_id,
+        func.count(Order.id).label('total_orders'),
+        func.sum(Order.total_amount).label('total_spent')
+    )).group_by(Order.user_id).subquery()
+
+    customer_role = Role.query.filter_by(name='customer').first()
+    query = db.session.query(
+        User.id, User.name, User.email, User.active,
+        func.coalesce(orders_subquery.c.total_orders, 0),
+        func.coalesce(orders_subquery.c.total_spent, 0)
+    ).filter(User.roles.contains(customer_role)).order_by(User.id)
+    if filters.restaurant_id:
+        # Only customers who ordered from that restaurant
+        query = query.join(orders_subquery, User.id == orders_subquery.c.user_id)
+    else:
+        query = query.outerjoin(orders_subquery, User.id == orders_subquery.c.user_id)
+    return query
+
+
+def user_rows(filters):
+    yield ["ID", "Name", "Email", "Status", "Total Orders", "Total Spent"]
+    for user_id, name, email, active, total_orders, total_spent in _stream(user_query(filters)):
+        yield [user_id, name, email, "Active" if active else "Blocked", total_orders, round(float(total_spent), 2)]
+
+
+def order_query(filters):
+    return filters.apply_to_orders(db.session.query(
+        Order.id, User.name, Restaurant.name, Order.created_at, Order.total_amount, Order.status, Order.order_type
+    ).outerjoin(User, Order.user_id == User.id).outerjoin(Restaurant, Order.restaurant_id == Restaurant.id)) \
+     .order_by(Order.created_at.desc(), Order.id.desc())
+
+
+def order_rows(filters):
+    yield ["Order ID", "Customer Name", "Restaurant Name", "Date", "Total Amount", "Status", "Order Type"]
+    for order_id, customer_name, restaurant_name, created_at, total_amount, status, order_type in _stream(order_query(filters)):
+        yield [
+            order_id,
+            customer_name or 'N/A',
+            restaurant_name or 'N/A',
+            created_at.strftime('%Y-%m-%d %H:%M') if created_at else '',
+            total_amount,
+            (status or '').capitalize(),
+            (order_type or '').capitalize()
+        ]
+
+
+# name -> (query builder, row generator, sheet title)
+EXPORTS = {
+    'restaurants': (restaurant_query, restaurant_rows, "Restaurants"),
+    'users': (user_query, user_rows, "Users"),
+    'orders': (order_query, order_rows, "Orders"),
+}
+
+
+def count_export_rows(name, filters):
+    query_builder = EXPORTS[name][0]
+    return query_builder(filters).order_by(None).count()
+
+
+# --- Writers ---
+
+def csv_chunks(rows, flush_every=500):
+    """ Encodes rows as CSV, yielding a chunk every `flush_every` rows. """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % flush_every == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def write_xlsx(rows, sheet_title, path=None):
+    """ Writes rows with a write-only workbook into `path` (a new temporary file by default) and returns the path. """
+    import openpyxl # Imported on first use; slow to import and only needed for XLSX
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+    for row in rows:
+        sheet.append(row)
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(handle)
+    try:
+        workbook.save(path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def write_csv(rows, path):
+    with open(path, 'wb') as f:
+        for chunk in csv_chunks(rows):
+            f.write(chunk)
+    return path
+
+
+def write_export(name, filters, fmt, path, progress=None):
+    """
+    Writes a whole export to `path` (used by background jobs). `progress(done, total)`
+    is called every EXPORT_YIELD_PER rows.
+    """
+    _, row_source, sheet_title = EXPORTS[name]
+    total = count_export_rows(name, filters) if progress else None
+    every = current_app.config['EXPORT_YIELD_PER']
+
+    def counted(rows):
+        for done, row in enumerate(rows):
+            # The first row is the header
+            if progress and done and done % every == 0:
+                progress(done, total)
+            yield row
+        if progress:
+            progress(total, total)
+
+    rows = counted(row_source(filters))
+    if fmt == 'csv':
+        return write_csv(rows, path)
+    return write_xlsx(rows, sheet_title, path)
+
+
+def _file_chunks(path):
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+def _logged(chunks, name):
+    # Headers are already sent once streaming starts, so failures can only be logged
+    try:
+        yield from chunks
+    except Exception:
+        logger.exception("Error streaming %s export", name)
+        raise
+
+
+def export_response(name, rows, sheet_title, fmt):
+    """ Chunked download of `rows` as '<name>_export.<fmt>'. """
+    headers = {'Content-Disposition': f'attachment; filename={export_filename(name, fmt)}'}
+    if fmt == 'csv':
+        body = stream_with_context(_logged(csv_chunks(rows), name))
+        return current_app.response_class(body, mimetype=EXPORT_MIMETYPES['csv'], headers=headers)
+
+    path = write_xlsx(rows, sheet_title)
+    headers['Content-Length'] = str(os.path.getsize(path))
+    return current_app.response_class(_file_chunks(path), mimetype=EXPORT_MIMETYPES['xlsx'], headers=headers)
@@ -5,8 +5,11 @@ from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 
 from flask_caching import Cache
+
+from .replica import RoutingSession
 # Create the extension instances here
-db = SQLAlchemy()
+# RoutingSession sends read-only views to the replica bind, if one is configured
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 security = Security()
 api = Api()
 jwt = JWTManager()
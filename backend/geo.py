@@ -0,0 +1,209 @@
+import heapq
+import math
+import threading
+import time
+from array import array
+
+from sqlalchemy import event
+
+from .models import db, Restaurant
+from .replica import on_primary
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+
+# --- ✅ START: HAVERSINE FORMULA HELPER FUNCTION ---
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Calculate the great-circle distance between two points
+    on the earth (specified in decimal degrees)
+    """
+    # convert decimal degrees to radians
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+
+    # haversine formula
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    return c * EARTH_RADIUS_KM
+# --- ✅ END: HAVERSINE FORMULA HELPER FUNCTION ---
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Returns (min_lat, max_lat, min_lng, max_lng) enclosing a circle of
+    radius_km around the point. The longitude bounds are None when the box
+    reaches a pole or crosses the antimeridian, meaning "do not filter on
+    longitude".
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = lat - d_lat, lat + d_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+    # Widest longitude span is at the latitude edge closest to a pole
+    widest = max(abs(min_lat), abs(max_lat))
+    d_lng = radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(widest)))
+    min_lng, max_lng = lng - d_lng, lng + d_lng
+    if min_lng < -180 or max_lng > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lng, max_lng
+
+
+class GridIndex:
+    """
+    In-memory spatial index of restaurant coordinates.
+
+    Points are bucketed into square cells of `cell_deg` degrees and stored as
+    unit vectors. A radius query only visits the cells overlapping the query's
+    bounding box and tests each candidate with a dot product (no trig per
+    point); exact haversine distances are computed only for the returned hits.
+    """
+
+    def __init__(self, points, cell_deg=0.1):
+        self.cell_deg = cell_deg
+        self.ids = array('q')
+        self.lats = array('d')
+        self.lngs = array('d')
+        self.xs = array('d')
+        self.ys = array('d')
+        self.zs = array('d')
+        self.cells = {}
+        for restaurant_id, lat, lng in points:
+            position = len(self.ids)
+            x, y, z = _unit_vector(lat, lng)
+            self.ids.append(restaurant_id)
+            self.lats.append(lat)
+            self.lngs.append(lng)
+            self.xs.append(x)
+            self.ys.append(y)
+            self.zs.append(z)
+            self.cells.setdefault(self._cell(lat, lng), []).append(position)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lng / self.cell_deg))
+
+    def _candidates(self, lat, lng, radius_km):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        if min_lng is None:
+            # Polar/antimeridian query: rare enough to just check everything
+            return range(len(self.ids))
+        lat_lo, lng_lo = self._cell(min_lat, min_lng)
+        lat_hi, lng_hi = self._cell(max_lat, max_lng)
+        if (lat_hi - lat_lo + 1) * (lng_hi - lng_lo + 1) > len(self.cells):
+            # Huge radius: walking the occupied cells is cheaper than the box
+            return [p for (i, j), positions in self.cells.items()
+                    if lat_lo <= i <= lat_hi and lng_lo <= j <= lng_hi for p in positions]
+        candidates = []
+        cells = self.cells
+        for i in range(lat_lo, lat_hi + 1):
+            for j in range(lng_lo, lng_hi + 1):
+                positions = cells.get((i, j))
+                if positions:
+                    candidates.extend(positions)
+        return candidates
+
+    def query(self, lat, lng, radius_km, limit=None):
+        """ [(restaurant_id, distance_km)] within radius_km, nearest first. """
+        qx, qy, qz = _unit_vector(lat, lng)
+        # Points within the radius have a dot product of at least cos(central angle)
+        min_dot = math.cos(min(radius_km / EARTH_RADIUS_KM, math.pi))
+        xs, ys, zs = self.xs, self.ys, self.zs
+
+        hits = []
+        for p in self._candidates(lat, lng, radius_km):
+            dot = qx * xs[p] + qy * ys[p] + qz * zs[p]
+            if dot >= min_dot:
+                hits.append((-dot, p))
+
+        if limit is not None and limit < len(hits):
+            hits = heapq.nsmallest(limit, hits)
+        else:
+            hits.sort()
+        return [(self.ids[p], haversine(lat, lng, self.lats[p], self.lngs[p])) for _, p in hits]
+
+
+def _unit_vector(lat, lng):
+    lat_rad = math.radians(lat)
+    lng_rad = math.radians(lng)
+    cos_lat = math.cos(lat_rad)
+    return cos_lat * math.cos(lng_rad), cos_lat * math.sin(lng_rad), math.sin(lat_rad)
+
+
+# --- Process-wide index of verified, active restaurants ---
+# Rebuilt lazily on the next lookup after any restaurant change seen by this
+# process, and at least every GEO_INDEX_MAX_AGE seconds so changes made by
+# other workers are picked up too.
+
+_index = None
+_index_built_at = 0.0
+_index_stale = True
+_index_lock = threading.Lock()
+
+_GEO_FIELDS = ('latitude', 'longitude', 'is_verified', 'is_active')
+
+
+def mark_index_stale():
+    global _index_stale
+    _index_stale = True
+
+
+def _load_points():
+    # From the primary even in a replica-routed request: the grid is shared and
+    # kept until marked stale, so a lagging read would stick for GEO_INDEX_MAX_AGE
+    with on_primary():
+        return db.session.query(Restaurant.id, Restaurant.latitude, Restaurant.longitude).filter(
+            Restaurant.is_verified == True,
+            Restaurant.is_active == True,
+            Restaurant.latitude.isnot(None),
+            Restaurant.longitude.isnot(None)
+        ).all()
+
+
+def get_index(max_age):
+    """ The current GridIndex, rebuilding it first if it is stale or too old. """
+    global _index, _index_built_at, _index_stale
+    if _index is not None and not _index_stale and time.monotonic() - _index_built_at < max_age:
+        return _index
+    with _index_lock:
+        if _index is None or _index_stale or time.monotonic() - _index_built_at >= max_age:
+            _index_stale = False
+            _index = GridIndex(_load_points())
+            _index_built_at = time.monotonic()
+    return _index
+
+
+def nearby_from_index(lat, lng, radius_km, limit, max_age=300):
+    return get_index(max_age).query(lat, lng, radius_km, limit)
+
+
+def nearby_from_db(lat, lng, radius_km, limit):
+    """ Bounding-box prefilter on the (latitude, longitude) index, exact distance in Python. """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    query = db.session.query(Restaurant.id, Restaurant.latitude, Restaurant.longitude).filter(
+        Restaurant.is_verified == True,
+        Restaurant.is_active == True,
+        Restaurant.latitude.between(min_lat, max_lat)
+    )
+    if min_lng is not None:
+        query = query.filter(Restaurant.longitude.between(min_lng, max_lng))
+    else:
+        query = query.filter(Restaurant.longitude.isnot(None))
+    return GridIndex(query.all()).query(lat, lng, radius_km, limit)
+
+
+@event.listens_for(Restaurant, 'after_insert')
+@event.listens_for(Restaurant, 'after_delete')
+def _restaurant_added_or_removed(mapper, connection, target):
+    mark_index_stale()
+
+
+@event.listens_for(Restaurant, 'after_update')
+def _restaurant_updated(mapper, connection, target):
+    state = db.inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _GEO_FIELDS):
+        mark_index_stale()
@@ -0,0 +1,182 @@
+import functools
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# --- Uploaded image pipeline ---
+# Every upload is stored once per content hash under
+# <static>/assets/uploads/<hash>/ as a set of responsive sizes, each as JPEG
+# and (when Pillow has WebP support) WebP, plus a manifest.json describing
+# them. Identical uploads reuse the existing directory without decoding again.
+#
+# Decoding and encoding run on a small per-process pool of IMAGE_WORKERS
+# threads (0 = in the request thread); the request waits for its result for
+# up to IMAGE_PROCESSING_TIMEOUT seconds and then answers 503. The task owns
+# its temporary directory from render to rename, so a request that stops
+# waiting never deletes files under a running render, and the late result is
+# still stored for the next upload of the same image.
+# Pillow releases the GIL while decoding, resampling and encoding, so the
+# other request threads keep running, and the pool caps how many uploads are
+# processed at once. JPEGs are decoded with Image.draft(), which lets libjpeg
+# scale down while decoding. Pillow itself is imported on first use.
+#
+# The stored URL (MenuItem.image_url, Restaurant.gallery) is the full-size
+# JPEG, so existing clients keep working; image_sources() derives the srcset
+# strings from it for the API.
+
+UPLOAD_URL_PREFIX = '/assets/uploads/'
+# (name, max width); each size is also capped at twice its width in height
+SIZES = (('thumb', 160), ('card', 400), ('full', 800))
+JPEG_QUALITY = 82
+WEBP_QUALITY = 78
+MANIFEST_NAME = 'manifest.json'
+ALLOWED_EXTENSIONS = ('jpg', 'jpeg', 'png', 'webp')
+
+_PIPELINE_URL = re.compile(r'^' + re.escape(UPLOAD_URL_PREFIX) + r'([0-9a-f]{24})/full\.jpg$')
+
+
+@functools.lru_cache(maxsize=None)
+def webp_supported():
+    """ Whether this Pillow build can write WebP (checked once). """
+    from PIL import features
+    return features.check('webp')
+
+
+class ImageError(Exception):
+    """ Raised for an upload that is not a usable image. """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def upload_root():
+    return os.path.join(current_app.static_folder, 'assets', 'uploads')
+
+
+def variant_url(digest, name, extension):
+    return f'{UPLOAD_URL_PREFIX}{digest}/{name}.{extension}'
+
+
+def image_sources(url):
+    """ {'srcset', 'webpSrcset'} for an image stored by the pipeline; both None for any other URL. """
+    match = _PIPELINE_URL.match(url or '')
+    if not match:
+        return {'srcset': None, 'webpSrcset': None}
+    digest = match.group(1)
+    return {
+        'srcset': ', '.join(f'{variant_url(digest, name, "jpg")} {width}w' for name, width in SIZES),
+        'webpSrcset': ', '.join(f'{variant_url(digest, name, "webp")} {width}w' for name, width in SIZES)
+        if webp_supported() else None
+    }
+
+
+def image_srcset_fields(url):
+    """ 'imageSrcset'/'imageWebpSrcset' for a payload whose 'image' is `url`. """
+    sources = image_sources(url)
+    return {'imageSrcset': sources['srcset'], 'imageWebpSrcset': sources['webpSrcset']}
+
+
+# --- Rendering (runs on the image pool) ---
+
+def render_variants(data, directory):
+    """ Writes every size of the image in `data` into `directory`. Returns the manifest fields. """
+    from PIL import Image, ImageOps
+    image = Image.open(io.BytesIO(data))
+    largest = SIZES[-1][1]
+    if image.format == 'JPEG':
+        image.draft('RGB', (largest, largest * 2))
+    image = ImageOps.exif_transpose(image)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    variants = []
+    for name, width in reversed(SIZES): # Each size is scaled from the next larger one
+        image = image.copy()
+        image.thumbnail((width, width * 2), Image.LANCZOS)
+        image.save(os.path.join(directory, f'{name}.jpg'), 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        if webp_supported():
+            image.save(os.path.join(directory, f'{name}.webp'), 'WEBP', quality=WEBP_QUALITY, method=4)
+        variants.append({'name': name, 'width': image.width, 'height': image.height})
+    return variants[::-1]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """ The process's image pool, started on first use (so never before a fork). """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image')
+        return _pool
+
+
+# --- Storing ---
+
+def _manifest(digest, variants):
+    url = variant_url(digest, 'full', 'jpg')
+    return {
+        'url': url,
+        'hash': digest,
+        'variants': [dict(variant, jpeg=variant_url(digest, variant['name'], 'jpg'),
+                          webp=variant_url(digest, variant['name'], 'webp') if webp_supported() else None)
+                     for variant in variants],
+        **image_sources(url)
+    }
+
+
+def _store_variants(data, digest, root):
+    """ Renders into a temporary directory and moves it into place as root/<digest>. Runs on the image pool. """
+    from PIL import Image, UnidentifiedImageError
+    os.makedirs(root, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix='.upload-', dir=root)
+    try:
+        try:
+            variants = render_variants(data, work_dir)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+            raise ImageError("The file is not a readable image.") from e
+        manifest = _manifest(digest, variants)
+        with open(os.path.join(work_dir, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f)
+        try:
+            os.rename(work_dir, os.path.join(root, digest))
+        except OSError:
+            pass # The same image was stored concurrently; keep that copy
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return manifest
+
+
+def store_image(data):
+    """ Stores an uploaded image (or finds the identical earlier upload) and returns its manifest. """
+    digest = hashlib.sha256(data).hexdigest()[:24]
+    root = upload_root()
+    manifest_path = os.path.join(root, digest, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    workers = current_app.config['IMAGE_WORKERS']
+    if not workers:
+        return _store_variants(data, digest, root)
+    future = _get_pool(workers).submit(_store_variants, data, digest, root)
+    try:
+        return future.result(timeout=current_app.config['IMAGE_PROCESSING_TIMEOUT'])
+    except FutureTimeoutError:
+        logger.warning("Image %s is still processing after %s s", digest, current_app.config['IMAGE_PROCESSING_TIMEOUT'])
+        raise ImageError("The image is taking too long to process. Please try again shortly.", status_code=503)
@@ -0,0 +1,272 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+from flask import current_app, g, request, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+request_logger = logging.getLogger('backend.requests')
+
+# --- Logging ---
+# Every backend module logs through logging.getLogger(__name__). The 'backend'
+# logger hands records to a QueueHandler, so a request thread only formats the
+# message and puts it on an in-memory queue; a QueueListener thread writes them
+# to stderr (the gunicorn log). If the queue is ever full, records are dropped
+# and counted rather than blocking the request.
+#
+# --- Request instrumentation ---
+# Each request records its latency, SQL statement count and time (from engine
+# events) and cache hits/misses (reported by the caching helpers through
+# record_cache()). These are folded into per-process, per-endpoint histograms
+# served by GET /api/admin/metrics. One request in REQUEST_LOG_SAMPLE_RATE is
+# also logged as a JSON line; server errors and requests slower than
+# REQUEST_LOG_SLOW_MS always are.
+
+LOG_QUEUE_SIZE = 10000
+LOG_FORMAT = '%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s'
+
+# Upper bounds (ms) of the latency histogram buckets; a final bucket catches the rest
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """ QueueHandler that drops (and counts) records instead of blocking when the queue is full. """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_log_queue = queue.Queue(LOG_QUEUE_SIZE)
+_queue_handler = DroppingQueueHandler(_log_queue)
+_listener = None
+
+
+def _start_listener():
+    """ (Re)starts the writer thread; also run in forked children, which do not inherit threads. """
+    global _listener
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = logging.handlers.QueueListener(_log_queue, stream_handler)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop() # Flushes whatever is still queued
+
+
+def configure_logging(level):
+    """ Routes the 'backend' loggers through the queue. Safe to call more than once. """
+    backend_logger = logging.getLogger('backend')
+    backend_logger.setLevel(level)
+    if _queue_handler in backend_logger.handlers:
+        return
+    backend_logger.addHandler(_queue_handler)
+    backend_logger.propagate = False
+    _start_listener()
+    atexit.register(_stop_listener)
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_start_listener)
+
+
+# --- Per-request measurements ---
+
+class RequestMetrics:
+    """ What one request has done so far; lives on flask.g. """
+    __slots__ = ('start', 'db_queries', 'db_ms', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+def _current_metrics():
+    return g.get('request_metrics') if has_app_context() else None
+
+
+def record_cache(hit):
+    """ Counts a cache hit or miss against the current request (no-op outside one). """
+    metrics = _current_metrics()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+# The start time lives on the statement's execution context, so a statement
+# that raises (and never reaches after_cursor_execute) leaves nothing behind
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_start', None)
+    metrics = _current_metrics()
+    if metrics is not None and started is not None:
+        metrics.db_queries += 1
+        metrics.db_ms += (time.perf_counter() - started) * 1000
+
+
+# --- Per-endpoint aggregates ---
+
+class EndpointStats:
+    """ Running totals and a latency histogram for one method + URL rule. """
+    __slots__ = ('count', 'statuses', 'buckets', 'total_ms', 'max_ms',
+                 'db_queries', 'db_ms', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.count = 0
+        self.statuses = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, status, elapsed_ms, metrics):
+        status_class = f'{status // 100}xx'
+        self.count += 1
+        self.statuses[status_class] = self.statuses.get(status_class, 0) + 1
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.db_queries += metrics.db_queries
+        self.db_ms += metrics.db_ms
+        self.cache_hits += metrics.cache_hits
+        self.cache_misses += metrics.cache_misses
+
+    def percentile(self, fraction):
+        """ Upper bound of the bucket holding the given fraction of requests (max for the last bucket). """
+        rank = fraction * self.count
+        seen = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return min(bound, round(self.max_ms, 1))
+        return round(self.max_ms, 1)
+
+    def to_dict(self, endpoint):
+        count = self.count or 1
+        return {
+            'endpoint': endpoint,
+            'count': self.count,
+            'statuses': dict(sorted(self.statuses.items())),
+            'latencyMs': {
+                'avg': round(self.total_ms / count, 2),
+                'p50': self.percentile(0.5),
+                'p95': self.percentile(0.95),
+                'p99': self.percentile(0.99),
+                'max': round(self.max_ms, 1),
+                'histogram': list(self.buckets)
+            },
+            'db': {
+                'queriesPerRequest': round(self.db_queries / count, 2),
+                'msPerRequest': round(self.db_ms / count, 2)
+            },
+            'cache': {'hits': self.cache_hits, 'misses': self.cache_misses}
+        }
+
+
+class RequestStats:
+    """ Thread-safe per-endpoint aggregates for this process. """
+
+    def __init__(self):
+        self.since = datetime.utcnow()
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, status, elapsed_ms, metrics):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            stats.add(status, elapsed_ms, metrics)
+
+    def snapshot(self):
+        """ Endpoint summaries, the most total time first. """
+        with self._lock:
+            endpoints = sorted(self._endpoints.items(), key=lambda item: item[1].total_ms, reverse=True)
+            return {
+                'pid': os.getpid(),
+                'since': self.since.isoformat(),
+                'bucketsMs': list(LATENCY_BUCKETS_MS),
+                'droppedLogRecords': _queue_handler.dropped,
+                'endpoints': [stats.to_dict(endpoint) for endpoint, stats in endpoints]
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self.since = datetime.utcnow()
+
+
+def get_request_stats(app=None):
+    app = app or current_app._get_current_object()
+    return app.extensions['request_stats']
+
+
+def _endpoint_name():
+    rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    return f'{request.method} {rule}'
+
+
+def init_app(app):
+    """ Sets up queued logging and the before/after request hooks. """
+    configure_logging(app.config['LOG_LEVEL'])
+    stats = app.extensions['request_stats'] = RequestStats()
+    sample_rate = app.config['REQUEST_LOG_SAMPLE_RATE']
+    slow_ms = app.config['REQUEST_LOG_SLOW_MS']
+
+    @app.before_request
+    def _start_request_metrics():
+        g.request_metrics = RequestMetrics()
+
+    @app.after_request
+    def _finish_request_metrics(response):
+        metrics = g.pop('request_metrics', None)
+        if metrics is None:
+            return response
+        elapsed_ms = (time.perf_counter() - metrics.start) * 1000
+        endpoint = _endpoint_name()
+        stats.add(endpoint, response.status_code, elapsed_ms, metrics)
+
+        slow = response.status_code >= 500 or elapsed_ms >= slow_ms
+        if slow or random.random() < sample_rate:
+            # request.path only: query strings can carry auth tokens
+            request_logger.log(logging.WARNING if slow else logging.INFO, json.dumps({
+                'endpoint': endpoint,
+                'path': request.path,
+                'status': response.status_code,
+                'ms': round(elapsed_ms, 1),
+                'dbQueries': metrics.db_queries,
+                'dbMs': round(metrics.db_ms, 1),
+                'cacheHits': metrics.cache_hits,
+                'cacheMisses': metrics.cache_misses
+            }))
+        return response
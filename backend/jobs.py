@@ -0,0 +1,182 @@
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from celery import Celery, Task, shared_task
+from flask import current_app
+
+from .extensions import cache
+from .models import db, Job
+from .exports import ExportFilters, EXPORT_MIMETYPES, export_filename, write_export
+from .menu_import import import_menu_file, MenuImportError
+from .replica import read_only
+
+logger = logging.getLogger(__name__)
+
+# --- Background jobs ---
+# Heavy work (admin exports, bulk menu uploads) runs in a Celery worker
+# instead of the request thread. A Job row records who asked for what and
+# the final outcome; live progress goes through the shared cache so the
+# worker never has to write to the database mid-job. Finished artifacts are
+# written to JOB_ARTIFACT_DIR, which must be shared by web and worker
+# processes. With CELERY_TASK_ALWAYS_EAGER (the default when no broker is
+# configured, and what tests use) jobs run in-process at submit time.
+
+PROGRESS_PREFIX = 'job-progress:'
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+
+class JobError(Exception):
+    """ Raised when a job cannot be submitted or its artifact served. """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def celery_init_app(app):
+    """ Creates the Celery app from app.config['CELERY']; tasks run inside an app context. """
+    class FlaskTask(Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                return self.run(*args, **kwargs)
+
+    celery_app = Celery(app.name, task_cls=FlaskTask)
+    celery_app.config_from_object(app.config['CELERY'])
+    celery_app.set_default()
+    app.extensions['celery'] = celery_app
+    return celery_app
+
+
+def artifact_dir():
+    path = current_app.config.get('JOB_ARTIFACT_DIR') or os.path.join(current_app.instance_path, 'jobs')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def new_artifact_path(prefix, extension):
+    return os.path.join(artifact_dir(), f'{prefix}-{uuid.uuid4().hex}.{extension}')
+
+
+# --- Progress ---
+
+def report_progress(job_id, done, total=None):
+    try:
+        cache.set(PROGRESS_PREFIX + job_id, (done, total), timeout=current_app.config['JOB_RETENTION_HOURS'] * 3600)
+    except Exception as e:
+        logger.warning("Could not record progress for job %s: %s", job_id, e)
+
+
+def job_to_dict(job):
+    progress, total = job.progress, job.total
+    if job.status == 'running':
+        live = cache.get(PROGRESS_PREFIX + job.id)
+        if live:
+            progress, total = live
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': progress,
+        'total': total,
+        'message': job.message,
+        'result': job.result,
+        'downloadUrl': f'/api/jobs/{job.id}/download' if job.status == 'succeeded' and job.artifact_path else None,
+        'createdAt': job.created_at.isoformat() if job.created_at else None,
+        'finishedAt': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+# --- Handlers: job kind -> function(params, progress) returning the Job fields to set ---
+
+def _run_export(params, progress):
+    name, fmt = params['name'], params['format']
+    path = new_artifact_path(name, fmt)
+    with read_only():
+        write_export(name, ExportFilters.from_dict(params['filters']), fmt, path, progress)
+    return {
+        'artifact_path': path,
+        'artifact_name': export_filename(name, fmt),
+        'artifact_mimetype': EXPORT_MIMETYPES[fmt],
+        'message': "Export ready."
+    }
+
+
+def _run_menu_upload(params, progress):
+    try:
+        result = import_menu_file(params['restaurant_id'], params['upload_path'], params.get('format', 'xlsx'), progress)
+    finally:
+        if os.path.exists(params['upload_path']):
+            os.remove(params['upload_path'])
+    return {'message': result.message, 'result': result.to_dict()}
+
+
+JOB_HANDLERS = {
+    'export': _run_export,
+    'menu_upload': _run_menu_upload,
+}
+
+
+@shared_task(name='backend.jobs.run_job', ignore_result=True)
+def run_job(job_id):
+    job = db.session.get(Job, job_id)
+    if job is None or job.status != 'queued':
+        return
+    job.status = 'running'
+    db.session.commit()
+
+    kind, params = job.kind, job.params or {}
+    try:
+        fields = JOB_HANDLERS[kind](params, lambda done, total: report_progress(job_id, done, total))
+        status = 'succeeded'
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Job %s (%s) failed", job_id, kind)
+        message = e.message if isinstance(e, (MenuImportError, JobError)) else "The job failed. Please check the input and try again."
+        fields, status = {'message': message}, 'failed'
+
+    job = db.session.get(Job, job_id)
+    live = cache.get(PROGRESS_PREFIX + job_id)
+    if live:
+        job.progress, job.total = live
+    for field, value in fields.items():
+        setattr(job, field, value)
+    job.status = status
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    cache.delete(PROGRESS_PREFIX + job_id)
+
+
+def submit_job(kind, user_id, params):
+    """ Records a queued job and hands it to the worker (or runs it now in eager mode). """
+    job = Job(id=uuid.uuid4().hex, kind=kind, user_id=user_id, params=params, status='queued')
+    db.session.add(job)
+    db.session.commit()
+    job_id = job.id
+    try:
+        run_job.delay(job_id)
+    except Exception as e:
+        logger.error("Could not enqueue job %s: %s", job_id, e)
+        job.status = 'failed'
+        job.message = "The job queue is unavailable. Please try again later."
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        raise JobError(job.message, 503)
+    # In eager mode the job already ran in its own session
+    db.session.expire(job)
+    return job
+
+
+def purge_jobs(older_than_hours):
+    """ Deletes finished jobs older than the cutoff together with their artifacts. Returns the count. """
+    cutoff = datetime.utcnow() - timedelta(hours=older_than_hours)
+    jobs = Job.query.filter(Job.status.in_(('succeeded', 'failed')), Job.created_at < cutoff).all()
+    for job in jobs:
+        if job.artifact_path and os.path.exists(job.artifact_path):
+            os.remove(job.artifact_path)
+        db.session.delete(job)
+    db.session.commit()
+    return len(jobs)
@@ -0,0 +1,225 @@
+import csv
+import io
+import math
+
+from sqlalchemy import bindparam, insert, update
+
+from .models import db, Category, MenuItem
+from .menu_snapshot import publish_menu_snapshot
+
+# --- Bulk menu import ---
+# Rows are streamed from the file (openpyxl read-only mode, or csv), checked
+# one by one, and then written with a handful of set-based statements: one
+# query for the restaurant's categories, one for its items, a multi-row
+# INSERT for new categories, and executemany INSERT / UPDATE statements on the
+# core table for the items. The item statements are compiled once and sent in
+# multi-row batches (insertmanyvalues), which is much cheaper than compiling a
+# giant insert().values([...]) per batch. An item is the same item
+# when its category and name match (case-insensitively), so uploading the
+# same sheet twice updates prices instead of duplicating the menu.
+#
+# Expected columns: | Category | Name | Description | Price | Food Type (Veg/Non-Veg) |
+
+MENU_FILE_FORMATS = ('xlsx', 'csv')
+FOOD_TYPES = {'veg': 'Veg', 'non-veg': 'Non-Veg'}
+CATEGORY_NAME_LENGTH = Category.__table__.c.name.type.length
+ITEM_NAME_LENGTH = MenuItem.__table__.c.name.type.length
+
+PROGRESS_EVERY = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+class MenuImportError(Exception):
+    """ Raised when an uploaded menu file cannot be processed. """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class ImportResult:
+    """ What an import did, plus the rows it had to skip and why. """
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.categories_created = 0
+        self.skipped = 0
+        self.errors = [] # [{"row": 7, "message": "..."}], capped at MAX_REPORTED_ERRORS
+
+    def add_error(self, row_number, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'message': message})
+
+    @property
+    def message(self):
+        message = f"Added {self.created} and updated {self.updated} menu items."
+        if self.skipped:
+            message += f" {self.skipped} rows were skipped."
+        return message
+
+    def to_dict(self):
+        return {
+            'message': self.message,
+            'created': self.created,
+            'updated': self.updated,
+            'categoriesCreated': self.categories_created,
+            'skipped': self.skipped,
+            'errors': self.errors
+        }
+
+
+def menu_file_format(filename):
+    """ 'xlsx' or 'csv' from an upload's file name, or None if it is neither. """
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in MENU_FILE_FORMATS else None
+
+
+def _xlsx_rows(source):
+    import openpyxl # Imported on first use; slow to import and only needed for XLSX
+    try:
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except Exception:
+        raise MenuImportError("Could not read the file. Please upload a valid .xlsx file.")
+    try:
+        sheet = workbook.active
+        total = sheet.max_row - 1 if sheet.max_row else None
+        yield total
+        yield from sheet.iter_rows(min_row=2, values_only=True)
+    finally:
+        workbook.close()
+
+
+def _csv_rows(source):
+    # `source` is a path or a binary file object (e.g. a Werkzeug FileStorage)
+    if isinstance(source, str):
+        text = open(source, newline='', encoding='utf-8-sig')
+    else:
+        text = io.TextIOWrapper(getattr(source, 'stream', source), encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.reader(text)
+        yield None # Row count is unknown until the file has been read
+        try:
+            next(reader, None) # Header
+            yield from reader
+        except (UnicodeDecodeError, csv.Error):
+            raise MenuImportError("Could not read the file. Please upload a UTF-8 encoded .csv file.")
+    finally:
+        text.close()
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _parse_row(row):
+    """ (category, name, description, price, food_type) from a raw row; raises ValueError with a reason. """
+    category_name, item_name, description, price, food_type = (list(row) + [None] * 5)[:5]
+    category_name, item_name = _clean(category_name), _clean(item_name)
+    if not category_name:
+        raise ValueError("Category is required.")
+    if not item_name:
+        raise ValueError("Name is required.")
+    if len(category_name) > CATEGORY_NAME_LENGTH:
+        raise ValueError(f"Category is longer than {CATEGORY_NAME_LENGTH} characters.")
+    if len(item_name) > ITEM_NAME_LENGTH:
+        raise ValueError(f"Name is longer than {ITEM_NAME_LENGTH} characters.")
+    if _clean(price) == '':
+        raise ValueError("Price is required.")
+    try:
+        number = float(price)
+    except (TypeError, ValueError):
+        number = math.nan
+    if not math.isfinite(number): # float() also accepts 'nan', 'inf' and overflowing values such as '1e309'
+        raise ValueError(f"Price '{price}' is not a number.")
+    price = number
+    if price < 0:
+        raise ValueError("Price cannot be negative.")
+    return category_name, item_name, _clean(description), price, FOOD_TYPES.get(_clean(food_type).lower())
+
+
+def import_menu_file(restaurant_id, source, file_format='xlsx', progress=None):
+    """
+    Upserts the categories and menu items of an .xlsx or .csv file (path or
+    file object) into a restaurant's menu and commits. Rows with missing or
+    invalid values are skipped and reported in the result. `progress(done, total)`
+    is called as rows are read; `total` is None for CSV files.
+    """
+    if file_format not in MENU_FILE_FORMATS:
+        raise MenuImportError("Invalid file type. Please upload a .xlsx or .csv file.")
+    rows = _xlsx_rows(source) if file_format == 'xlsx' else _csv_rows(source)
+    total_rows = next(rows)
+    result = ImportResult()
+
+    # (category key, item key) -> parsed row; a later row for the same item wins
+    parsed = {}
+    row_number = 1
+    for row_number, row in enumerate(rows, 2):
+        if progress and row_number % PROGRESS_EVERY == 0:
+            progress(row_number - 1, total_rows)
+        if not any(_clean(value) for value in row):
+            continue # Blank line
+        try:
+            values = _parse_row(row)
+        except ValueError as e:
+            result.add_error(row_number, str(e))
+            continue
+        parsed[(values[0].lower(), values[1].lower())] = values
+
+    if parsed:
+        _upsert(restaurant_id, parsed.values(), result)
+        db.session.commit()
+        publish_menu_snapshot(restaurant_id)
+    if progress:
+        progress(row_number - 1, row_number - 1)
+    return result
+
+
+def _upsert(restaurant_id, rows, result):
+    # Categories: one lookup, one multi-row insert for the missing ones
+    category_ids = {}
+    for category_id, name in db.session.query(Category.id, Category.name).filter_by(restaurant_id=restaurant_id).order_by(Category.id):
+        category_ids.setdefault(name.strip().lower(), category_id)
+
+    new_categories = {}
+    for category_name, *_ in rows:
+        key = category_name.lower()
+        if key not in category_ids:
+            new_categories.setdefault(key, category_name)
+    if new_categories:
+        db.session.execute(insert(Category).values([
+            {'name': name, 'restaurant_id': restaurant_id} for name in new_categories.values()
+        ]))
+        created = db.session.query(Category.id, Category.name).filter(
+            Category.restaurant_id == restaurant_id, Category.name.in_(list(new_categories.values()))
+        )
+        for category_id, name in created:
+            category_ids.setdefault(name.strip().lower(), category_id)
+        result.categories_created = len(new_categories)
+
+    # Items: one lookup of (category, name) -> id, then one executemany insert and one executemany update
+    existing = {}
+    for item_id, category_id, name in db.session.query(MenuItem.id, MenuItem.category_id, MenuItem.name).filter_by(restaurant_id=restaurant_id):
+        existing.setdefault((category_id, name.strip().lower()), item_id)
+
+    to_insert, to_update = [], []
+    for category_name, item_name, description, price, food_type in rows:
+        category_id = category_ids[category_name.lower()]
+        values = {'description': description, 'price': price, 'food_type': food_type}
+        item_id = existing.get((category_id, item_name.lower()))
+        if item_id:
+            to_update.append({'item_id': item_id, **values})
+        else:
+            to_insert.append({'name': item_name, 'category_id': category_id, 'restaurant_id': restaurant_id, 'is_available': True, **values})
+
+    table = MenuItem.__table__
+    if to_insert:
+        db.session.execute(insert(table), to_insert)
+    if to_update:
+        db.session.execute(update(table).where(table.c.id == bindparam('item_id')), to_update)
+    result.created = len(to_insert)
+    result.updated = len(to_update)
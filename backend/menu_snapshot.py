@@ -0,0 +1,123 @@
+import hashlib
+import logging
+
+from flask import current_app
+from sqlalchemy.orm import joinedload
+
+from .extensions import cache
+from .models import Restaurant, Category
+from .cache_tags import TAG_PREFIX, restaurant_tag, tag_generations, invalidate_tags
+from .instrumentation import record_cache
+from .images import image_srcset_fields
+
+logger = logging.getLogger(__name__)
+
+# --- Write-through restaurant menu snapshots ---
+# The public restaurant detail document (profile fields + category/menu tree)
+# is serialized once into bytes when the menu changes and stored with its
+# content hash, which doubles as the HTTP ETag. Each snapshot is stamped with
+# the generation of the restaurant's cache tag, so profile/rating changes that
+# invalidate restaurant:<id> make it stale without touching the menu code.
+# Menu mutations bump that generation too before they publish: a snapshot
+# built by a request that started earlier (a reader's rebuild, or another
+# edit) then carries an older generation and cannot pass for fresh, even if
+# its write lands after the new one.
+
+SNAPSHOT_PREFIX = 'menu-snapshot:'
+
+
+class MenuSnapshot:
+    """ Serialized restaurant detail document and its ETag. """
+
+    def __init__(self, body, generation=None):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.generation = generation
+
+
+def _item_image(item):
+    return item.image_url or f'https://placehold.co/600x400/E65100/FFF?text={item.name.replace(" ", "+")}'
+
+
+def serialize_restaurant_detail(restaurant):
+    """ The customer-facing restaurant detail payload. """
+    categories_data = [{
+        'id': cat.id,
+        'name': cat.name,
+        'menu_items': [{
+            'id': item.id,
+            'name': item.name,
+            'description': item.description,
+            'price': item.price,
+            'is_available': item.is_available,
+            'image': _item_image(item),
+            **image_srcset_fields(item.image_url)
+        } for item in cat.menu_items]
+    } for cat in restaurant.categories]
+    return {
+        'id': restaurant.id, 'name': restaurant.name, 'description': restaurant.description,
+        'address': restaurant.address, 'city': restaurant.city, 'cuisine': 'Local Favorites',
+        'rating': round(restaurant.average_rating, 1),
+        'reviews': restaurant.rating_count,
+        'categories': categories_data,
+        'deliveryFee': restaurant.delivery_fee,
+        'platformFee': restaurant.platform_fee
+    }
+
+
+def build_menu_snapshot(restaurant_id, generation=None):
+    """ Loads the restaurant and its menu in one query and serializes it; None if it does not exist. """
+    restaurant = Restaurant.query.options(
+        joinedload(Restaurant.categories).joinedload(Category.menu_items)
+    ).filter_by(id=restaurant_id).first()
+    if restaurant is None:
+        return None
+    body = current_app.json.dumps(serialize_restaurant_detail(restaurant)).encode('utf-8')
+    return MenuSnapshot(body, generation)
+
+
+def publish_menu_snapshot(restaurant_id):
+    """ Marks earlier snapshots stale, then rebuilds and stores it. Call after a menu mutation commits. """
+    invalidate_tags(restaurant_tag(restaurant_id))
+    return _store_menu_snapshot(restaurant_id)
+
+
+def _store_menu_snapshot(restaurant_id):
+    """
+    Rebuilds and stores the snapshot under the current tag generation. The
+    generation is read before the rebuild, so a concurrent change can only
+    make the stored snapshot look stale, never fresh.
+    """
+    try:
+        generation = tag_generations([restaurant_tag(restaurant_id)])[0]
+    except Exception as e:
+        logger.warning("Menu snapshot publish failed for restaurant %s: %s", restaurant_id, e)
+        return build_menu_snapshot(restaurant_id)
+
+    snapshot = build_menu_snapshot(restaurant_id, generation)
+    try:
+        key = SNAPSHOT_PREFIX + str(restaurant_id)
+        if snapshot is None:
+            cache.delete(key)
+        else:
+            cache.set(key, snapshot, timeout=current_app.config['CACHE_VIEW_TIMEOUT'])
+    except Exception as e:
+        logger.warning("Menu snapshot publish failed for restaurant %s: %s", restaurant_id, e)
+    return snapshot
+
+
+def get_menu_snapshot(restaurant_id):
+    """ The current snapshot (one cache round trip on a hit), rebuilding it if missing or stale. """
+    try:
+        snapshot, generation = cache.get_many(
+            SNAPSHOT_PREFIX + str(restaurant_id), TAG_PREFIX + restaurant_tag(restaurant_id)
+        )
+    except Exception as e:
+        logger.warning("Menu snapshot lookup failed for restaurant %s: %s", restaurant_id, e)
+        return build_menu_snapshot(restaurant_id)
+
+    fresh = snapshot is not None and generation is not None and snapshot.generation == str(generation)
+    record_cache(fresh)
+    if fresh:
+        return snapshot
+    return _store_menu_snapshot(restaurant_id)
@@ -3,6 +3,12 @@ from flask_security import UserMixin, RoleMixin
 from datetime import datetime
 from .extensions import db 
 
+# Orders in these statuses are finished and drop out of the kitchen queue.
+# The partial index on Order below uses the same list, so queries that want
+# to hit it must filter with Order.status.notin_(TERMINAL_ORDER_STATUSES).
+TERMINAL_ORDER_STATUSES = ('completed', 'cancelled', 'rejected', 'refunded')
+_ACTIVE_ORDER_PREDICATE = "status NOT IN (%s)" % ", ".join(f"'{s}'" for s in TERMINAL_ORDER_STATUSES)
+
 # Association table for the many-to-many relationship between Users and Roles
 class RolesUsers(db.Model):
     __tablename__ = 'roles_users'
@@ -10,6 +16,10 @@ class RolesUsers(db.Model):
     user_id = db.Column('user_id', db.Integer(), db.ForeignKey('user.id'))
     role_id = db.Column('role_id', db.Integer(), db.ForeignKey('role.id'))
 
+    __table_args__ = (
+        db.Index('ix_roles_users_user_id', 'user_id'),
+    )
+
 # Role model for Flask-Security
 class Role(db.Model, RoleMixin):
     __tablename__ = 'role'
@@ -57,7 +67,9 @@ class Restaurant(db.Model):
     platform_fee = db.Column(db.Float, default=0.0)
     # --- ✅ END: FEE FIELDS ADDED ---
 
-
+    # Review aggregates, kept in step by backend.aggregates so listings never AVG() the review table
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     owner = db.relationship('User', backref='restaurants_owned')
     menu_items = db.relationship('MenuItem', backref='restaurant', lazy=True, cascade="all, delete-orphan")
@@ -66,6 +78,18 @@ class Restaurant(db.Model):
     reviews = db.relationship('Review', backref='restaurant', lazy=True, cascade="all, delete-orphan")
     time_slots = db.relationship('TimeSlot', backref='restaurant', lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index('ix_restaurant_owner_id', 'owner_id'),
+        db.Index('ix_restaurant_latitude_longitude', 'latitude', 'longitude'),
+    )
+
+    @property
+    def average_rating(self):
+        """ Mean review rating from the denormalised counters (0.0 when unrated). """
+        if not self.rating_count:
+            return 0.0
+        return (self.rating_sum or 0) / self.rating_count
+
 
 # ... (The rest of your models.py file remains unchanged) ...
 class Category(db.Model):
@@ -74,6 +98,10 @@ class Category(db.Model):
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
     menu_items = db.relationship('MenuItem', backref='category', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_category_restaurant_id', 'restaurant_id'),
+    )
+
 class MenuItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -85,6 +113,11 @@ class MenuItem(db.Model):
     image_url = db.Column(db.String(255), nullable=True)
     food_type = db.Column(db.String(10), nullable=True) # e.g., 'Veg', 'Non-Veg'
 
+    __table_args__ = (
+        db.Index('ix_menu_item_restaurant_id_category_id', 'restaurant_id', 'category_id'),
+        db.Index('ix_menu_item_category_id', 'category_id'),
+    )
+
 
 class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -96,6 +129,7 @@ class Order(db.Model):
     table_number = db.Column(db.String(20), nullable=True)
     pickup_ready = db.Column(db.Boolean, default=False)
     otp = db.Column(db.String(6), nullable=True)
+    otp_expires_at = db.Column(db.DateTime, nullable=True) # Cleared by the otp-expiry sweep; read via order_otp()
     qr_payload = db.Column(db.String(255), nullable=False, unique=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_scheduled = db.Column(db.Boolean, default=False)
@@ -126,6 +160,27 @@ class Order(db.Model):
     review = db.relationship('Review', backref='order', uselist=False, cascade="all, delete-orphan")
     items = db.relationship('OrderItem', backref='order', lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Dashboards, queue and analytics: one restaurant, filtered by status and/or time
+        db.Index('ix_order_restaurant_id_status_created_at', 'restaurant_id', 'status', 'created_at'),
+        db.Index('ix_order_restaurant_id_created_at', 'restaurant_id', 'created_at'),
+        # Customer order history
+        db.Index('ix_order_user_id_created_at', 'user_id', 'created_at'),
+        # Admin lists and platform reports
+        db.Index('ix_order_status_created_at', 'status', 'created_at'),
+        db.Index('ix_order_created_at', 'created_at'),
+        # Payment webhook lookup
+        db.Index('ix_order_razorpay_order_id', 'razorpay_order_id'),
+        # OTP expiry sweep
+        db.Index('ix_order_otp_expires_at', 'otp_expires_at'),
+        # Kitchen queue: only the (small) set of orders still in flight
+        db.Index(
+            'ix_order_active_restaurant_id_created_at', 'restaurant_id', 'created_at',
+            postgresql_where=db.text(_ACTIVE_ORDER_PREDICATE),
+            sqlite_where=db.text(_ACTIVE_ORDER_PREDICATE)
+        ),
+    )
+
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
@@ -134,6 +189,11 @@ class OrderItem(db.Model):
     price_at_order = db.Column(db.Float, nullable=False)
     menu_item = db.relationship('MenuItem')
 
+    __table_args__ = (
+        db.Index('ix_order_item_order_id', 'order_id'),
+        db.Index('ix_order_item_menu_item_id', 'menu_item_id'),
+    )
+
 class Review(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -142,6 +202,11 @@ class Review(db.Model):
     rating = db.Column(db.Integer, nullable=False)
     comment = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_review_restaurant_id_created_at', 'restaurant_id', 'created_at'),
+        db.Index('ix_review_created_at', 'created_at'),
+    )
     
 class Favorite(db.Model):
     __tablename__ = 'favorite'
@@ -149,6 +214,10 @@ class Favorite(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
 
+    __table_args__ = (
+        db.Index('ix_favorite_user_id_restaurant_id', 'user_id', 'restaurant_id'),
+    )
+
 class RewardPoint(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -158,6 +227,10 @@ class RewardPoint(db.Model):
     reason = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_reward_point_user_id_created_at', 'user_id', 'created_at'),
+    )
+
 class Coupon(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=True)
@@ -174,4 +247,65 @@ class TimeSlot(db.Model):
     day_of_week = db.Column(db.String(10), nullable=False) # e.g., "Monday", "Tuesday"
     start_time = db.Column(db.Time, nullable=False)
 
-    end_time = db.Column(db.Time, nullable=False)
\ No newline at end of file
+    end_time = db.Column(db.Time, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_time_slot_restaurant_id', 'restaurant_id'),
+    )
+
+# Background job (exports, bulk menu uploads) run by the Celery worker
+class Job(db.Model):
+    id = db.Column(db.String(36), primary_key=True) # uuid4 hex, handed to the client
+    kind = db.Column(db.String(50), nullable=False) # "export" or "menu_upload"
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    params = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, running, succeeded, failed
+    progress = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total = db.Column(db.Integer, nullable=True)
+    message = db.Column(db.Text, nullable=True)
+    result = db.Column(db.JSON, nullable=True) # Structured outcome, e.g. per-row import errors
+    artifact_path = db.Column(db.String(512), nullable=True)
+    artifact_name = db.Column(db.String(255), nullable=True)
+    artifact_mimetype = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_job_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_job_created_at', 'created_at'),
+    )
+
+# Rolling per-day order counts for each menu item, feeding the dashboard's
+# "popular items" without scanning order history (see backend/aggregates.py)
+class MenuItemDailyCount(db.Model):
+    menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_item.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True) # UTC date the orders were placed
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
+    orders = db.Column(db.Integer, nullable=False, default=0) # Orders containing the item that day
+
+    __table_args__ = (
+        db.Index('ix_menu_item_daily_count_restaurant_id_day', 'restaurant_id', 'day'),
+        db.Index('ix_menu_item_daily_count_day', 'day'),
+    )
+
+
+# Completed-order totals per restaurant per day, kept up to date as orders
+# complete or are refunded, so analytics and reports never scan order history
+# (see backend/sales_rollup.py)
+class DailyRestaurantSales(db.Model):
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True) # UTC date the orders were placed
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0) # SUM(total_amount)
+    discount = db.Column(db.Float, nullable=False, default=0.0) # SUM(discount_amount)
+    fees = db.Column(db.Float, nullable=False, default=0.0) # SUM(delivery_fee + platform_fee)
+    __table_args__ = (
+        db.Index('ix_daily_restaurant_sales_day', 'day'),
+    )
+
+
+# One row per completed one-off setup step (e.g. "initial-data:v1:<deploy>"),
+# so startup hooks can skip work another process already did
+class SetupMarker(db.Model):
+    name = db.Column(db.String(100), primary_key=True)
+    completed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
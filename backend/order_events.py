@@ -0,0 +1,190 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+from flask import current_app
+
+from .models import Order, TERMINAL_ORDER_STATUSES
+from .order_queue import queue_entries
+
+logger = logging.getLogger(__name__)
+
+# --- Live order events for the restaurant queue ---
+# Handlers that create an order or change its status publish an event after
+# committing; the kitchen's order queue page listens on a Server-Sent Events
+# stream for its restaurant instead of polling /api/restaurant/orders.
+#
+# Events go through a broker: an in-process one (single web process, the
+# default) or Redis pub/sub when REDIS_URL is set, so an event published by
+# one worker reaches streams held open by any other. Events carry the full
+# queue entry for the order, so the page never has to refetch on an event.
+
+ORDER_CREATED = 'order.created'
+ORDER_UPDATED = 'order.updated'
+
+CHANNEL_PREFIX = 'order-events:'
+
+
+def channel_for(restaurant_id):
+    return f'{CHANNEL_PREFIX}{restaurant_id}'
+
+
+# --- Brokers ---
+
+class InProcessBroker:
+    """ Fans events out to subscriber queues within this process. """
+
+    def __init__(self, max_queued=100):
+        self.max_queued = max_queued
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                pass # A stalled client loses events; it resyncs when it reconnects
+
+    def subscribe(self, channel):
+        return _InProcessSubscription(self, channel)
+
+    def _add(self, channel, subscriber):
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+
+    def _remove(self, channel, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+
+class _InProcessSubscription:
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=broker.max_queued)
+        broker._add(channel, self.queue)
+
+    def get(self, timeout):
+        """ The next message, or None if nothing arrived within `timeout` seconds. """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker._remove(self.channel, self.queue)
+
+
+class RedisBroker:
+    """ Redis pub/sub, so events reach streams held by every web process. """
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        self.client.publish(channel, message)
+
+    def subscribe(self, channel):
+        return _RedisSubscription(self.client, channel)
+
+
+class _RedisSubscription:
+    def __init__(self, client, channel):
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+
+    def get(self, timeout):
+        message = self.pubsub.get_message(timeout=timeout)
+        if message is None:
+            return None
+        data = message['data']
+        return data.decode() if isinstance(data, bytes) else data
+
+    def close(self):
+        self.pubsub.close()
+
+
+def get_broker(app=None):
+    """ The app's broker, created on first use from ORDER_EVENTS_BROKER ('memory' or 'redis'). """
+    app = app or current_app._get_current_object()
+    broker = app.extensions.get('order_events')
+    if broker is None:
+        if app.config['ORDER_EVENTS_BROKER'] == 'redis':
+            broker = RedisBroker(app.config['REDIS_URL'])
+        else:
+            broker = InProcessBroker()
+        broker = app.extensions.setdefault('order_events', broker)
+    return broker
+
+
+# --- Publishing ---
+
+def publish_order_event(order, event_type=ORDER_UPDATED):
+    """
+    Tells the order's restaurant queue about a new order or a status change.
+    Call after the change is committed. Failures are logged and swallowed:
+    the queue page resyncs from the database when it reconnects.
+    """
+    try:
+        entries = queue_entries(Order.id == order.id)
+        if not entries:
+            return
+        message = json.dumps({
+            'type': event_type,
+            'order': entries[0],
+            # Completed, rejected, ... orders leave the queue
+            'active': order.status not in TERMINAL_ORDER_STATUSES
+        })
+        get_broker().publish(channel_for(order.restaurant_id), message)
+    except Exception as e:
+        logger.warning("Could not publish %s for order %s: %s", event_type, order.id, e)
+
+
+# --- Streaming ---
+
+def _sse(event_type, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.extend(f'data: {line}' for line in data.splitlines())
+    return '\n'.join(lines) + '\n\n'
+
+
+def order_event_stream(restaurant_id, broker, keepalive, max_seconds):
+    """
+    Yields Server-Sent Events for one restaurant until `max_seconds` have
+    passed; the browser's EventSource then reconnects by itself. Comment
+    lines go out every `keepalive` seconds so proxies keep the connection
+    open. This generator does not touch the database.
+    """
+    subscription = broker.subscribe(channel_for(restaurant_id))
+    try:
+        # Tell the client how long to wait before reconnecting, and that we are live
+        yield 'retry: 3000\n\n'
+        yield _sse('ready', json.dumps({'restaurantId': restaurant_id}))
+        deadline = time.monotonic() + max_seconds
+        event_id = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            message = subscription.get(timeout=min(keepalive, remaining))
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            event_id += 1
+            event_type = json.loads(message).get('type', ORDER_UPDATED)
+            yield _sse(event_type, message, event_id)
+    finally:
+        subscription.close()
@@ -0,0 +1,82 @@
+from collections import defaultdict
+
+from sqlalchemy import func, select
+
+from .models import db, User, Order, OrderItem, MenuItem, TERMINAL_ORDER_STATUSES
+from .timezones import to_ist
+
+# --- Restaurant order queue projection ---
+# The queue page and the live order events need each order's customer name
+# and item names/quantities. Loading Order objects and walking
+# order.customer / order.items / item.menu_item costs 1 + 2N + M lazy loads;
+# these helpers select only the needed columns instead: one statement for the
+# orders joined to their customers and one for all of their items.
+
+
+def _queue_entry(row, items):
+    created_at = to_ist(row.created_at)
+    entry = {
+        'id': row.id,
+        'customerName': row.customer_name,
+        'createdAt': created_at.strftime('%I:%M %p'),
+        'status': row.status,
+        'order_type': row.order_type,
+        'items': items,
+        'is_scheduled': row.is_scheduled,
+        'scheduled_date': None,
+        'scheduled_time': None
+    }
+    # If the order is scheduled, add the formatted IST time
+    if row.is_scheduled and row.scheduled_time:
+        scheduled_time = to_ist(row.scheduled_time)
+        entry['scheduled_date'] = scheduled_time.strftime('%b %d, %Y')
+        entry['scheduled_time'] = scheduled_time.strftime('%I:%M %p')
+    return entry
+
+
+def queue_entries(*criteria):
+    """
+    Queue entries (times in IST) for the orders matching `criteria`, oldest
+    first, in two statements. The criteria may only refer to Order columns.
+    """
+    rows = db.session.query(
+        Order.id, Order.created_at, Order.status, Order.order_type, Order.is_scheduled, Order.scheduled_time,
+        User.name.label('customer_name')
+    ).outerjoin(User, Order.user_id == User.id) \
+     .filter(*criteria) \
+     .order_by(Order.created_at.asc(), Order.id.asc()).all()
+    if not rows:
+        return []
+
+    # Items of the same orders, selected with the same criteria rather than a long IN (...) list
+    items = defaultdict(list)
+    item_rows = db.session.query(OrderItem.order_id, MenuItem.name, OrderItem.quantity) \
+        .join(Order, OrderItem.order_id == Order.id) \
+        .join(MenuItem, OrderItem.menu_item_id == MenuItem.id) \
+        .filter(*criteria) \
+        .order_by(OrderItem.order_id, OrderItem.id)
+    for order_id, name, quantity in item_rows:
+        items[order_id].append({'name': name, 'quantity': quantity})
+
+    return [_queue_entry(row, items[row.id]) for row in rows]
+
+
+def active_queue(restaurant_id):
+    """ Every order of the restaurant that is still in flight. """
+    return queue_entries(Order.restaurant_id == restaurant_id, Order.status.notin_(TERMINAL_ORDER_STATUSES))
+
+
+def recent_orders(restaurant_id, limit=5):
+    """ The restaurant's latest orders for the owner dashboard, in one statement. """
+    item_count = select(func.count(OrderItem.id)).where(OrderItem.order_id == Order.id).correlate(Order).scalar_subquery()
+    rows = db.session.query(Order.id, Order.total_amount, Order.status, User.name, item_count) \
+        .outerjoin(User, Order.user_id == User.id) \
+        .filter(Order.restaurant_id == restaurant_id) \
+        .order_by(Order.created_at.desc()).limit(limit)
+    return [{
+        'id': order_id,
+        'customerName': customer_name,
+        'items': items,
+        'total': total_amount,
+        'status': status.capitalize()
+    } for order_id, total_amount, status, customer_name, items in rows]
@@ -0,0 +1,106 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+# --- Keyset (cursor) pagination for admin lists ---
+# Pages are ordered newest first on a unique key such as (created_at, id).
+# The cursor is the key of the last row served, so fetching the next page is
+# an index range scan from that point instead of an OFFSET that rereads every
+# earlier row. Every list answers with the same envelope:
+#   {"items": [...], "nextCursor": "..." | null, "limit": 50, "total": 1234}
+# where "total" is only computed when the client asks for it with ?count=true.
+
+
+class PaginationError(Exception):
+    """ Raised for a malformed cursor or limit. """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _encode_cursor(values):
+    raw = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError
+        values = []
+        for column, value in zip(columns, raw):
+            python_type = column.type.python_type
+            values.append(datetime.fromisoformat(value) if python_type is datetime else python_type(value))
+        return values
+    except (ValueError, TypeError, NotImplementedError):
+        raise PaginationError("Invalid cursor.")
+
+
+def _after(columns, values):
+    """
+    Rows strictly after the cursor in descending (col1, col2, ...) order. The
+    redundant leading `col1 <= v1` gives every database a plain index range to
+    scan instead of having to plan the OR branches separately.
+    """
+    clauses = []
+    for position, column in enumerate(columns):
+        equal_prefix = [c == v for c, v in zip(columns[:position], values[:position])]
+        clauses.append(and_(*equal_prefix, column < values[position]))
+    return and_(columns[0] <= values[0], or_(*clauses))
+
+
+def page_args():
+    """ (limit, cursor, with_count) from the query string, limit clamped to ADMIN_PAGE_MAX_LIMIT. """
+    default_limit = current_app.config['ADMIN_PAGE_DEFAULT_LIMIT']
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        raise PaginationError("limit must be a number.")
+    limit = max(1, min(limit, current_app.config['ADMIN_PAGE_MAX_LIMIT']))
+    with_count = request.args.get('count', '').lower() in ('1', 'true', 'yes')
+    return limit, request.args.get('cursor') or None, with_count
+
+
+class Page:
+    """ One page of rows plus what is needed to build the response envelope. """
+
+    def __init__(self, rows, next_cursor, limit, total=None):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.limit = limit
+        self.total = total
+
+    def envelope(self, items):
+        envelope = {'items': items, 'nextCursor': self.next_cursor, 'limit': self.limit}
+        if self.total is not None:
+            envelope['total'] = self.total
+        return envelope
+
+
+def paginate(query, columns, key=None):
+    """
+    Runs one page of `query` ordered by `columns` (descending), reading the
+    limit/cursor/count arguments from the request. `key` pulls the cursor
+    values out of a result row; it defaults to the same-named attributes.
+    """
+    limit, cursor, with_count = page_args()
+    total = query.order_by(None).count() if with_count else None
+
+    if cursor:
+        query = query.filter(_after(columns, _decode_cursor(cursor, columns)))
+    rows = query.order_by(*[column.desc() for column in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = key(last) if key else [getattr(last, column.key) for column in columns]
+        next_cursor = _encode_cursor(values)
+    return Page(rows, next_cursor, limit, total)
@@ -0,0 +1,347 @@
+import hashlib
+import hmac
+import itertools
+import logging
+import random
+import re
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import update
+
+from .models import db, Order
+
+logger = logging.getLogger(__name__)
+
+# --- Payment gateway adapter ---
+# Routes talk to a process-wide gateway object (get_gateway()) rather than
+# building a razorpay.Client per request:
+#   - RazorpayGateway keeps one requests.Session with a pooled HTTPS adapter, so
+#     calls reuse warm TLS connections. Every call has a strict (connect, read)
+#     timeout and a bounded number of attempts, with exponential backoff and
+#     full jitter between them.
+#   - A per-process CircuitBreaker opens after PAYMENT_CIRCUIT_FAILURE_THRESHOLD
+#     consecutive failures. While it is open, calls fail at once with
+#     GatewayUnavailable (503) instead of tying up a worker on a gateway that
+#     is down. After PAYMENT_CIRCUIT_RESET_SECONDS one trial call is let through.
+#   - Order creation is idempotent per our order id. The order id is the
+#     Razorpay receipt. create_payment_order() locks the order row first, so
+#     concurrent requests for one order (a double click) take turns and the
+#     later ones reuse the gateway order stored by the first. Razorpay does
+#     not deduplicate receipts itself, so the gateway is asked for an existing
+#     order with that receipt before creating one whenever an earlier attempt
+#     may have reached it: before a retry after an ambiguous failure, and when
+#     the stored id is stale or not the gateway's.
+#   - FakeGateway answers in memory. It is used when no Razorpay keys are
+#     configured (local development) or with PAYMENT_GATEWAY=fake, and by
+#     tests, which can make it fail on demand.
+
+CURRENCY = 'INR'
+RAZORPAY_ORDER_ID = re.compile(r'^order_[A-Za-z0-9]{14}$')
+
+
+class PaymentGatewayError(Exception):
+    """ The gateway rejected or failed a call. """
+
+    def __init__(self, message, status_code=502):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class GatewayUnavailable(PaymentGatewayError):
+    """ The gateway is down or the circuit is open; the client should retry later. """
+
+    def __init__(self, message="The payment gateway is unavailable. Please try again in a moment."):
+        super().__init__(message, status_code=503)
+
+
+class CircuitBreaker:
+    """ Closed -> open after `failure_threshold` consecutive failures -> half-open after `reset_seconds`. """
+
+    def __init__(self, failure_threshold, reset_seconds):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset_seconds else 'open'
+
+    def allow(self):
+        """ Whether a call may go out now. In half-open state only one trial call is allowed. """
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info("Payment gateway circuit closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning("Payment gateway circuit open for %s s after %d failures",
+                               self.reset_seconds, self.failures)
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def to_dict(self):
+        return {'state': self.state, 'consecutiveFailures': self.failures}
+
+
+def sign_payment(order_id, payment_id, secret):
+    """ Razorpay's checkout signature: HMAC-SHA256 of "<order_id>|<payment_id>". """
+    return hmac.new(secret.encode(), f'{order_id}|{payment_id}'.encode(), hashlib.sha256).hexdigest()
+
+
+class RazorpayGateway:
+    """ Razorpay over one pooled session, with timeouts, retries and a circuit breaker. """
+
+    name = 'razorpay'
+
+    def __init__(self, key_id, key_secret, breaker, connect_timeout=3.05, read_timeout=8.0,
+                 max_attempts=3, backoff_seconds=0.25, backoff_max_seconds=2.0, pool_size=10, base_url=None):
+        import razorpay # Imported on first use (pulls in requests)
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        # Retries are ours (below); the adapter only pools connections
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        options = {'base_url': base_url} if base_url else {}
+        self.client = razorpay.Client(session=session, auth=(key_id, key_secret), **options)
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.breaker = breaker
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._requests = requests
+        self._errors = razorpay.errors
+
+    def _classify(self, error):
+        """ (retryable, ambiguous): ambiguous means the request may have been processed. """
+        if isinstance(error, self._requests.exceptions.ConnectTimeout):
+            return True, False
+        if isinstance(error, (self._requests.exceptions.ConnectionError, self._requests.exceptions.Timeout)):
+            return True, True
+        if isinstance(error, (self._errors.ServerError, self._errors.GatewayError)):
+            return True, True
+        return False, False
+
+    def _call(self, operation, description, before_retry=None):
+        """
+        Runs operation() with retries. `before_retry` runs ahead of each retry that
+        follows an ambiguous failure; a non-None result is returned instead of retrying.
+        """
+        for attempt in range(self.max_attempts):
+            if not self.breaker.allow():
+                raise GatewayUnavailable()
+            try:
+                result = operation()
+            except self._errors.BadRequestError as e:
+                self.breaker.record_success() # The gateway is up; the request was wrong
+                raise PaymentGatewayError(f"The payment gateway rejected the request: {e}") from e
+            except Exception as e:
+                retryable, ambiguous = self._classify(e)
+                self.breaker.record_failure()
+                if not retryable:
+                    raise PaymentGatewayError(f"Payment gateway error: {e}") from e
+                logger.warning("Razorpay %s failed (attempt %d/%d): %s", description, attempt + 1, self.max_attempts, e)
+                if attempt + 1 == self.max_attempts:
+                    raise GatewayUnavailable() from e
+                # Full jitter keeps retries from many workers from arriving together
+                time.sleep(random.uniform(0, min(self.backoff_max_seconds, self.backoff_seconds * 2 ** attempt)))
+                if ambiguous and before_retry is not None:
+                    found = self._lookup(before_retry)
+                    if found is not None:
+                        return found
+            else:
+                self.breaker.record_success()
+                return result
+
+    def _lookup(self, lookup):
+        """ Part of the call the breaker already let through, so it does not count towards its health. """
+        try:
+            return lookup()
+        except Exception as e:
+            logger.warning("Razorpay lookup before retry failed: %s", e)
+            return None
+
+    def _find_order(self, receipt, amount):
+        """ An existing, unpaid gateway order for `receipt` and `amount`, or None (single attempt). """
+        response = self.client.order.all({'receipt': receipt}, timeout=self.timeout)
+        for gateway_order in response.get('items', []):
+            if gateway_order.get('amount') == amount and gateway_order.get('status') != 'paid':
+                return gateway_order
+        return None
+
+    def find_order(self, receipt, amount):
+        """ Like _find_order(), with retries and the circuit breaker. """
+        return self._call(lambda: self._find_order(receipt, amount), 'order lookup')
+
+    def create_order(self, amount, receipt, notes=None):
+        """ Creates (or, after an ambiguous failure, finds) the gateway order for `receipt`. """
+        data = {'amount': amount, 'currency': CURRENCY, 'receipt': receipt, 'payment_capture': 1, 'notes': notes or {}}
+        return self._call(lambda: self.client.order.create(data, timeout=self.timeout), 'order create',
+                          before_retry=lambda: self._find_order(receipt, amount))
+
+    def owns(self, gateway_order_id):
+        """ Whether an id stored on an order came from this gateway (not a fake/legacy mock id). """
+        return bool(RAZORPAY_ORDER_ID.match(gateway_order_id or ''))
+
+    def verify_payment_signature(self, order_id, payment_id, signature):
+        return hmac.compare_digest(sign_payment(order_id, payment_id, self.key_secret), signature or '')
+
+
+class FakeGateway:
+    """
+    In-memory stand-in for local development and tests. Orders are idempotent
+    per receipt like the real adapter; any checkout signature is accepted.
+    fail_next(n) makes the next n calls fail as if the gateway were down.
+    """
+
+    name = 'fake'
+    key_id = 'test-key'
+
+    def __init__(self, breaker=None):
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_seconds=30)
+        self.orders = {}
+        self.calls = 0
+        self._failures_left = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def fail_next(self, count=1):
+        self._failures_left = count
+
+    def find_order(self, receipt, amount):
+        if not self.breaker.allow():
+            raise GatewayUnavailable()
+        self.breaker.record_success()
+        existing = self.orders.get(receipt)
+        return dict(existing) if existing is not None and existing['amount'] == amount else None
+
+    def create_order(self, amount, receipt, notes=None):
+        if not self.breaker.allow():
+            raise GatewayUnavailable()
+        with self._lock:
+            self.calls += 1
+            if self._failures_left:
+                self._failures_left -= 1
+                self.breaker.record_failure()
+                raise GatewayUnavailable()
+            existing = self.orders.get(receipt)
+            if existing is None or existing['amount'] != amount:
+                existing = {'id': f'order_fake_{next(self._ids)}', 'entity': 'order', 'amount': amount,
+                            'currency': CURRENCY, 'receipt': receipt, 'status': 'created', 'notes': notes or {}}
+                self.orders[receipt] = existing
+        self.breaker.record_success()
+        return dict(existing)
+
+    def owns(self, gateway_order_id):
+        return (gateway_order_id or '').startswith('order_fake_')
+
+    def verify_payment_signature(self, order_id, payment_id, signature):
+        return True
+
+
+def _build_gateway(config):
+    breaker = CircuitBreaker(config['PAYMENT_CIRCUIT_FAILURE_THRESHOLD'], config['PAYMENT_CIRCUIT_RESET_SECONDS'])
+    kind = config['PAYMENT_GATEWAY'] or ('razorpay' if config.get('RAZORPAY_KEY_ID') and config.get('RAZORPAY_KEY_SECRET') else 'fake')
+    if kind == 'fake':
+        logger.warning("Using the fake payment gateway: payments are simulated and not verified")
+        return FakeGateway(breaker)
+    return RazorpayGateway(
+        config['RAZORPAY_KEY_ID'], config['RAZORPAY_KEY_SECRET'], breaker,
+        connect_timeout=config['PAYMENT_GATEWAY_CONNECT_TIMEOUT'],
+        read_timeout=config['PAYMENT_GATEWAY_READ_TIMEOUT'],
+        max_attempts=config['PAYMENT_GATEWAY_MAX_ATTEMPTS'],
+        backoff_seconds=config['PAYMENT_GATEWAY_BACKOFF_SECONDS'],
+        backoff_max_seconds=config['PAYMENT_GATEWAY_BACKOFF_MAX_SECONDS'],
+        pool_size=config['PAYMENT_GATEWAY_POOL_SIZE'],
+        base_url=config['RAZORPAY_BASE_URL']
+    )
+
+
+_gateway_lock = threading.Lock()
+
+
+def get_gateway(app=None):
+    """ The process's payment gateway, created on first use (so after any fork). """
+    app = app or current_app._get_current_object()
+    gateway = app.extensions.get('payment_gateway')
+    if gateway is None:
+        with _gateway_lock:
+            gateway = app.extensions.get('payment_gateway')
+            if gateway is None:
+                gateway = app.extensions['payment_gateway'] = _build_gateway(app.config)
+    return gateway
+
+
+def set_gateway(app, gateway):
+    """ Replaces the app's gateway (tests: a FakeGateway with injected failures). """
+    app.extensions['payment_gateway'] = gateway
+
+
+def amount_in_paise(order):
+    return int(round(order.total_amount * 100))
+
+
+def _lock_order(order):
+    """
+    Locks the order's row until the caller commits or rolls back, then reloads
+    it. A no-op UPDATE rather than SELECT ... FOR UPDATE, so SQLite (which
+    ignores FOR UPDATE) serializes concurrent requests too.
+    """
+    db.session.execute(
+        update(Order).where(Order.id == order.id).values(payment_amount=Order.payment_amount),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.refresh(order)
+
+
+def create_payment_order(order):
+    """
+    The gateway order id for our `order`, creating it at most once: a stored
+    gateway order for the same amount is reused without calling the gateway.
+    The order row stays locked until the caller commits (or rolls back on
+    PaymentGatewayError). Sets order.razorpay_order_id/payment_amount.
+    """
+    gateway = get_gateway()
+    _lock_order(order)
+    if order.payment_status == 'paid':
+        raise PaymentGatewayError("This order is already paid.", status_code=400)
+    if order.razorpay_order_id and order.payment_amount == order.total_amount and gateway.owns(order.razorpay_order_id):
+        return order.razorpay_order_id
+
+    amount, receipt = amount_in_paise(order), str(order.id)
+    gateway_order = None
+    if order.razorpay_order_id:
+        # Stale or not the gateway's: an earlier attempt may still have created one for this receipt
+        gateway_order = gateway.find_order(receipt, amount)
+    if gateway_order is None:
+        gateway_order = gateway.create_order(amount, receipt, notes={'order_id': receipt})
+    order.razorpay_order_id = gateway_order['id']
+    order.payment_amount = order.total_amount
+    return order.razorpay_order_id
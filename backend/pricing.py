@@ -0,0 +1,160 @@
+from sqlalchemy import or_
+
+from .models import db, MenuItem, Coupon, OrderItem
+
+
+class PricingError(Exception):
+    """ Raised when a cart cannot be priced (bad item, empty cart, ...). """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class QuoteLine:
+    """ A single priced cart line. """
+
+    def __init__(self, menu_item, quantity):
+        self.menu_item = menu_item
+        self.quantity = quantity
+        self.unit_price = menu_item.price
+        self.line_total = menu_item.price * quantity
+
+    def to_order_item(self):
+        return OrderItem(
+            menu_item_id=self.menu_item.id,
+            quantity=self.quantity,
+            price_at_order=self.unit_price
+        )
+
+
+class Quote:
+    """
+    The priced result of a cart: lines, subtotal, coupon discount and
+    restaurant fees. Amounts are rounded the same way orders store them.
+    """
+
+    def __init__(self, restaurant, lines, coupon_code=None, coupon=None, include_fees=True):
+        self.restaurant = restaurant
+        self.lines = lines
+        self.coupon_code = coupon_code
+        self.coupon = coupon
+        self.subtotal = sum(line.line_total for line in lines)
+        self.discount_amount = compute_discount(coupon, self.subtotal) if coupon else 0.0
+        if include_fees:
+            self.delivery_fee = restaurant.delivery_fee or 0.0
+            self.platform_fee = restaurant.platform_fee or 0.0
+        else:
+            self.delivery_fee = 0.0
+            self.platform_fee = 0.0
+
+    @property
+    def coupon_rejected(self):
+        """ True when a coupon code was supplied but did not apply. """
+        return bool(self.coupon_code) and self.coupon is None
+
+    @property
+    def total(self):
+        return max(0, self.subtotal - self.discount_amount) + self.delivery_fee + self.platform_fee
+
+    def order_items(self):
+        return [line.to_order_item() for line in self.lines]
+
+    def order_fields(self):
+        """ Pricing columns for a new Order, rounded for storage. """
+        return {
+            'total_amount': round(self.total, 2),
+            'coupon_code': self.coupon_code if self.coupon else None,
+            'discount_amount': round(self.discount_amount, 2),
+            'delivery_fee': round(self.delivery_fee, 2),
+            'platform_fee': round(self.platform_fee, 2),
+            'items': self.order_items()
+        }
+
+    def to_dict(self):
+        return {
+            'restaurantId': self.restaurant.id,
+            'items': [{
+                'menuItemId': line.menu_item.id,
+                'name': line.menu_item.name,
+                'quantity': line.quantity,
+                'unitPrice': line.unit_price,
+                'lineTotal': round(line.line_total, 2)
+            } for line in self.lines],
+            'subtotal': round(self.subtotal, 2),
+            'couponCode': self.coupon_code if self.coupon else None,
+            'discount': round(self.discount_amount, 2),
+            'deliveryFee': round(self.delivery_fee, 2),
+            'platformFee': round(self.platform_fee, 2),
+            'total': round(self.total, 2)
+        }
+
+
+def compute_discount(coupon, subtotal):
+    """ Discount a coupon gives on a subtotal, never more than the subtotal itself. """
+    if coupon.discount_type == 'Percentage':
+        discount = (subtotal * coupon.discount_value) / 100
+    else:  # Fixed amount
+        discount = coupon.discount_value
+    return max(0.0, min(discount, subtotal))
+
+
+def find_coupon(code, restaurant_id):
+    """ Active coupon matching the code that is platform-wide or belongs to the restaurant. """
+    if not code:
+        return None
+    return Coupon.query.filter(
+        Coupon.code == code,
+        Coupon.is_active == True,
+        or_(Coupon.restaurant_id == None, Coupon.restaurant_id == restaurant_id)
+    ).first()
+
+
+def _parse_cart(cart_items):
+    """ Normalises the raw cart payload into (menu_item_id, quantity) pairs. """
+    parsed = []
+    for item_data in cart_items or []:
+        if not isinstance(item_data, dict):
+            raise PricingError("An item in your cart is invalid or unavailable.")
+        try:
+            menu_item_id = int(item_data.get('menu_item_id'))
+            quantity = int(item_data.get('quantity'))
+        except (TypeError, ValueError):
+            raise PricingError("An item in your cart is invalid or unavailable.")
+        if quantity <= 0:
+            raise PricingError("Item quantities must be at least 1.")
+        parsed.append((menu_item_id, quantity))
+    return parsed
+
+
+def price_cart(restaurant, cart_items, coupon_code=None, include_fees=True):
+    """
+    Prices a cart for a restaurant.
+
+    All requested menu items are loaded with a single IN (...) query and
+    validated in memory (exists, available, belongs to the restaurant); the
+    coupon is looked up with one more query. Raises PricingError when the
+    cart is empty or contains an invalid item. An inapplicable coupon does not
+    raise: the quote simply carries no discount and `coupon_rejected` is set,
+    so callers can decide how strict to be.
+    """
+    parsed = _parse_cart(cart_items)
+    if not parsed:
+        raise PricingError("Cannot place an empty order.")
+
+    ids = {menu_item_id for menu_item_id, _ in parsed}
+    menu_items = {
+        item.id: item
+        for item in db.session.query(MenuItem).filter(MenuItem.id.in_(ids)).all()
+    }
+
+    lines = []
+    for menu_item_id, quantity in parsed:
+        menu_item = menu_items.get(menu_item_id)
+        if not menu_item or not menu_item.is_available or menu_item.restaurant_id != restaurant.id:
+            raise PricingError("An item in your cart is invalid or unavailable.")
+        lines.append(QuoteLine(menu_item, quantity))
+
+    coupon = find_coupon(coupon_code, restaurant.id)
+    return Quote(restaurant, lines, coupon_code=coupon_code, coupon=coupon, include_fees=include_fees)
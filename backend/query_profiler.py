@@ -0,0 +1,257 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# --- SQL query profiler ---
+# While a QueryProfile is active on a thread, every statement the thread sends
+# to the database is recorded under a fingerprint: the SQL with literals,
+# bind markers and IN-lists collapsed, so the same query run with different
+# ids counts as one statement run N times. A SELECT repeated at least
+# QUERY_PROFILER_N_PLUS_ONE_THRESHOLD times in one profile is flagged as a
+# likely N+1 loop, with the backend line that first issued it.
+#
+# Requests are profiled when QUERY_PROFILER_ENABLED is set, or when they send
+# an X-Query-Profile header and QUERY_PROFILER_HEADER_ENABLED allows it (the
+# default in development). A profiled response carries a one-line summary in
+# its X-Query-Profile header; the full report is kept (the last
+# QUERY_PROFILER_KEEP per process) for GET /api/admin/query-profiles/<id>, and
+# logged when an N+1 is suspected.
+#
+# Outside requests, query_budget() profiles a block and fails if it runs too
+# many statements, e.g. in a test:
+#
+#     with query_budget(max_queries=3, max_repeats=1):
+#         client.get('/api/favorites', headers=headers)
+
+PROFILE_HEADER = 'X-Query-Profile'
+SELECT_PREFIXES = ('select', 'with')
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+_SKIP_FILES = {os.path.abspath(__file__), os.path.join(_BACKEND_DIR, 'instrumentation.py')}
+
+_STRING_LITERALS = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERALS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_BIND_MARKERS = re.compile(r'%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|__\[POSTCOMPILE_\w+\]')
+_IN_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """ Raised by query_budget() when a block runs more (or more repeated) statements than allowed. """
+
+
+def fingerprint(statement):
+    """ The statement with literals and bind parameters replaced by '?' and IN-lists collapsed. """
+    statement = _STRING_LITERALS.sub('?', statement)
+    statement = _NUMBER_LITERALS.sub('?', statement)
+    statement = _BIND_MARKERS.sub('?', statement)
+    statement = _IN_LISTS.sub('(?)', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+def _caller():
+    """ 'routes.py:123 in get_favorites' for the innermost backend frame outside the profiling code. """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_BACKEND_DIR) and filename not in _SKIP_FILES:
+            return f'{os.path.basename(filename)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+class StatementStats:
+    """ How often, and for how long, one fingerprint ran. """
+    __slots__ = ('fingerprint', 'count', 'ms', 'location')
+
+    def __init__(self, statement_fingerprint, location):
+        self.fingerprint = statement_fingerprint
+        self.count = 0
+        self.ms = 0.0
+        self.location = location
+
+    @property
+    def is_select(self):
+        return self.fingerprint.lower().startswith(SELECT_PREFIXES)
+
+    def to_dict(self):
+        return {'sql': self.fingerprint, 'count': self.count, 'ms': round(self.ms, 2), 'location': self.location}
+
+
+class QueryProfile:
+    """ The statements run on one thread while the profile is active. """
+
+    def __init__(self, label=None, n_plus_one_threshold=5):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.queries = 0
+        self.ms = 0.0
+        self.statements = {}
+
+    def record(self, statement, elapsed_ms):
+        key = fingerprint(statement)
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = StatementStats(key, _caller())
+        stats.count += 1
+        stats.ms += elapsed_ms
+        self.queries += 1
+        self.ms += elapsed_ms
+
+    @property
+    def repeated(self):
+        """ Statements run more than once, most frequent first. """
+        return sorted((stats for stats in self.statements.values() if stats.count > 1),
+                      key=lambda stats: stats.count, reverse=True)
+
+    @property
+    def n_plus_one(self):
+        """ SELECTs repeated often enough to look like a query per row of an earlier result. """
+        return [stats for stats in self.repeated
+                if stats.is_select and stats.count >= self.n_plus_one_threshold]
+
+    def summary(self):
+        """ One line for the response header. """
+        return (f'id={self.id}; queries={self.queries}; db-ms={self.ms:.1f}; '
+                f'repeated={len(self.repeated)}; n-plus-one={len(self.n_plus_one)}')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'label': self.label,
+            'queries': self.queries,
+            'ms': round(self.ms, 2),
+            'nPlusOne': [stats.to_dict() for stats in self.n_plus_one],
+            'statements': [stats.to_dict() for stats in
+                           sorted(self.statements.values(), key=lambda stats: stats.ms, reverse=True)]
+        }
+
+    def format(self):
+        """ Human-readable report: totals, then each statement with its count, time and origin. """
+        lines = [f'{self.queries} statements, {self.ms:.1f} ms' + (f' ({self.label})' if self.label else '')]
+        for stats in sorted(self.statements.values(), key=lambda stats: stats.count, reverse=True):
+            flag = '  N+1?' if stats in self.n_plus_one else ''
+            lines.append(f'  {stats.count:4}x {stats.ms:7.1f} ms  {stats.location or "-"}{flag}')
+            lines.append(f'        {stats.fingerprint[:200]}')
+        return '\n'.join(lines)
+
+
+# --- Collection ---
+
+_local = threading.local()
+
+
+def _active_profiles():
+    profiles = getattr(_local, 'profiles', None)
+    if profiles is None:
+        profiles = _local.profiles = []
+    return profiles
+
+
+@contextmanager
+def profiling(profile):
+    """ Records this thread's statements into `profile` for the duration of the block. """
+    profiles = _active_profiles()
+    profiles.append(profile)
+    try:
+        yield profile
+    finally:
+        profiles.remove(profile)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _active_profiles():
+        context._query_profile_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_profile_start', None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for profile in _active_profiles():
+        profile.record(statement, elapsed_ms)
+
+
+@contextmanager
+def query_budget(max_queries=None, max_repeats=None, label=None):
+    """
+    Profiles the block and raises QueryBudgetExceeded if it ran more than
+    `max_queries` statements, or any one statement more than `max_repeats` times.
+    """
+    profile = QueryProfile(label)
+    with profiling(profile):
+        yield profile
+
+    problems = []
+    if max_queries is not None and profile.queries > max_queries:
+        problems.append(f'{profile.queries} statements (budget {max_queries})')
+    if max_repeats is not None:
+        problems += [f'{stats.count}x from {stats.location or "?"}: {stats.fingerprint[:120]}'
+                     for stats in profile.repeated if stats.count > max_repeats]
+    if problems:
+        raise QueryBudgetExceeded('Query budget exceeded:\n  ' + '\n  '.join(problems) + '\n' + profile.format())
+
+
+# --- Request profiling ---
+
+def get_profile_reports(app=None):
+    app = app or current_app._get_current_object()
+    return app.extensions['query_profiles']
+
+
+def find_profile_report(profile_id):
+    """ A kept report by id, or None. """
+    for report in list(get_profile_reports()):
+        if report['id'] == profile_id:
+            return report
+    return None
+
+
+def init_app(app):
+    """ Registers the request hooks that profile requests when enabled. """
+    reports = app.extensions['query_profiles'] = deque(maxlen=app.config['QUERY_PROFILER_KEEP'])
+
+    @app.before_request
+    def _start_query_profile():
+        if app.config['QUERY_PROFILER_ENABLED'] or \
+                (app.config['QUERY_PROFILER_HEADER_ENABLED'] and request.headers.get(PROFILE_HEADER)):
+            profile = QueryProfile(f'{request.method} {request.path}',
+                                   app.config['QUERY_PROFILER_N_PLUS_ONE_THRESHOLD'])
+            _active_profiles().append(profile)
+            g.query_profile = profile
+
+    @app.after_request
+    def _finish_query_profile(response):
+        profile = g.get('query_profile')
+        if profile is None:
+            return response
+        report = dict(profile.to_dict(), status=response.status_code)
+        reports.append(report)
+        response.headers[PROFILE_HEADER] = profile.summary()
+        if report['nPlusOne']:
+            logger.warning('Possible N+1 queries: %s', json.dumps(report))
+        return response
+
+    @app.teardown_request
+    def _stop_query_profile(exc):
+        profile = g.pop('query_profile', None)
+        profiles = _active_profiles()
+        if profile is not None and profile in profiles:
+            profiles.remove(profile)
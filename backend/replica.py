@@ -0,0 +1,189 @@
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, has_request_context
+from flask_security import current_user
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# --- Read-replica routing ---
+# With DATABASE_REPLICA_URL set, the replica is configured as the 'replica'
+# bind and db.session is a RoutingSession. Views decorated with
+# @read_only_view (and code inside `with read_only():`) send their reads to the
+# replica; everything else, and any flush or INSERT/UPDATE/DELETE, goes to the
+# primary. Routing falls back to the primary when:
+#   - no replica is configured;
+#   - the replica cannot be reached, or lags the primary by more than
+#     DATABASE_REPLICA_MAX_LAG_SECONDS (checked at most every
+#     REPLICA_HEALTH_CHECK_SECONDS per process);
+#   - the signed-in user wrote something in the last READ_YOUR_WRITES_SECONDS
+#     (mark_recent_write(), e.g. after placing an order), so they see it.
+#
+# Views whose result fills a tagged cache (featured, restaurant detail) stay
+# on the primary: a lagging read there would be cached under a fresh
+# generation and served until the next invalidation. For the same reason
+# process-wide state built inside a routed view (the nearby grid in geo.py)
+# loads under `with on_primary():`.
+#
+# Locally, copy the SQLite database and point DATABASE_REPLICA_URL at the copy
+# (see benchmarks/check_replica_routing.py).
+
+REPLICA_BIND = 'replica'
+RECENT_WRITE_PREFIX = 'recent-write:'
+
+# Seconds the replica has yet to replay, 0 when it has applied everything it received
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class RoutingSession(Session):
+    """ Flask-SQLAlchemy session that reads from the replica while a read-only route is active. """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, 'is_dml', False) \
+                and has_app_context() and g.get('db_route') == REPLICA_BIND:
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaHealth:
+    """ Per-process, rate-limited answer to "is the replica usable right now?". """
+
+    def __init__(self, max_lag, check_interval):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._usable = False
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def usable(self, engine):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._usable
+        with self._lock:
+            if self._checked_at is None or now - self._checked_at >= self.check_interval:
+                self._usable = self._check(engine)
+                self._checked_at = now
+        return self._usable
+
+    def _check(self, engine):
+        try:
+            with engine.connect() as connection:
+                if engine.dialect.name == 'postgresql':
+                    lag = float(connection.execute(POSTGRES_LAG_SQL).scalar() or 0)
+                else:
+                    connection.execute(text('SELECT 1'))
+                    lag = 0.0
+        except Exception as e:
+            logger.warning("Read replica unavailable, using the primary: %s", e)
+            return False
+        if lag > self.max_lag:
+            logger.warning("Read replica is %.1f s behind, using the primary", lag)
+            return False
+        return True
+
+    def reset(self):
+        with self._lock:
+            self._checked_at = None
+
+
+def replica_engine():
+    """ The replica's engine, or None when no replica is configured. """
+    return current_app.extensions['sqlalchemy'].engines.get(REPLICA_BIND)
+
+
+def get_replica_health(app=None):
+    app = app or current_app._get_current_object()
+    return app.extensions['replica_health']
+
+
+# --- Read-your-writes ---
+
+def mark_recent_write(user_id):
+    """ Keeps the user's routed reads on the primary for READ_YOUR_WRITES_SECONDS. Call after commit. """
+    seconds = current_app.config['READ_YOUR_WRITES_SECONDS']
+    if not seconds or replica_engine() is None:
+        return
+    from .extensions import cache
+    try:
+        cache.set(RECENT_WRITE_PREFIX + str(user_id), 1, timeout=seconds)
+    except Exception as e:
+        logger.warning("Could not mark a recent write for user %s: %s", user_id, e)
+
+
+def _recent_writer():
+    if not current_app.config['READ_YOUR_WRITES_SECONDS'] or not has_request_context() \
+            or not current_user.is_authenticated:
+        return False
+    from .extensions import cache
+    try:
+        return cache.get(RECENT_WRITE_PREFIX + str(current_user.id)) is not None
+    except Exception:
+        return True # Cannot tell, so stay safe
+
+
+# --- Marking read-only code ---
+
+def choose_route():
+    """ 'replica' if reads can go to the replica now, else 'primary'. """
+    engine = replica_engine()
+    if engine is None or _recent_writer() or not get_replica_health().usable(engine):
+        return 'primary'
+    return REPLICA_BIND
+
+
+@contextmanager
+def read_only():
+    """ Routes the block's reads to the replica when it is usable. """
+    previous = g.get('db_route')
+    g.db_route = choose_route()
+    try:
+        yield g.db_route
+    finally:
+        g.db_route = previous
+
+
+@contextmanager
+def on_primary():
+    """
+    Sends the block's reads to the primary, even inside a read-only route. For
+    data kept beyond the request (process-wide indexes), where replica lag
+    would outlive the request.
+    """
+    if not has_app_context():
+        yield
+        return
+    previous = g.get('db_route')
+    g.db_route = 'primary'
+    try:
+        yield
+    finally:
+        g.db_route = previous
+
+
+def read_only_view(view):
+    """
+    Routes a view's reads to the replica when it is usable. The route lasts
+    for the rest of the request, so streamed responses read from it too.
+    Put it below auth_required/roles_required, so the user is loaded from the primary.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_route = choose_route()
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_app(app):
+    """ Sets up the replica health check (routing itself needs DATABASE_REPLICA_URL). """
+    app.extensions['replica_health'] = ReplicaHealth(app.config['DATABASE_REPLICA_MAX_LAG_SECONDS'],
+                                                     app.config['REPLICA_HEALTH_CHECK_SECONDS'])
@@ -3,6 +3,7 @@ import string
 from flask_restful import Resource, reqparse, fields, marshal_with
 from flask_security import auth_required, current_user
 from .models import db, User, Restaurant, MenuItem, Category, Order, OrderItem, Coupon
+from .pricing import price_cart, PricingError
 from datetime import datetime
 
 # ... (user_fields, menu_item_fields, etc. are unchanged) ...
@@ -103,55 +104,24 @@ class OrderAPI(Resource):
         args = order_parser.parse_args()
         
         restaurant = Restaurant.query.get_or_404(args['restaurant_id'])
-        
-        total_amount = 0
-        order_items_to_create = []
-
-        for item_data in args['items']:
-            menu_item = MenuItem.query.get(item_data['menu_item_id'])
-            if not menu_item or not menu_item.is_available or menu_item.restaurant_id != restaurant.id:
-                return {'message': f"Menu item with id {item_data['menu_item_id']} is invalid or unavailable"}, 400
-            
-            quantity = item_data['quantity']
-            total_amount += menu_item.price * quantity
-            
-            order_items_to_create.append(OrderItem(
-                menu_item_id=menu_item.id,
-                quantity=quantity,
-                price_at_order=menu_item.price
-            ))
-
-        if not order_items_to_create:
-            return {'message': 'Order must contain at least one item'}, 400
 
         # --- ✅ START: MODIFIED LOGIC FOR COUPONS AND SCHEDULING ---
-        final_amount = total_amount
-        discount_amount = 0
-        coupon_id = None
-
-        if args['coupon_code']:
-            coupon = Coupon.query.filter_by(code=args['coupon_code'], is_active=True).first()
-            if coupon and (coupon.restaurant_id is None or coupon.restaurant_id == restaurant.id):
-                coupon_id = coupon.id
-                if coupon.discount_type == 'Percentage':
-                    discount_amount = (total_amount * coupon.discount_value) / 100
-                elif coupon.discount_type == 'Fixed':
-                    discount_amount = coupon.discount_value
-                final_amount = max(0, total_amount - discount_amount)
-            else:
-                return {'message': 'Invalid or expired coupon code.'}, 400
+        try:
+            quote = price_cart(restaurant, args['items'], coupon_code=args['coupon_code'])
+        except PricingError as e:
+            return {'message': e.message}, e.status_code
+
+        if quote.coupon_rejected:
+            return {'message': 'Invalid or expired coupon code.'}, 400
 
         # Create the base order object
         new_order_data = {
             'user_id': current_user.id,
             'restaurant_id': restaurant.id,
-            'total_amount': round(final_amount, 2),
             'order_type': args['order_type'],
             'otp': ''.join(random.choices(string.digits, k=6)),
             'qr_payload': ''.join(random.choices(string.ascii_letters + string.digits, k=20)),
-            'items': order_items_to_create,
-            'coupon_id': coupon_id,
-            'discount_amount': round(discount_amount, 2)
+            **quote.order_fields()
         }
 
         # Add scheduling info only if the order is scheduled
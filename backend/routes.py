@@ -1,32 +1,44 @@
-from flask import current_app as app, jsonify, request, render_template, send_file, redirect
-from .extensions import api, cache
+from flask import current_app as app, jsonify, request, render_template, send_file, redirect, abort
+from .extensions import api
 from flask_security import auth_required, roles_required, current_user,verify_password
 from werkzeug.security import check_password_hash
-import io
-import openpyxl
-import math
-import requests
-import time
-import threading
-from PIL import Image
-import uuid
-import sys
 import os
-import razorpay
 import hmac
 import hashlib
+import logging
 
 from .models import db, User, Role, Restaurant ,RolesUsers,Order,OrderItem,MenuItem,Review,Category,RewardPoint,Coupon,TimeSlot
+from .models import Job
 from .security import user_datastore
 from .resources import RestaurantListAPI, RestaurantAPI, OrderAPI
-from sqlalchemy import func,Date, or_
+from .pricing import price_cart, find_coupon, compute_discount, PricingError
+from .aggregates import record_review, forget_review, record_order_items, popular_items
+from .geo import nearby_from_index, nearby_from_db
+from .cache_tags import cached_view, invalidate_tags, restaurant_tag, FEATURED_TAG
+from .menu_snapshot import get_menu_snapshot, publish_menu_snapshot
+from .pagination import paginate, PaginationError
+from .exports import ExportFilters, ExportError, export_format, export_response, restaurant_rows, user_rows, order_rows
+from .jobs import submit_job, job_to_dict, new_artifact_path, JobError
+from .menu_import import import_menu_file, menu_file_format, MenuImportError
+from .order_events import publish_order_event, order_event_stream, get_broker, ORDER_CREATED
+from .order_queue import active_queue, recent_orders
+from .timezones import to_ist
+from .scheduler import schedule_otp_expiry, order_otp
+from .sales_rollup import set_order_status, report_range, sales_totals, daily_sales, top_restaurants, ReportError
+from .instrumentation import get_request_stats
+from .query_profiler import get_profile_reports, find_profile_report
+from .static_assets import reload_static_assets
+from .payments import create_payment_order, get_gateway, amount_in_paise, PaymentGatewayError
+from .replica import read_only_view, mark_recent_write
+from .images import store_image, image_srcset_fields, ImageError, ALLOWED_EXTENSIONS as ALLOWED_IMAGE_EXTENSIONS
+from sqlalchemy import func,Date, or_, select
 from datetime import datetime, date,timedelta
 
 from sqlalchemy.orm import joinedload
 import random
 import string
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+
+logger = logging.getLogger(__name__)
 
 # --- ============================= ---
 # --- CORE AUTHENTICATION API ROUTES ---
@@ -38,32 +50,6 @@ from werkzeug.security import check_password_hash
 # Make sure to import the user_datastore from your security file
 from .security import user_datastore
 
-# --- ✅ NEW: IMPORT FOR ONE-TIME DATABASE SETUP ---
-from .create_initial_data import init_app as initialize_database
-# --- END NEW IMPORT ---
-
-# --- ✅ NEW: TEMPORARY ROUTE TO SET UP DATABASE ---
-# --- Visit this URL ONCE after deploying to Render ---
-@app.route('/api/admin/run-db-setup', methods=['GET'])
-def temp_setup_database():
-    """
-    This is a temporary, one-time-use endpoint to initialize
-    your roles and create the admin user on Render.
-    """
-    print("--- [TEMP SETUP] STARTING DATABASE INITIALIZATION ---")
-    try:
-        # Pass the actual app object to the function
-        initialize_database(app._get_current_object()) 
-        print("--- [TEMP SETUP] DATABASE INITIALIZATION COMPLETE ---")
-        return jsonify({
-            "status": "success",
-            "message": "Database setup complete! Check Render logs for details. You can now log in with admin@crav.com / admin123"
-        }), 200
-    except Exception as e:
-        error_message = f"Error during temp setup: {str(e)}"
-        print(f"--- [TEMP SETUP] ERROR: {error_message} ---", file=sys.stderr)
-        return jsonify({"status": "error", "message": error_message}), 500
-# --- END NEW ROUTE ---
 
 @app.route('/api/config', methods=['GET'])
 def get_config():
@@ -101,10 +87,9 @@ def login():
             }
         }), 200
         
-    except Exception as e:
-        # Rollback the session immediately if it's aborted (like with InFailedSqlTransaction)
-        db.session.rollback()
-        print(f"CRITICAL LOGIN ERROR: {e}")
+    except Exception:
+        # The failed transaction is rolled back at the end of the request (backend/database.py)
+        logger.exception("Login failed")
         # Return a generic 500 error to the client
         return jsonify({"message": "An internal server error occurred. Please try again."}), 500
 
@@ -127,6 +112,13 @@ def register_customer():
     return jsonify({"message": "Customer account created successfully"}), 201
 
 
+def _verify_google_token(token, client_id):
+    # Imported on first use: google-auth (and requests under it) are slow to import
+    from google.oauth2 import id_token
+    from google.auth.transport import requests as google_requests
+    return id_token.verify_oauth2_token(token, google_requests.Request(), client_id)
+
+
 @app.route('/api/google-login', methods=['POST'])
 def google_login():
     data = request.get_json()
@@ -138,13 +130,13 @@ def google_login():
         # Verify the token
         client_id = app.config.get('GOOGLE_CLIENT_ID')
         if not client_id:
-            print("GOOGLE LOGIN ERROR: GOOGLE_CLIENT_ID not found in app config")
+            logger.error("Google login: GOOGLE_CLIENT_ID not found in app config")
             return jsonify({"message": "Google Client ID not configured on server"}), 500
 
         try:
-            idinfo = id_token.verify_oauth2_token(token, google_requests.Request(), client_id)
+            idinfo = _verify_google_token(token, client_id)
         except Exception as ve:
-            print(f"GOOGLE TOKEN VERIFICATION ERROR: {ve}")
+            logger.warning("Google token verification failed: %s", ve)
             return jsonify({"message": f"Token verification failed: {str(ve)}"}), 401
 
         # ID token is valid. Get the user's Google ID and email.
@@ -178,8 +170,8 @@ def google_login():
             }
         }), 200
 
-    except Exception as e:
-        print(f"GOOGLE LOGIN GENERAL ERROR: {e}")
+    except Exception:
+        logger.exception("Google login failed")
         return jsonify({"message": "An error occurred during Google Sign-In. Please try again."}), 500
 
 
@@ -197,7 +189,7 @@ def google_login_redirect():
         if not client_id:
             return redirect('/login?error=Server configuration error')
 
-        idinfo = id_token.verify_oauth2_token(token, google_requests.Request(), client_id)
+        idinfo = _verify_google_token(token, client_id)
         email = idinfo['email']
         name = idinfo.get('name', '')
 
@@ -218,8 +210,8 @@ def google_login_redirect():
         # Redirect back to the frontend login page with the token
         return redirect(f'/login?google_token={auth_token}&email={email}&name={name}')
 
-    except Exception as e:
-        print(f"GOOGLE REDIRECT ERROR: {e}")
+    except Exception:
+        logger.exception("Google redirect login failed")
         return redirect('/login?error=Google Sign-In failed')
 
 
@@ -265,7 +257,7 @@ def register_restaurant():
 @auth_required('token')
 @roles_required('admin')
 def get_all_restaurants():
-    """ Fetches all restaurants for the admin panel, with optional filtering. """
+    """ Fetches a page of restaurants for the admin panel, with optional filtering. """
     try:
         # Start with a base query
         query = db.session.query(Restaurant).options(joinedload(Restaurant.owner)).join(User, Restaurant.owner_id == User.id)
@@ -285,21 +277,25 @@ def get_all_restaurants():
                 )
             )
 
-        restaurants = query.all() # Execute the query
-        
-        # This part remains the same: determine status string based on flags
+        # The derived status, expressed in SQL so filtering happens before paging
+        owner_blocked = or_(User.active == False, User.active.is_(None))
+        if status_filter == 'Verified':
+            query = query.filter(Restaurant.is_verified == True, User.active == True)
+        elif status_filter == 'Blocked':
+            query = query.filter(owner_blocked)
+        elif status_filter == 'Pending':
+            query = query.filter(User.active == True, or_(Restaurant.is_verified == False, Restaurant.is_verified.is_(None)))
+
+        # Restaurants have no created_at; ids are assigned in creation order
+        page = paginate(query, [Restaurant.id])
+
         restaurants_data = []
-        for resto in restaurants:
+        for resto in page.rows:
             status = "Pending"
             if resto.is_verified and resto.owner and resto.owner.active:
                 status = "Verified"
             elif resto.owner and not resto.owner.active:
                 status = "Blocked"
-            
-            # This is server-side filtering for status, after getting all results
-            # This is less efficient, but simpler than complex DB queries for status
-            if status_filter and status_filter != 'All' and status != status_filter:
-                continue
 
             restaurants_data.append({
                 'id': resto.id,
@@ -311,9 +307,11 @@ def get_all_restaurants():
                 'platformFee': resto.platform_fee
             })
         
-        return jsonify(restaurants_data), 200
-    except Exception as e:
-        print(f"Error fetching all restaurants: {e}")
+        return jsonify(page.envelope(restaurants_data)), 200
+    except PaginationError as e:
+        return jsonify({"message": e.message}), e.status_code
+    except Exception:
+        logger.exception("Error fetching all restaurants")
         return jsonify({"message": "An error occurred on the server."}), 500
 
 
@@ -333,8 +331,8 @@ def get_all_restaurants():
 def admin_dashboard_stats():
     """ Gathers and returns all key metrics for the admin dashboard. """
     try:
-        # Calculate total revenue from completed orders
-        total_revenue = db.session.query(func.sum(Order.total_amount)).filter(Order.status == 'completed').scalar() or 0
+        # Total revenue from completed orders, summed from the daily sales rollup
+        total_revenue = sales_totals()['revenue']
 
         # Get total counts
         total_orders = db.session.query(func.count(Order.id)).scalar() or 0
@@ -369,8 +367,8 @@ def admin_dashboard_stats():
             'pendingRestaurants': pending_restaurants_data
         }), 200
 
-    except Exception as e:
-        print(f"Error fetching admin dashboard data: {e}")
+    except Exception:
+        logger.exception("Error fetching admin dashboard data")
         return jsonify({"message": "An error occurred on the server while fetching dashboard data."}), 500
 # --- ================= ---
 # --- ADMIN API ROUTES ---
@@ -386,6 +384,7 @@ def verify_restaurant(id):
     restaurant = Restaurant.query.get_or_404(id)
     restaurant.is_verified = True
     db.session.commit()
+    invalidate_tags(restaurant_tag(restaurant.id), FEATURED_TAG)
     return jsonify({"message": f"'{restaurant.name}' has been verified."}), 200
 
 @app.route('/api/admin/restaurants/<int:id>/block', methods=['PATCH'])
@@ -417,6 +416,7 @@ def delete_restaurant(id):
     restaurant = Restaurant.query.get_or_404(id)
     db.session.delete(restaurant)
     db.session.commit()
+    invalidate_tags(restaurant_tag(id), FEATURED_TAG)
     return jsonify({"message": f"'{restaurant.name}' has been permanently deleted."}), 200
 
 # --- NEW: ADMIN ORDER MANAGEMENT ENDPOINTS ---
@@ -425,7 +425,7 @@ def delete_restaurant(id):
 @auth_required('token')
 @roles_required('admin')
 def admin_get_all_orders():
-    """ Fetches all orders from all restaurants for the admin panel, with filtering. """
+    """ Fetches a page of orders from all restaurants for the admin panel, with filtering. """
     try:
         query = Order.query.options(
             joinedload(Order.customer),
@@ -450,7 +450,7 @@ def admin_get_all_orders():
             # Note: status is stored in lowercase in the db
             query = query.filter(Order.status == status_filter.lower())
 
-        orders = query.order_by(Order.created_at.desc()).all()
+        page = paginate(query, [Order.created_at, Order.id])
 
         orders_data = [{
             'id': order.id,
@@ -461,11 +461,13 @@ def admin_get_all_orders():
             'status': order.status.capitalize(),
             'deliveryFee': order.delivery_fee,
             'platformFee': order.platform_fee
-        } for order in orders]
+        } for order in page.rows]
         
-        return jsonify(orders_data), 200
-    except Exception as e:
-        print(f"Error fetching all orders: {e}")
+        return jsonify(page.envelope(orders_data)), 200
+    except PaginationError as e:
+        return jsonify({"message": e.message}), e.status_code
+    except Exception:
+        logger.exception("Error fetching all orders")
         return jsonify({"message": "An error occurred on the server."}), 500
 
 @app.route('/api/admin/orders/<int:order_id>/refund', methods=['POST'])
@@ -484,22 +486,29 @@ def admin_refund_order(order_id):
 
     # Here you would add your payment gateway refund logic.
     # For this simulation, we'll assume it's successful.
-    print(f"Admin initiated refund for Order #{order.id} amounting to ${order.total_amount}")
+    logger.info("Admin initiated refund for order #%s amounting to %s", order.id, order.total_amount)
     
-    # Update the order status
-    order.status = 'refunded'
+    # Update the order status; False means a concurrent request refunded it first
+    if not set_order_status(order, 'refunded'):
+        db.session.rollback()
+        return jsonify({"message": f"Order #{order.id} has already been refunded."}), 400
     db.session.commit()
+    publish_order_event(order)
     
     return jsonify({"message": f"Refund for Order #{order.id} has been successfully processed."}), 200
 @app.route('/api/admin/reviews', methods=['GET'])
 @auth_required('token')
 @roles_required('admin')
 def admin_get_all_reviews():
-    """ Fetches all reviews from all restaurants for the admin panel. """
-    reviews = Review.query.options(
+    """ Fetches a page of reviews from all restaurants for the admin panel. """
+    query = Review.query.options(
         joinedload(Review.customer),
         joinedload(Review.restaurant)
-    ).order_by(Review.created_at.desc()).all()
+    )
+    try:
+        page = paginate(query, [Review.created_at, Review.id])
+    except PaginationError as e:
+        return jsonify({"message": e.message}), e.status_code
 
     reviews_data = [{
         'id': review.id,
@@ -508,9 +517,9 @@ def admin_get_all_reviews():
         'rating': review.rating,
         'comment': review.comment,
         'date': review.created_at.strftime('%b %d, %Y')
-    } for review in reviews]
+    } for review in page.rows]
     
-    return jsonify(reviews_data), 200
+    return jsonify(page.envelope(reviews_data)), 200
 
 @app.route('/api/admin/reviews/<int:review_id>', methods=['DELETE'])
 @auth_required('token')
@@ -518,8 +527,10 @@ def admin_get_all_reviews():
 def admin_delete_review(review_id):
     """ Permanently deletes a review. """
     review = Review.query.get_or_404(review_id)
+    forget_review(review.restaurant_id, review.rating)
     db.session.delete(review)
     db.session.commit()
+    invalidate_tags(restaurant_tag(review.restaurant_id), FEATURED_TAG)
     return jsonify({"message": f"Review #{review.id} has been permanently deleted."}), 200
 
 @app.route('/api/admin/coupons', methods=['GET', 'POST'])
@@ -581,81 +592,96 @@ from datetime import date, timedelta, datetime # <-- Make sure datetime is impor
 @app.route('/api/admin/reports', methods=['GET'])
 @auth_required('token')
 @roles_required('admin')
+@read_only_view
 def get_admin_reports():
-    """ Gathers and returns platform-wide analytics for the admin reports page. """
-    
-    # --- Daily Revenue (Last 7 Days) ---
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    
-    # 1. Fetch all completed orders from the last 7 days.
-    # We filter using a full datetime object, which is very reliable.
-    recent_orders = db.session.query(Order.created_at, Order.total_amount).filter(
-        Order.status == 'completed',
-        Order.created_at >= seven_days_ago
-    ).all()
-
-    # 2. Use a Python dictionary to aggregate revenue by day.
-    revenue_by_date = {}
-    for i in range(7):
-        current_date = date.today() - timedelta(days=i)
-        revenue_by_date[current_date] = 0.0
-
-    for order_time, revenue in recent_orders:
-        order_date = order_time.date() # Extract just the date part from the datetime object
-        if order_date in revenue_by_date:
-            revenue_by_date[order_date] += revenue
-
-    # 3. Format the data for the frontend.
-    daily_revenue_data = []
-    for d, r in sorted(revenue_by_date.items()):
-        daily_revenue_data.append({
-            'day': d.strftime('%b %d'),
-            'revenue': round(float(r), 2)
-        })
-
-    # --- Top Performing Restaurants (This part is correct) ---
-    top_restaurants_query = db.session.query(
-        Restaurant.name,
-        func.sum(Order.total_amount).label('total_revenue')
-    ).join(Order, Restaurant.id == Order.restaurant_id)\
-    .filter(Order.status == 'completed')\
-    .group_by(Restaurant.name)\
-    .order_by(func.sum(Order.total_amount).desc()).limit(5).all()
-
+    """
+    Gathers and returns platform-wide analytics for the admin reports page.
+    Daily revenue covers ?from=YYYY-MM-DD&to=YYYY-MM-DD (the last 7 days by default).
+    """
+    try:
+        first_day, last_day = report_range()
+    except ReportError as e:
+        return jsonify({"message": e.message}), e.status_code
+
+    # --- Daily Revenue, from the daily sales rollup ---
+    daily_revenue_data = [{
+        'day': row['day'].strftime('%b %d'),
+        'date': row['day'].isoformat(),
+        'revenue': round(float(row['revenue']), 2)
+    } for row in daily_sales(first_day, last_day)]
+
+    # --- Top Performing Restaurants (all time) ---
     top_restaurants_data = [{
         'rank': index + 1,
         'name': name,
         'revenue': round(float(total_revenue), 2)
-    } for index, (name, total_revenue) in enumerate(top_restaurants_query)]
+    } for index, (name, total_revenue) in enumerate(top_restaurants(limit=5))]
 
     return jsonify({
+        'from': first_day.isoformat(),
+        'to': last_day.isoformat(),
         'dailyRevenue': daily_revenue_data,
         'topRestaurants': top_restaurants_data
     }), 200
 
 
+@app.route('/api/admin/metrics', methods=['GET', 'DELETE'])
+@auth_required('token')
+@roles_required('admin')
+def get_request_metrics():
+    """
+    Per-endpoint request counts, latency histograms and DB/cache usage for the
+    worker that serves this request (each process keeps its own). DELETE resets them.
+    """
+    stats = get_request_stats()
+    if request.method == 'DELETE':
+        stats.reset()
+        return jsonify({"message": "Request metrics reset."}), 200
+    return jsonify(stats.snapshot()), 200
+
+
+@app.route('/api/admin/query-profiles', methods=['GET'])
+@auth_required('token')
+@roles_required('admin')
+def get_query_profiles():
+    """ Summaries of the SQL profiles this worker kept, newest first (see backend/query_profiler.py). """
+    return jsonify([{
+        'id': report['id'], 'label': report['label'], 'status': report['status'],
+        'queries': report['queries'], 'ms': report['ms'], 'nPlusOne': len(report['nPlusOne'])
+    } for report in reversed(get_profile_reports())]), 200
+
+
+@app.route('/api/admin/query-profiles/<profile_id>', methods=['GET'])
+@auth_required('token')
+@roles_required('admin')
+def get_query_profile(profile_id):
+    """ One request's full SQL profile: every statement fingerprint with count, time and origin. """
+    report = find_profile_report(profile_id)
+    if report is None:
+        return jsonify({"message": "Profile not found (it may have been served by another worker)."}), 404
+    return jsonify(report), 200
+
+
+@app.route('/api/admin/static-assets/reload', methods=['POST'])
+@auth_required('token')
+@roles_required('admin')
+def reload_frontend_assets():
+    """ Picks up a frontend deploy without restarting: rebuilds hashed assets and the SPA shell. """
+    build_id = reload_static_assets()
+    return jsonify({"message": "Static assets reloaded.", "build": build_id}), 200
+
+
 # --- NEW: USER MANAGEMENT ENDPOINTS ---
 
 @app.route('/api/admin/users', methods=['GET'])
 @auth_required('token')
 @roles_required('admin')
 def get_all_users():
-    """ Fetches all customers with their order stats for the admin panel. """
+    """ Fetches a page of customers with their order stats for the admin panel. """
     try:
-        # Subquery to calculate total orders per user
-        orders_subquery = db.session.query(
-            Order.user_id,
-            func.count(Order.id).label('total_orders'),
-            func.sum(Order.total_amount).label('total_spent')
-        ).group_by(Order.user_id).subquery()
-
         # Query all users with the 'customer' role
         customer_role = Role.query.filter_by(name='customer').first()
-        query = db.session.query(
-            User,
-            func.coalesce(orders_subquery.c.total_orders, 0).label('total_orders'),
-            func.coalesce(orders_subquery.c.total_spent, 0).label('total_spent')
-        ).outerjoin(orders_subquery, User.id == orders_subquery.c.user_id).filter(User.roles.contains(customer_role))
+        query = User.query.filter(User.roles.contains(customer_role))
 
         # Get search parameter from the request URL
         search_term = request.args.get('search', None)
@@ -668,20 +694,37 @@ def get_all_users():
                 )
             )
 
-        users = query.all()
+        page = paginate(query, [User.id])
+
+        # Order totals for this page's users only, instead of grouping the whole order table
+        stats = {}
+        if page.rows:
+            stats = {
+                user_id: (total_orders, total_spent)
+                for user_id, total_orders, total_spent in db.session.query(
+                    Order.user_id,
+                    func.count(Order.id),
+                    func.coalesce(func.sum(Order.total_amount), 0)
+                ).filter(Order.user_id.in_([user.id for user in page.rows])).group_by(Order.user_id)
+            }
 
-        users_data = [{
-            'id': user.id,
-            'name': user.name,
-            'email': user.email,
-            'totalOrders': total_orders,
-            'totalSpent': round(float(total_spent), 2),
-            'isBlocked': not user.active
-        } for user, total_orders, total_spent in users]
+        users_data = []
+        for user in page.rows:
+            total_orders, total_spent = stats.get(user.id, (0, 0))
+            users_data.append({
+                'id': user.id,
+                'name': user.name,
+                'email': user.email,
+                'totalOrders': total_orders,
+                'totalSpent': round(float(total_spent), 2),
+                'isBlocked': not user.active
+            })
 
-        return jsonify(users_data), 200
-    except Exception as e:
-        print(f"Error fetching users: {e}")
+        return jsonify(page.envelope(users_data)), 200
+    except PaginationError as e:
+        return jsonify({"message": e.message}), e.status_code
+    except Exception:
+        logger.exception("Error fetching users")
         return jsonify({"message": "An error occurred on the server."}), 500
 
 @app.route('/api/admin/users/<int:id>/block', methods=['PATCH'])
@@ -826,49 +869,13 @@ def place_order():
 
     restaurant = Restaurant.query.get_or_404(restaurant_id)
 
-    # --- 1. Secure Server-Side Price Calculation ---
-    subtotal = 0
-    order_items_to_create = []
-    cart_items = data.get('items', [])
-    if not cart_items:
-        return jsonify({"message": "Cannot place an empty order."}), 400
-
-    for item_data in cart_items:
-        menu_item = MenuItem.query.get(item_data.get('menu_item_id'))
-        if not menu_item or not menu_item.is_available or menu_item.restaurant_id != restaurant.id:
-            return jsonify({'message': "An item in your cart is invalid or unavailable."}), 400
-        
-        quantity = item_data.get('quantity')
-        subtotal += menu_item.price * quantity
-        order_items_to_create.append(OrderItem(
-            menu_item_id=menu_item.id,
-            quantity=quantity,
-            price_at_order=menu_item.price
-        ))
-
-    # --- 2. Secure Server-Side Coupon Validation ---
-    final_total = subtotal
-    discount_amount = 0
-    coupon_code = data.get('coupon_code')
-    if coupon_code:
-        coupon = Coupon.query.filter(
-            Coupon.code == coupon_code,
-            Coupon.is_active == True,
-            or_(Coupon.restaurant_id == None, Coupon.restaurant_id == restaurant.id)
-        ).first()
-        if coupon:
-            if coupon.discount_type == 'Percentage':
-                discount_amount = (subtotal * coupon.discount_value) / 100
-            else: # Fixed amount
-                discount_amount = coupon.discount_value
-            final_total = max(0, subtotal - discount_amount)
-
-    # --- 2b. Add Restaurant-Specific Fees ---
-    delivery_fee = restaurant.delivery_fee or 0.0
-    platform_fee = restaurant.platform_fee or 0.0
-    final_total += (delivery_fee + platform_fee)
-
-    # --- 3. Handle Scheduled Time ---
+    # --- 1. Secure Server-Side Pricing (items, coupon and fees in one pass) ---
+    try:
+        quote = price_cart(restaurant, data.get('items', []), coupon_code=data.get('coupon_code'))
+    except PricingError as e:
+        return jsonify({'message': e.message}), e.status_code
+
+    # --- 2. Handle Scheduled Time ---
     scheduled_time_obj = None # Use a different variable name to avoid confusion
     if data.get('scheduled_time'):
         try:
@@ -880,7 +887,7 @@ def place_order():
         except (ValueError, TypeError):
             return jsonify({"message": "Invalid format for scheduled time."}), 400
 
-    # --- 4. Create the Order Object ---
+    # --- 3. Create the Order Object ---
     otp = ''.join(random.choices(string.digits, k=6))
     qr_payload = ''.join(random.choices(string.ascii_letters + string.digits, k=20))
     
@@ -900,31 +907,24 @@ def place_order():
     new_order = Order(
         user_id=current_user.id,
         restaurant_id=restaurant.id,
-        total_amount=round(final_total, 2),
         order_type= order_type,
         table_number=table_number,
         status='placed',
         otp=otp,
         qr_payload=qr_payload,
-        items=order_items_to_create,
-        coupon_code=coupon_code,
-        discount_amount=round(discount_amount, 2),
-        delivery_fee=round(delivery_fee, 2),
-        platform_fee=round(platform_fee, 2),
         # --- 🛠️ THE FIX IS HERE ---
         is_scheduled=bool(scheduled_time_obj),
-        scheduled_time=scheduled_time_obj 
+        scheduled_time=scheduled_time_obj,
         # --- 🛠️ END OF FIX ---
+        **quote.order_fields()
     )
 
     db.session.add(new_order)
+    record_order_items(restaurant.id, [line.menu_item.id for line in quote.lines])
     db.session.commit()
-    try:
-        cache.delete_memoized(get_restaurant_details, restaurant.id)
-        cache.delete_memoized(get_featured_restaurants)
-    except Exception:
-        pass
-
+    publish_order_event(new_order, ORDER_CREATED)
+    # The customer's order history reads from the replica; keep them on the primary until it catches up
+    mark_recent_write(current_user.id)
     return jsonify({'message': 'Order placed successfully!', 'order_id': new_order.id}), 201
 
 # -------------------- Razorpay Payment Endpoints --------------------
@@ -943,40 +943,18 @@ def create_razorpay_order():
     if order.user_id != current_user.id:
         return jsonify({'message': 'Unauthorized to create payment for this order'}), 403
 
-    # Get Razorpay credentials
-    key_id = app.config.get('RAZORPAY_KEY_ID')
-    key_secret = app.config.get('RAZORPAY_KEY_SECRET')
-    
-    amount_paisa = int(round(order.total_amount * 100))
-    
-    # Try with Razorpay if credentials exist, otherwise use mock (for development)
-    if key_id and key_secret:
-        try:
-            client = razorpay.Client(auth=(key_id, key_secret))
-            rp_order = client.order.create({
-                'amount': amount_paisa,
-                'currency': 'INR',
-                'receipt': str(order.id),
-                'payment_capture': 1
-            })
-            razorpay_order_id = rp_order.get('id')
-        except Exception as e:
-            print(f"Razorpay error: {e}. Using mock order for development.")
-            # Fallback to mock for development
-            razorpay_order_id = f'order_{order.id}_{int(time.time())}'
-    else:
-        # Development mode: create a mock order
-        razorpay_order_id = f'order_{order.id}_{int(time.time())}'
-    
-    # Save razorpay_order_id to our order
-    order.razorpay_order_id = razorpay_order_id
-    order.payment_amount = order.total_amount
+    # Idempotent per order: a retry or double click reuses the gateway order (backend/payments.py)
+    try:
+        razorpay_order_id = create_payment_order(order)
+    except PaymentGatewayError as e:
+        db.session.rollback() # Releases the order row
+        return jsonify({'message': e.message}), e.status_code
     db.session.commit()
 
     return jsonify({
         'razorpay_order_id': razorpay_order_id,
-        'razorpay_key': key_id or 'test-key',
-        'amount': amount_paisa
+        'razorpay_key': get_gateway().key_id,
+        'amount': amount_in_paise(order)
     }), 200
 
 
@@ -998,31 +976,18 @@ def verify_razorpay_payment():
     if order.user_id != current_user.id:
         return jsonify({'message': 'Unauthorized'}), 403
 
-    # For development mode with mock orders, skip signature verification
-    key_secret = app.config.get('RAZORPAY_KEY_SECRET')
-    if razorpay_order_id.startswith('order_'):
-        # This is a mock order, accept it as-is
-        print(f"Development mode: Accepting mock payment for order {order_id}")
-    elif key_secret:
-        # Verify signature: HMAC_SHA256(order_id|payment_id, key_secret)
-        payload = f"{razorpay_order_id}|{razorpay_payment_id}".encode()
-        secret = key_secret.encode()
-        generated_sig = hmac.new(secret, payload, hashlib.sha256).hexdigest()
-
-        if not hmac.compare_digest(generated_sig, razorpay_signature):
-            return jsonify({'message': 'Invalid payment signature'}), 400
+    if razorpay_order_id != order.razorpay_order_id:
+        return jsonify({'message': 'Payment does not belong to this order'}), 400
+    # HMAC_SHA256(order_id|payment_id, key_secret); the fake gateway (no Razorpay keys) accepts any signature
+    if not get_gateway().verify_payment_signature(razorpay_order_id, razorpay_payment_id, razorpay_signature):
+        return jsonify({'message': 'Invalid payment signature'}), 400
 
     # Mark payment success
     order.razorpay_payment_id = razorpay_payment_id
     order.payment_status = 'paid'
-    order.status = 'completed'
+    set_order_status(order, 'completed')
     db.session.commit()
-
-    try:
-        cache.delete_memoized(get_restaurant_details, order.restaurant_id)
-        cache.delete_memoized(get_featured_restaurants)
-    except Exception:
-        pass
+    publish_order_event(order)
 
     return jsonify({'message': 'Payment verified and order completed.'}), 200
 @app.route('/api/payments/webhook', methods=['POST'])
@@ -1058,11 +1023,12 @@ def razorpay_webhook():
             if order:
                 order.razorpay_payment_id = razorpay_payment_id
                 order.payment_status = 'paid'
-                order.status = 'completed'
+                set_order_status(order, 'completed')
                 db.session.commit()
+                publish_order_event(order)
 
-    except Exception as e:
-        print(f"Error processing webhook: {e}")
+    except Exception:
+        logger.exception("Error processing webhook")
 
     return jsonify({'message': 'Webhook processed'}), 200
 
@@ -1094,8 +1060,8 @@ def get_applicable_coupons(restaurant_id):
         
         return jsonify(coupons_data), 200
         
-    except Exception as e:
-        print(f"Error fetching applicable coupons: {e}")
+    except Exception:
+        logger.exception("Error fetching applicable coupons")
         return jsonify({"message": "Could not retrieve coupons."}), 500
 @app.route('/api/coupons/apply', methods=['POST'])
 @auth_required('token')
@@ -1108,38 +1074,44 @@ def apply_coupon():
     code = data.get('code')
     subtotal = data.get('subtotal')
     restaurant_id = data.get('restaurant_id')
+    cart_items = data.get('items')
 
-    if not all([code, subtotal, restaurant_id]):
+    if not code or not restaurant_id or not (cart_items or subtotal):
         return jsonify({"message": "Missing coupon code, subtotal, or restaurant ID."}), 400
 
     try:
-        # Find a coupon that matches the code, is active, AND is either platform-wide or for the correct restaurant
-        coupon = Coupon.query.filter(
-            Coupon.code == code,
-            Coupon.is_active == True,
-            or_(Coupon.restaurant_id == None, Coupon.restaurant_id == restaurant_id)
-        ).first()
-
+        # When the cart is sent, price it server-side with the same engine
+        # place_order uses so the previewed discount matches the final order.
+        if cart_items:
+            restaurant = Restaurant.query.get(restaurant_id)
+            if not restaurant:
+                return jsonify({"message": "Restaurant not found."}), 404
+            try:
+                quote = price_cart(restaurant, cart_items, coupon_code=code)
+            except PricingError as e:
+                return jsonify({"message": e.message}), e.status_code
+            if quote.coupon_rejected:
+                return jsonify({"message": "Invalid or expired coupon code."}), 404
+            return jsonify({
+                "message": "Coupon applied successfully!",
+                "discount": round(quote.discount_amount, 2),
+                "quote": quote.to_dict()
+            }), 200
+
+        # Legacy clients only send the subtotal they computed
+        coupon = find_coupon(code, restaurant_id)
         if not coupon:
             return jsonify({"message": "Invalid or expired coupon code."}), 404
 
-        # Calculate the discount
-        discount_amount = 0
-        if coupon.discount_type == 'Percentage':
-            discount_amount = (subtotal * coupon.discount_value) / 100
-        elif coupon.discount_type == 'Fixed':
-            discount_amount = coupon.discount_value
-        
-        # Ensure discount doesn't exceed the subtotal
-        discount_amount = min(discount_amount, subtotal)
+        discount_amount = compute_discount(coupon, float(subtotal))
 
         return jsonify({
             "message": "Coupon applied successfully!",
             "discount": round(discount_amount, 2)
         }), 200
 
-    except Exception as e:
-        print(f"Error applying coupon: {e}")
+    except Exception:
+        logger.exception("Error applying coupon")
         return jsonify({"message": "An error occurred while applying the coupon."}), 500
 
 # --- UPDATED FAVORITES ENDPOINT ---
@@ -1150,11 +1122,9 @@ def get_favorites():
     """ Fetches all favorite restaurants for the logged-in customer. """
     favorites_data = []
     for resto in current_user.favorites:
-        avg_rating = db.session.query(func.avg(Review.rating)).filter(Review.restaurant_id == resto.id).scalar() or 0.0
-        review_count = db.session.query(func.count(Review.id)).filter(Review.restaurant_id == resto.id).scalar() or 0
         favorites_data.append({
             'id': resto.id, 'name': resto.name, 'cuisine': 'Local Cuisine',
-            'rating': round(float(avg_rating), 1), 'reviews': review_count,
+            'rating': round(resto.average_rating, 1), 'reviews': resto.rating_count,
             'image': f'https://placehold.co/600x400/E65100/FFF?text={resto.name.replace(" ", "+")}'
         })
     return jsonify(favorites_data), 200
@@ -1178,18 +1148,12 @@ def manage_favorite(restaurant_id):
 # --- NEW: RESTAURANT LISTING & DETAIL ENDPOINTS ---
 
 @app.route('/api/restaurants/featured', methods=['GET'])
-@cache.cached(timeout=300)
+@cached_view(tags=[FEATURED_TAG])
 def get_featured_restaurants():
     try:
         restaurants = Restaurant.query.filter_by(is_verified=True, is_active=True).limit(6).all()
         restaurants_data = []
         for resto in restaurants:
-            # Calculate stats
-            stats = db.session.query(
-                func.avg(Review.rating).label('avg_rating'),
-                func.count(Review.id).label('review_count')
-            ).filter(Review.restaurant_id == resto.id).first()
-            
             # ✅ START: LOGIC TO USE GALLERY IMAGE OR FALLBACK
             image_url = f'https://placehold.co/600x400/E65100/FFF?text={resto.name.replace(" ", "+")}'
             if resto.gallery and len(resto.gallery) > 0:
@@ -1198,46 +1162,38 @@ def get_featured_restaurants():
 
             restaurants_data.append({
                 'id': resto.id, 'name': resto.name, 'cuisine': 'Local Favorites',
-                'rating': round(float(stats.avg_rating or 0), 1),
-                'reviews': stats.review_count or 0,
+                'rating': round(resto.average_rating, 1),
+                'reviews': resto.rating_count,
                 'image': image_url,
+                **image_srcset_fields(image_url),
                 'deliveryFee': resto.delivery_fee,
                 'platformFee': resto.platform_fee
             })
         
         return jsonify(restaurants_data), 200
 
-    except Exception as e:
-        # CRITICAL FIX: Rollback the transaction to unblock the database
-        db.session.rollback()
-        print(f"CRITICAL FEATURED RESTAURANTS ERROR: {e}")
+    except Exception:
+        logger.exception("Error fetching featured restaurants")
         # Return an empty list on error to prevent a 500 crash page
         return jsonify([]), 500
 
 @app.route('/api/restaurants/<int:restaurant_id>', methods=['GET'])
-@cache.cached(timeout=300)
 def get_restaurant_details(restaurant_id):
-    restaurant = Restaurant.query.options(joinedload(Restaurant.categories).joinedload(Category.menu_items)).get_or_404(restaurant_id)
-    
-    stats = db.session.query(
-        func.avg(Review.rating).label('avg_rating'),
-        func.count(Review.id).label('review_count')
-    ).filter(Review.restaurant_id == restaurant.id).first()
-
-    categories_data = [{'id': cat.id, 'name': cat.name, 'menu_items': [{'id': item.id, 'name': item.name, 'description': item.description, 'price': item.price, 'is_available': item.is_available, 'image': item.image_url or f'https://placehold.co/600x400/E65100/FFF?text={item.name.replace(" ", "+")}' } for item in cat.menu_items]} for cat in restaurant.categories]    
-    restaurant_data = {
-        'id': restaurant.id, 'name': restaurant.name, 'description': restaurant.description, 'address': restaurant.address, 'city': restaurant.city, 'cuisine': 'Local Favorites', 
-        'rating': round(float(stats.avg_rating or 0), 1),
-        'reviews': stats.review_count or 0,
-        'categories': categories_data,
-        'deliveryFee': restaurant.delivery_fee,
-        'platformFee': restaurant.platform_fee
-    }
-    return jsonify(restaurant_data), 200
+    """ Serves the restaurant's menu snapshot; repeat views revalidate with If-None-Match and get a 304. """
+    snapshot = get_menu_snapshot(restaurant_id)
+    if snapshot is None:
+        abort(404)
+
+    response = app.response_class(snapshot.body, mimetype='application/json')
+    response.set_etag(snapshot.etag)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/api/orders', methods=['GET'])
 @auth_required('token')
 @roles_required('customer')
+@read_only_view
 def get_order_history():
     """ Fetches the order history for the logged-in customer. """
     try:
@@ -1261,8 +1217,8 @@ def get_order_history():
         } for o in orders]
         
         return jsonify(orders_data), 200
-    except Exception as e:
-        print(f"Error fetching order history: {e}")
+    except Exception:
+        logger.exception("Error fetching order history")
         return jsonify({"message": "An error occurred while fetching your orders."}), 500
 
 
@@ -1295,43 +1251,27 @@ def restaurant_dashboard_stats():
     if not restaurant:
         return jsonify({"message": "No restaurant profile found for this account. Please contact support if you believe this is an error."}), 404
     
-    today = date.today()
-
     # --- Calculate Stats ---
-    # Today's Revenue
-    todays_revenue = db.session.query(func.sum(Order.total_amount))\
-        .filter(Order.restaurant_id == restaurant.id, func.cast(Order.created_at, Date) == today).scalar() or 0.0
-
-    # Today's Orders
-    todays_orders = db.session.query(func.count(Order.id))\
-        .filter(Order.restaurant_id == restaurant.id, func.cast(Order.created_at, Date) == today).scalar() or 0
-        
-    # Pending Orders (Placed or Preparing)
-    pending_orders = db.session.query(func.count(Order.id))\
-        .filter(Order.restaurant_id == restaurant.id, Order.status.in_(['placed', 'preparing'])).scalar() or 0
-
-    # Recent Orders
-    recent_orders_query = Order.query.filter_by(restaurant_id=restaurant.id)\
-        .order_by(Order.created_at.desc()).limit(5).all()
-    
-    recent_orders_data = [{
-        'id': order.id,
-        'customerName': order.customer.name,
-        'items': len(order.items),
-        'total': order.total_amount,
-        'status': order.status.capitalize()
-    } for order in recent_orders_query]
+    # Today's revenue, today's orders and pending (placed or preparing) orders in one statement.
+    # "Today" is a half-open created_at range and the pending count a subquery on the status index,
+    # so each part reads only its own index range however long the order history gets.
+    day_start = datetime.combine(date.today(), datetime.min.time())
+    pending_count = select(func.count(Order.id))\
+        .where(Order.restaurant_id == restaurant.id, Order.status.in_(['placed', 'preparing'])).scalar_subquery()
+    todays_revenue, todays_orders, pending_orders = db.session.query(
+            func.coalesce(func.sum(Order.total_amount), 0.0),
+            func.count(Order.id),
+            pending_count
+        ).filter(
+            Order.restaurant_id == restaurant.id,
+            Order.created_at >= day_start, Order.created_at < day_start + timedelta(days=1)
+        ).one()
 
-    # Most Popular Items
-    popular_items_query = db.session.query(
-            MenuItem.name,
-            func.count(OrderItem.id).label('order_count')
-        ).join(OrderItem, MenuItem.id == OrderItem.menu_item_id)\
-        .filter(MenuItem.restaurant_id == restaurant.id)\
-        .group_by(MenuItem.name)\
-        .order_by(func.count(OrderItem.id).desc()).limit(5).all()
+    # Recent Orders (customer names and item counts in the same statement)
+    recent_orders_data = recent_orders(restaurant.id, limit=5)
 
-    popular_items_data = [{'name': name, 'orders': count} for name, count in popular_items_query]
+    # Most Popular Items, from the rolling per-day counters
+    popular_items_data = [{'name': name, 'orders': count} for name, count in popular_items(restaurant.id, limit=5)]
 
     stats = {
         'todaysRevenue': round(todays_revenue, 2),
@@ -1357,41 +1297,33 @@ def get_restaurant_orders():
     """
     restaurant = Restaurant.query.filter_by(owner_id=current_user.id).first_or_404()
     
-    # The query correctly fetches all non-finalized orders
-    orders = Order.query.filter(
-        Order.restaurant_id == restaurant.id,
-        Order.status.notin_(['completed', 'cancelled', 'rejected', 'refunded'])
-    ).order_by(Order.created_at.asc()).all()
-
-    orders_data = []
-    for order in orders:
-        items_data = [{'name': item.menu_item.name, 'quantity': item.quantity} for item in order.items]
-        
-        # Convert UTC creation time to IST for display
-        ist_created_time = order.created_at + timedelta(hours=5, minutes=30)
-
-        order_info = {
-            'id': order.id,
-            'customerName': order.customer.name,
-            'createdAt': ist_created_time.strftime('%I:%M %p'),
-            'status': order.status,
-            'order_type': order.order_type,
-            'items': items_data,
-            'is_scheduled': order.is_scheduled, # Pass the flag
-            'scheduled_date': None,
-            'scheduled_time': None
-        }
-
-        # If the order is scheduled, add the formatted IST time
-        if order.is_scheduled and order.scheduled_time:
-            ist_scheduled_time = order.scheduled_time + timedelta(hours=5, minutes=30)
-            order_info['scheduled_date'] = ist_scheduled_time.strftime('%b %d, %Y')
-            order_info['scheduled_time'] = ist_scheduled_time.strftime('%I:%M %p')
-
-        orders_data.append(order_info)
-        
+    # All non-finalized orders with their customers and items, in two statements
+    orders_data = active_queue(restaurant.id)
     return jsonify(orders_data), 200
 
+@app.route('/api/restaurant/orders/stream', methods=['GET'])
+@auth_required('token')
+@roles_required('owner')
+def stream_restaurant_orders():
+    """
+    Server-Sent Events stream of new orders and status changes for the owner's
+    restaurant. EventSource cannot send headers, so the token may be passed as
+    ?auth_token=. Each event's data is {"type", "order", "active"}, where
+    "order" has the same shape as the entries of GET /api/restaurant/orders.
+    """
+    restaurant = Restaurant.query.filter_by(owner_id=current_user.id).first_or_404()
+    stream = order_event_stream(
+        restaurant.id,
+        get_broker(),
+        app.config['ORDER_STREAM_KEEPALIVE_SECONDS'],
+        app.config['ORDER_STREAM_MAX_SECONDS']
+    )
+    # Not wrapped in stream_with_context: the stream never needs the request or
+    # a database session, so neither is held open for its lifetime.
+    return app.response_class(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no' # Stop nginx-style proxies from buffering events
+    })
 
 
 @app.route('/api/restaurant/orders/<int:order_id>/status', methods=['PATCH'])
@@ -1413,14 +1345,9 @@ def update_order_status(order_id):
     if new_status not in allowed_statuses:
         return jsonify({"message": f"Invalid status '{new_status}'."}), 400
         
-    order.status = new_status
+    set_order_status(order, new_status)
     db.session.commit()
-    try:
-        cache.delete_memoized(get_restaurant_details, restaurant.id)
-        cache.delete_memoized(get_featured_restaurants)
-    except Exception:
-        pass
-
+    publish_order_event(order)
     return jsonify({"message": f"Order #{order.id} has been updated to '{new_status}'."}), 200
 
 @app.route('/api/restaurant/orders/<int:order_id>/pickup', methods=['PATCH'])
@@ -1437,13 +1364,9 @@ def set_pickup_ready(order_id):
     ready = data.get('pickup_ready', True)
     order.pickup_ready = bool(ready)
     if ready:
-        order.status = 'ready'
+        set_order_status(order, 'ready')
     db.session.commit()
-    try:
-        cache.delete_memoized(get_restaurant_details, restaurant.id)
-        cache.delete_memoized(get_featured_restaurants)
-    except Exception:
-        pass
+    publish_order_event(order)
     return jsonify({"message": f"Order #{order.id} pickup_ready set to {order.pickup_ready}."}), 200
 
 # ✅ START: NEW OTP VERIFICATION ROUTE
@@ -1468,36 +1391,16 @@ def verify_order(order_id):
 
     # The core logic: compare OTPs
     if otp_submitted == order.otp:
-        order.status = 'completed'
+        set_order_status(order, 'completed')
+        # The OTP is cleared a minute later by the otp-expiry sweep (backend/scheduler.py)
+        schedule_otp_expiry(order)
         db.session.commit()
-
-        # ✅ START: This is the new logic to trigger the background task
-        # We start a new thread to run our clearing function.
-        # This does NOT block the server from sending the response immediately.
-        thread = threading.Thread(
-            target=clear_otp_after_delay,
-            args=(app.app_context(), order.id)
-        )
-        thread.start()
-        # ✅ END: New logic
+        publish_order_event(order)
 
         return jsonify({"message": f"Order #{order.id} verified and completed successfully!"}), 200
     else:
         return jsonify({"message": "Invalid OTP. Please try again."}), 400
 
-def clear_otp_after_delay(app_context, order_id):
-    """Waits for a delay and then clears the OTP for a given order."""
-    with app_context:
-        print(f"Starting background task to clear OTP for order {order_id} in 60 seconds.")
-        time.sleep(60) # Wait for 1 minute
-        try:
-            order = Order.query.get(order_id)
-            if order:
-                order.otp = None # Clear the OTP field
-                db.session.commit()
-                print(f"Successfully cleared OTP for order {order_id}.")
-        except Exception as e:
-            print(f"Error in background task for order {order_id}: {e}")
 # --- NEW: MENU MANAGEMENT ENDPOINTS ---
 
 @app.route('/api/restaurant/menu', methods=['GET'])
@@ -1544,11 +1447,7 @@ def create_menu_item():
     )
     db.session.add(new_item)
     db.session.commit()
-    try:
-        cache.delete_memoized(get_restaurant_details, restaurant.id)
-        cache.delete_memoized(get_featured_restaurants)
-    except Exception:
-        pass
+    publish_menu_snapshot(restaurant.id)
 
     return jsonify({"message": "Menu item created successfully."}), 201
 
@@ -1570,22 +1469,14 @@ def manage_menu_item(item_id):
         item.image_url = data.get('image', item.image_url)
         item.category_id = data.get('category_id', item.category_id)
         db.session.commit()
-        try:
-            cache.delete_memoized(get_restaurant_details, restaurant.id)
-            cache.delete_memoized(get_featured_restaurants)
-        except Exception:
-            pass
+        publish_menu_snapshot(restaurant.id)
 
         return jsonify({"message": "Menu item updated successfully."}), 200
 
     if request.method == 'DELETE':
         db.session.delete(item)
         db.session.commit()
-        try:
-            cache.delete_memoized(get_restaurant_details, restaurant.id)
-            cache.delete_memoized(get_featured_restaurants)
-        except Exception:
-            pass
+        publish_menu_snapshot(restaurant.id)
 
         return jsonify({"message": "Menu item deleted successfully."}), 200
 
@@ -1603,11 +1494,7 @@ def toggle_item_availability(item_id):
     if 'is_available' in data:
         item.is_available = data['is_available']
         db.session.commit()
-        try:
-            cache.delete_memoized(get_restaurant_details, restaurant.id)
-            cache.delete_memoized(get_featured_restaurants)
-        except Exception:
-            pass
+        publish_menu_snapshot(restaurant.id)
     
     return jsonify({"message": f"'{item.name}' availability updated."}), 200
 
@@ -1644,11 +1531,7 @@ def manage_restaurant_profile():
         restaurant.gallery = data.get('gallery', restaurant.gallery)
         
         db.session.commit()
-        try:
-            cache.delete_memoized(get_restaurant_details, restaurant.id)
-            cache.delete_memoized(get_featured_restaurants)
-        except Exception:
-            pass
+        invalidate_tags(restaurant_tag(restaurant.id), FEATURED_TAG)
         
         return jsonify({"message": "Restaurant profile updated successfully!"}), 200
     
@@ -1688,12 +1571,6 @@ def manage_restaurant_promotions():
         )
         db.session.add(new_coupon)
         db.session.commit()
-        try:
-            cache.delete_memoized(get_restaurant_details, restaurant.id)
-            cache.delete_memoized(get_featured_restaurants)
-        except Exception:
-            pass
-
         return jsonify({"message": "Coupon created successfully."}), 201
 
 @app.route('/api/restaurant/promotions/<int:coupon_id>', methods=['PUT', 'DELETE'])
@@ -1715,23 +1592,11 @@ def manage_specific_promotion(coupon_id):
         coupon.discount_value = data.get('value', coupon.discount_value)
         coupon.is_active = data.get('isActive', coupon.is_active)
         db.session.commit()
-        try:
-            cache.delete_memoized(get_restaurant_details, restaurant.id)
-            cache.delete_memoized(get_featured_restaurants)
-        except Exception:
-            pass
-
         return jsonify({"message": "Coupon updated successfully."}), 200
 
     if request.method == 'DELETE':
         db.session.delete(coupon)
         db.session.commit()
-        try:
-            cache.delete_memoized(get_restaurant_details, restaurant.id)
-            cache.delete_memoized(get_featured_restaurants)
-        except Exception:
-            pass
-
         return jsonify({"message": "Coupon deleted successfully."}), 200
 
 # --- NEW: ANALYTICS ENDPOINT ---
@@ -1739,17 +1604,21 @@ def manage_specific_promotion(coupon_id):
 @app.route('/api/restaurant/analytics', methods=['GET'])
 @auth_required('token')
 @roles_required('owner')
+@read_only_view
 def get_restaurant_analytics():
-    """ Gathers and returns all key analytics data for the owner's restaurant. """
+    """
+    Gathers and returns all key analytics data for the owner's restaurant.
+    Daily sales cover ?from=YYYY-MM-DD&to=YYYY-MM-DD (the last 7 days by default).
+    """
     restaurant = Restaurant.query.filter_by(owner_id=current_user.id).first_or_404()
-    
-    # --- Aggregate Stats ---
-    total_revenue = db.session.query(func.sum(Order.total_amount))\
-        .filter(Order.restaurant_id == restaurant.id, Order.status == 'completed').scalar() or 0.0
-        
-    total_orders = db.session.query(func.count(Order.id))\
-        .filter(Order.restaurant_id == restaurant.id, Order.status == 'completed').scalar() or 0
-        
+    try:
+        first_day, last_day = report_range()
+    except ReportError as e:
+        return jsonify({"message": e.message}), e.status_code
+
+    # --- Aggregate Stats (all completed orders), from the daily sales rollup ---
+    totals = sales_totals(restaurant_id=restaurant.id)
+    total_revenue, total_orders = float(totals['revenue']), totals['orders']
     avg_order_value = total_revenue / total_orders if total_orders > 0 else 0.0
 
     stats = {
@@ -1757,29 +1626,14 @@ def get_restaurant_analytics():
         'totalOrders': total_orders,
         'avgOrderValue': round(avg_order_value, 2)
     }
-    
-    # --- Daily Sales (Last 7 Days) ---
-    seven_days_ago = date.today() - timedelta(days=6)
-    daily_sales_query = db.session.query(
-            func.cast(Order.created_at, Date).label('order_date'),
-            func.sum(Order.total_amount).label('daily_revenue')
-        ).filter(
-            Order.restaurant_id == restaurant.id,
-            Order.status == 'completed',
-            func.cast(Order.created_at, Date) >= seven_days_ago
-        ).group_by('order_date').all()
-    
-    # Create a dictionary for easy lookup
-    sales_by_date = {res.order_date: res.daily_revenue for res in daily_sales_query}
-    
-    daily_sales_data = []
-    for i in range(7):
-        current_date = date.today() - timedelta(days=i)
-        daily_sales_data.append({
-            'day': current_date.strftime('%b %d'),
-            'sales': round(sales_by_date.get(current_date, 0), 2)
-        })
-    daily_sales_data.reverse() # Order from oldest to newest
+
+    # --- Daily Sales for the requested range ---
+    daily_sales_data = [{
+        'day': row['day'].strftime('%b %d'),
+        'date': row['day'].isoformat(),
+        'sales': round(float(row['revenue']), 2),
+        'orders': row['orders']
+    } for row in daily_sales(first_day, last_day, restaurant_id=restaurant.id)]
 
     # --- Most Popular Items ---
     popular_items_query = db.session.query(
@@ -1794,6 +1648,8 @@ def get_restaurant_analytics():
 
     return jsonify({
         'stats': stats,
+        'from': first_day.isoformat(),
+        'to': last_day.isoformat(),
         'dailySales': daily_sales_data,
         'popularItems': popular_items_data
     }), 200
@@ -1805,7 +1661,7 @@ def get_restaurant_analytics():
 def get_order_details(order_id):
     order = Order.query.options(joinedload(Order.items).joinedload(OrderItem.menu_item), joinedload(Order.restaurant)).filter_by(id=order_id, user_id=current_user.id).first_or_404()
     items_data = [{'id': item.id, 'name': item.menu_item.name, 'quantity': item.quantity, 'price': item.price_at_order} for item in order.items]
-    ist_time = order.created_at + timedelta(hours=5, minutes=30)
+    ist_time = to_ist(order.created_at)
 
     order_data = {
         'id': order.id,
@@ -1813,7 +1669,7 @@ def get_order_details(order_id):
         'total': order.total_amount,
         'status': order.status.capitalize(),
         'restaurantName': order.restaurant.name,
-        'otp': order.otp,
+        'otp': order_otp(order),
         'qr_payload': order.qr_payload,
         'order_type': order.order_type,
         'items': items_data,
@@ -1833,7 +1689,7 @@ def get_order_details(order_id):
 
     # --- ✅ START: FORMAT AND ADD TIME IF IT EXISTS ---
     if order.is_scheduled and order.scheduled_time:
-        ist_scheduled_time = order.scheduled_time + timedelta(hours=5, minutes=30)
+        ist_scheduled_time = to_ist(order.scheduled_time)
         order_data['scheduled_date'] = ist_scheduled_time.strftime('%b %d, %Y')
         order_data['scheduled_time'] = ist_scheduled_time.strftime('%I:%M %p')
     # --- ✅ END: FORMAT AND ADD TIME ---
@@ -1846,7 +1702,7 @@ def get_order_details(order_id):
 @app.route('/api/menu-items/regular', methods=['GET'])
 def get_regular_menu():
     menu_items = MenuItem.query.limit(6).all()
-    menu_data = [{'id': item.id, 'name': item.name, 'price': item.price, 'restaurantId': item.restaurant_id, 'reviews': 0, 'image': item.image_url or f'https://placehold.co/600x400/E65100/FFF?text={item.name.replace(" ", "+")}'} for item in menu_items]
+    menu_data = [{'id': item.id, 'name': item.name, 'price': item.price, 'restaurantId': item.restaurant_id, 'reviews': 0, 'image': item.image_url or f'https://placehold.co/600x400/E65100/FFF?text={item.name.replace(" ", "+")}', **image_srcset_fields(item.image_url)} for item in menu_items]
     return jsonify(menu_data), 200
 
 @app.route('/api/favorites', methods=['GET'])
@@ -1880,12 +1736,7 @@ def admin_create_restaurant():
     )
     db.session.add(new_restaurant)
     db.session.commit()
-    try:
-        cache.delete_memoized(get_featured_restaurants)
-        cache.delete_memoized(get_restaurant_details, new_restaurant.id)
-
-    except Exception:
-        pass
+    invalidate_tags(restaurant_tag(new_restaurant.id), FEATURED_TAG)
     return jsonify({"message": "Restaurant created successfully."}), 201
 
 @app.route('/api/admin/restaurants/<int:id>', methods=['PUT'])
@@ -1918,11 +1769,7 @@ def admin_update_restaurant(id):
         pass # Fallback to existing or default
     
     db.session.commit()
-    try:
-        cache.delete_memoized(get_featured_restaurants)
-        cache.delete_memoized(get_restaurant_details, restaurant.id)
-    except Exception:
-        pass
+    invalidate_tags(restaurant_tag(restaurant.id), FEATURED_TAG)
     
     return jsonify({"message": "Restaurant updated successfully."}), 200
 
@@ -1930,161 +1777,46 @@ def admin_update_restaurant(id):
 @app.route('/api/admin/restaurants/export')
 @auth_required('token')
 @roles_required('admin')
+@read_only_view
 def export_restaurants():
+    """ Streams restaurants with completed-order metrics (?format=xlsx|csv, ?from, ?to, ?restaurant_id). """
     try:
-        # Subquery to calculate performance metrics
-        order_metrics = db.session.query(
-            Order.restaurant_id,
-            func.count(Order.id).label('total_orders'),
-            func.sum(Order.total_amount).label('total_revenue')
-        ).filter(Order.status == 'completed').group_by(Order.restaurant_id).subquery()
-
-        # Main query to get all restaurant data
-        restaurants = db.session.query(
-            Restaurant,
-            func.coalesce(order_metrics.c.total_orders, 0).label('total_orders'),
-            func.coalesce(order_metrics.c.total_revenue, 0).label('total_revenue')
-        ).outerjoin(order_metrics, Restaurant.id == order_metrics.c.restaurant_id).all()
-
-        # Create an Excel file in memory
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        sheet.title = "Restaurants"
-
-        # Define headers
-        headers = ["ID", "Name", "Owner Email", "City", "Status", "Total Orders", "Total Revenue"]
-        sheet.append(headers)
-
-        # Populate rows
-        for restaurant, total_orders, total_revenue in restaurants:
-            status = "Pending"
-            if restaurant.is_verified and restaurant.owner and restaurant.owner.active:
-                status = "Verified"
-            elif restaurant.owner and not restaurant.owner.active:
-                status = "Blocked"
-
-            row = [
-                restaurant.id,
-                restaurant.name,
-                restaurant.owner.email if restaurant.owner else 'N/A',
-                restaurant.city,
-                status,
-                total_orders,
-                round(float(total_revenue), 2)
-            ]
-            sheet.append(row)
-
-        # Save the workbook to an in-memory stream
-        output = io.BytesIO()
-        workbook.save(output)
-        output.seek(0)
-
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name='restaurants_export.xlsx',
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-
-    except Exception as e:
-        print(f"Error exporting restaurants: {e}")
+        filters = ExportFilters.from_request()
+        return export_response('restaurants', restaurant_rows(filters), "Restaurants", export_format())
+    except ExportError as e:
+        return jsonify({"message": e.message}), e.status_code
+    except Exception:
+        logger.exception("Error exporting restaurants")
         return jsonify({"message": "Failed to export data."}), 500
     
 @app.route('/api/admin/users/export')
 @auth_required('token')
 @roles_required('admin')
+@read_only_view
 def export_users():
+    """ Streams customers with their order stats (?format=xlsx|csv, ?from, ?to, ?restaurant_id). """
     try:
-        # Re-using the subquery from get_all_users
-        orders_subquery = db.session.query(
-            Order.user_id,
-            func.count(Order.id).label('total_orders'),
-            func.sum(Order.total_amount).label('total_spent')
-        ).group_by(Order.user_id).subquery()
-
-        customer_role = Role.query.filter_by(name='customer').first()
-        users = db.session.query(
-            User,
-            func.coalesce(orders_subquery.c.total_orders, 0).label('total_orders'),
-            func.coalesce(orders_subquery.c.total_spent, 0).label('total_spent')
-        ).outerjoin(orders_subquery, User.id == orders_subquery.c.user_id).filter(User.roles.contains(customer_role)).all()
-
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        sheet.title = "Users"
-        headers = ["ID", "Name", "Email", "Status", "Total Orders", "Total Spent"]
-        sheet.append(headers)
-
-        for user, total_orders, total_spent in users:
-            status = "Active" if user.active else "Blocked"
-            row = [
-                user.id,
-                user.name,
-                user.email,
-                status,
-                total_orders,
-                round(float(total_spent), 2)
-            ]
-            sheet.append(row)
-
-        output = io.BytesIO()
-        workbook.save(output)
-        output.seek(0)
-
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name='users_export.xlsx',
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-
-    except Exception as e:
-        print(f"Error exporting users: {e}")
+        filters = ExportFilters.from_request()
+        return export_response('users', user_rows(filters), "Users", export_format())
+    except ExportError as e:
+        return jsonify({"message": e.message}), e.status_code
+    except Exception:
+        logger.exception("Error exporting users")
         return jsonify({"message": "Failed to export user data."}), 500
     
 @app.route('/api/admin/orders/export')
 @auth_required('token')
 @roles_required('admin')
+@read_only_view
 def export_orders():
+    """ Streams orders, newest first (?format=xlsx|csv, ?from, ?to, ?restaurant_id, ?status). """
     try:
-        # Fetch all orders with related data
-        orders = Order.query.options(
-            joinedload(Order.customer),
-            joinedload(Order.restaurant)
-        ).order_by(Order.created_at.desc()).all()
-
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        sheet.title = "Orders"
-
-        headers = ["Order ID", "Customer Name", "Restaurant Name", "Date", "Total Amount", "Status", "Order Type"]
-        sheet.append(headers)
-
-        for order in orders:
-            row = [
-                order.id,
-                order.customer.name if order.customer else 'N/A',
-                order.restaurant.name if order.restaurant else 'N/A',
-                order.created_at.strftime('%Y-%m-%d %H:%M'),
-                order.total_amount,
-                order.status.capitalize(),
-                order.order_type.capitalize()
-            ]
-            sheet.append(row)
-
-        output = io.BytesIO()
-        workbook.save(output)
-        output.seek(0)
-
-        return send_file(
-            output,
-            as_attachment=True,
-            download_name='orders_export.xlsx',
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-
-    except Exception as e:
-        print(f"Error exporting orders: {e}")
+        filters = ExportFilters.from_request()
+        return export_response('orders', order_rows(filters), "Orders", export_format())
+    except ExportError as e:
+        return jsonify({"message": e.message}), e.status_code
+    except Exception:
+        logger.exception("Error exporting orders")
         return jsonify({"message": "Failed to export order data."}), 500
 @app.route('/api/admin/coupons/<int:coupon_id>/toggle', methods=['PATCH'])
 @auth_required('token')
@@ -2102,59 +1834,56 @@ def admin_toggle_coupon_status(coupon_id):
 
 
 
-# --- ✅ START: HAVERSINE FORMULA HELPER FUNCTION ---
-def haversine(lat1, lon1, lat2, lon2):
-    """
-    Calculate the great-circle distance between two points 
-    on the earth (specified in decimal degrees)
-    """
-    # convert decimal degrees to radians 
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-
-    # haversine formula 
-    dlon = lon2 - lon1 
-    dlat = lat2 - lat1 
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a)) 
-    r = 6371 # Radius of earth in kilometers.
-    return c * r
-# --- ✅ END: HAVERSINE FORMULA HELPER FUNCTION ---
-
 # --- ✅ START: NEW GEOLOCATION ENDPOINT ---
 @app.route('/api/restaurants/nearby', methods=['GET'])
+@read_only_view
 def get_nearby_restaurants():
     """
-    Finds restaurants within a 7km radius of the user's location.
-    Expects 'lat' and 'lng' as query parameters.
+    Finds restaurants near the user's location, nearest first.
+    Expects 'lat' and 'lng' as query parameters; 'radius' (km) and 'limit'
+    are optional and capped by NEARBY_MAX_RADIUS_KM / NEARBY_MAX_LIMIT.
     """
     user_lat = request.args.get('lat', type=float)
     user_lng = request.args.get('lng', type=float)
 
     if user_lat is None or user_lng is None:
         return jsonify({"message": "Latitude and longitude are required."}), 400
+    if not (-90 <= user_lat <= 90 and -180 <= user_lng <= 180):
+        return jsonify({"message": "Latitude or longitude is out of range."}), 400
 
-    # Fetch all verified and active restaurants
-    all_restaurants = Restaurant.query.filter_by(is_verified=True, is_active=True).all()
-    
-    nearby_restaurants = []
-    for resto in all_restaurants:
-        # Ensure the restaurant has location data
-        if resto.latitude and resto.longitude:
-            distance = haversine(user_lat, user_lng, resto.latitude, resto.longitude)
-            if distance <= 7: # Check if within 7km radius
-                nearby_restaurants.append(resto)
+    radius = request.args.get('radius', app.config['NEARBY_DEFAULT_RADIUS_KM'], type=float)
+    radius = min(max(radius, 0.1), app.config['NEARBY_MAX_RADIUS_KM'])
+    limit = request.args.get('limit', app.config['NEARBY_DEFAULT_LIMIT'], type=int)
+    limit = min(max(limit, 1), app.config['NEARBY_MAX_LIMIT'])
+
+    # Candidate ids + distances from the in-process grid (or the SQL bounding box)
+    if app.config['NEARBY_USE_GRID_INDEX']:
+        hits = nearby_from_index(user_lat, user_lng, radius, limit, max_age=app.config['GEO_INDEX_MAX_AGE'])
+    else:
+        hits = nearby_from_db(user_lat, user_lng, radius, limit)
+
+    # One query for the hits; re-check the flags in case the index is a little behind
+    restaurants = {}
+    if hits:
+        restaurants = {r.id: r for r in Restaurant.query.filter(
+            Restaurant.id.in_([restaurant_id for restaurant_id, _ in hits]),
+            Restaurant.is_verified == True,
+            Restaurant.is_active == True
+        ).all()}
 
     # Format the data for the frontend
     restaurants_data = []
-    for resto in nearby_restaurants:
-        avg_rating = db.session.query(func.avg(Review.rating)).filter(Review.restaurant_id == resto.id).scalar() or 0.0
-        review_count = db.session.query(func.count(Review.id)).filter(Review.restaurant_id == resto.id).scalar() or 0
+    for restaurant_id, distance in hits:
+        resto = restaurants.get(restaurant_id)
+        if not resto:
+            continue
         restaurants_data.append({
             'id': resto.id,
             'name': resto.name,
             'cuisine': 'Local Favorites', # You can enhance this later
-            'rating': round(float(avg_rating), 1),
-            'reviews': review_count,
+            'rating': round(resto.average_rating, 1),
+            'reviews': resto.rating_count,
+            'distance': round(distance, 2),
             'image': f'https://placehold.co/600x400/E65100/FFF?text={resto.name.replace(" ", "+")}',
             'deliveryFee': resto.delivery_fee,
             'platformFee': resto.platform_fee
@@ -2181,6 +1910,7 @@ def geocode_address():
     # Replace 'your-email@example.com' with your actual email if possible.
     headers = {'User-Agent': 'FoodleApp/1.0 (manimanjunath.v@gmail.com)'}
     params = {'q': address, 'format': 'json', 'limit': 1}
+    import requests # Imported on first use; slow to import
     
     try:
         response = requests.get('https://nominatim.openstreetmap.org/search', params=params, headers=headers)
@@ -2197,7 +1927,7 @@ def geocode_address():
         }), 200
 
     except requests.exceptions.RequestException as e:
-        print(f"Geocoding API error: {e}")
+        logger.warning("Geocoding API error: %s", e)
         return jsonify({"message": "Could not connect to the geocoding service. Please try again later or enter coordinates manually."}), 503
 
 
@@ -2222,6 +1952,7 @@ def create_category():
     )
     db.session.add(new_category)
     db.session.commit()
+    publish_menu_snapshot(restaurant.id)
     return jsonify({"message": f"Category '{new_category.name}' created successfully."}), 201
 
 @app.route('/api/restaurant/categories/<int:category_id>', methods=['PUT', 'DELETE'])
@@ -2242,6 +1973,7 @@ def manage_category(category_id):
             return jsonify({"message": "Category name is required."}), 400
         category.name = data['name']
         db.session.commit()
+        publish_menu_snapshot(restaurant.id)
         return jsonify({"message": "Category updated successfully."}), 200
 
     if request.method == 'DELETE':
@@ -2251,6 +1983,7 @@ def manage_category(category_id):
         
         db.session.delete(category)
         db.session.commit()
+        publish_menu_snapshot(restaurant.id)
         return jsonify({"message": "Category deleted successfully."}), 200
 
 
@@ -2259,70 +1992,100 @@ def manage_category(category_id):
 @roles_required('owner')
 def bulk_upload_menu():
     """
-    Processes an Excel file to bulk-add categories and menu items.
-    Expected Excel format: | Category | Name | Description | Price | Food Type (Veg/Non-Veg) |
+    Processes an Excel or CSV file to bulk-add or update categories and menu items.
+    Expected format: | Category | Name | Description | Price | Food Type (Veg/Non-Veg) |
+    Items are matched on (category, name); rows that cannot be imported are listed in "errors".
     """
+    file, error = _menu_upload_file()
+    if error:
+        return error
+
+    restaurant = Restaurant.query.filter_by(owner_id=current_user.id).first_or_404()
+    
+    try:
+        result = import_menu_file(restaurant.id, file, menu_file_format(file.filename))
+        return jsonify(result.to_dict()), 201
+    except MenuImportError as e:
+        return jsonify({"message": e.message}), e.status_code
+    except Exception:
+        db.session.rollback()
+        logger.exception("Error during bulk upload")
+        return jsonify({"message": "An error occurred while processing the file. Please check the format and data."}), 500
+
+
+def _menu_upload_file():
+    """ The uploaded menu file from the request, or (None, error response). """
     if 'menu_file' not in request.files:
-        return jsonify({"message": "No file part in the request."}), 400
+        return None, (jsonify({"message": "No file part in the request."}), 400)
     
     file = request.files['menu_file']
 
     if file.filename == '':
-        return jsonify({"message": "No file selected."}), 400
+        return None, (jsonify({"message": "No file selected."}), 400)
         
-    if not file.filename.endswith('.xlsx'):
-        return jsonify({"message": "Invalid file type. Please upload a .xlsx file."}), 400
+    if not menu_file_format(file.filename):
+        return None, (jsonify({"message": "Invalid file type. Please upload a .xlsx or .csv file."}), 400)
+    return file, None
+
+
+# --- ✅ BACKGROUND JOBS: exports and bulk uploads off the request thread ---
+
+@app.route('/api/restaurant/menu/bulk-upload/jobs', methods=['POST'])
+@auth_required('token')
+@roles_required('owner')
+def submit_bulk_upload_job():
+    """ Saves the uploaded menu file and queues it for import; poll /api/jobs/<id> for the result. """
+    file, error = _menu_upload_file()
+    if error:
+        return error
 
     restaurant = Restaurant.query.filter_by(owner_id=current_user.id).first_or_404()
-    
+    file_format = menu_file_format(file.filename)
+    upload_path = new_artifact_path('menu-upload', file_format)
+    file.save(upload_path)
     try:
-        workbook = openpyxl.load_workbook(file)
-        sheet = workbook.active
-        
-        category_cache = {} # Cache to avoid repeated DB lookups
-        items_to_add = []
-        items_added_count = 0
-
-        # Iterate through rows, skipping the header
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            category_name, item_name, description, price, food_type = (list(row) + [None])[:5]
-            if not category_name or not item_name or price is None:
-                continue # Skip incomplete rows
-            category_id = None
-            if category_name in category_cache:
-                category_id = category_cache[category_name]
-            else:
-                category = Category.query.filter_by(name=category_name, restaurant_id=restaurant.id).first()
-                if category:
-                    category_id = category.id
-                else:
-                    new_category = Category(name=category_name, restaurant_id=restaurant.id)
-                    db.session.add(new_category)
-                    db.session.flush() # Get the new ID before committing
-                    category_id = new_category.id
-                category_cache[category_name] = category_id
-
-            new_item = MenuItem(
-                name=item_name,
-                description=description or "",
-                price=float(price),
-                category_id=category_id,
-                restaurant_id=restaurant.id,
-                food_type=food_type if food_type and food_type.strip().title() in ['Veg', 'Non-Veg'] else None
-            )
-            items_to_add.append(new_item)
-            items_added_count += 1
-        
-        if items_to_add:
-            db.session.add_all(items_to_add)
-            db.session.commit()
-            
-        return jsonify({"message": f"Successfully added {items_added_count} menu items."}), 201
+        params = {'restaurant_id': restaurant.id, 'upload_path': upload_path, 'format': file_format}
+        job = submit_job('menu_upload', current_user.id, params)
+    except JobError as e:
+        return jsonify({"message": e.message}), e.status_code
+    return jsonify(job_to_dict(job)), 202
 
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error during bulk upload: {e}")
-        return jsonify({"message": "An error occurred while processing the file. Please check the format and data."}), 500
+@app.route('/api/admin/<any(restaurants, users, orders):export_name>/export/jobs', methods=['POST'])
+@auth_required('token')
+@roles_required('admin')
+def submit_export_job(export_name):
+    """ Queues an export with the same filters as the direct export endpoints. """
+    try:
+        filters = ExportFilters.from_request()
+        params = {'name': export_name, 'format': export_format(), 'filters': filters.to_dict()}
+        job = submit_job('export', current_user.id, params)
+    except (ExportError, JobError) as e:
+        return jsonify({"message": e.message}), e.status_code
+    return jsonify(job_to_dict(job)), 202
+
+def _get_visible_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.user_id != current_user.id and not current_user.has_role('admin'):
+        abort(404)
+    return job
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@auth_required('token')
+def get_job_status(job_id):
+    """ Status and progress of a job submitted by the current user. """
+    return jsonify(job_to_dict(_get_visible_job(job_id))), 200
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+@auth_required('token')
+def download_job_artifact(job_id):
+    job = _get_visible_job(job_id)
+    if job.status != 'succeeded' or not job.artifact_path:
+        return jsonify({"message": "This job has no file to download yet."}), 409
+    if not os.path.exists(job.artifact_path):
+        return jsonify({"message": "The file has expired. Please run the job again."}), 410
+    return send_file(job.artifact_path, as_attachment=True, download_name=job.artifact_name, mimetype=job.artifact_mimetype)
+
+# --- ✅ END BACKGROUND JOBS ---
 
 
 
@@ -2408,8 +2171,8 @@ def get_available_slots(restaurant_id):
                     
         return jsonify(available_days), 200
 
-    except Exception as e:
-        print(f"Error fetching available slots: {e}")
+    except Exception:
+        logger.exception("Error fetching available slots")
         return jsonify({"message": "An error occurred while fetching time slots."}), 500
 
 
@@ -2430,20 +2193,28 @@ def submit_review(order_id):
     data = request.get_json()
     if not data or not data.get('rating'):
         return jsonify({"message": "Rating is a required field."}), 400
+    try:
+        rating = int(data['rating'])
+    except (TypeError, ValueError):
+        return jsonify({"message": "Rating must be a number."}), 400
 
     new_review = Review(
         user_id=current_user.id,
         restaurant_id=order.restaurant_id,
         order_id=order.id,
-        rating=data['rating'],
+        rating=rating,
         comment=data.get('comment', '')
     )
     db.session.add(new_review)
+    record_review(order.restaurant_id, rating)
     db.session.commit()
+    invalidate_tags(restaurant_tag(order.restaurant_id), FEATURED_TAG)
+    mark_recent_write(current_user.id)
 
     return jsonify({"message": "Thank you for your review!"}), 201
 
 @app.route('/api/restaurants/<int:restaurant_id>/reviews', methods=['GET'])
+@read_only_view
 def get_restaurant_reviews(restaurant_id):
     reviews = Review.query.options(joinedload(Review.customer)).filter_by(restaurant_id=restaurant_id).order_by(Review.created_at.desc()).all()
     reviews_data = [{
@@ -2469,41 +2240,19 @@ def upload_image():
     if file.filename == '':
         return jsonify({"message": "No file selected."}), 400
 
-    # Allow more input formats
     ext = file.filename.split('.')[-1].lower()
-    if ext not in ['jpg', 'jpeg', 'png', 'webp']:
+    if ext not in ALLOWED_IMAGE_EXTENSIONS:
         return jsonify({"message": "Invalid file type. Please upload JPG, PNG, or WebP."}), 400
-        
-    # --- THIS IS THE KEY FIX ---
-    # We create a new filename and ALWAYS give it a .jpg extension because we are converting to JPEG.
-    unique_filename = f"{uuid.uuid4()}.jpg" 
-    
-    save_path = os.path.join(app.static_folder, 'assets', 'uploads', unique_filename)
 
+    # Thumb/card/full sizes as JPEG + WebP, deduplicated by content (backend/images.py).
+    # 'url' is the full-size JPEG; 'srcset'/'webpSrcset' list every size.
     try:
-        image = Image.open(file.stream)
-
-        # Convert to RGB to remove transparency and ensure JPEG compatibility
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
-
-        # Resize to a max width/height of 800px
-        image.thumbnail((800, 800))
-        
-        # Save the compressed image as a JPEG
-        image.save(save_path, 'jpeg', quality=85, optimize=True)
-
-        # The public URL will now correctly point to the .jpg file
-        public_url = f"/assets/uploads/{unique_filename}"
-        
-        return jsonify({"url": public_url}), 201
-
-    except Exception as e:
-        print(f"Error during image compression: {e}")
+        return jsonify(store_image(file.read())), 201
+    except ImageError as e:
+        return jsonify({"message": e.message}), e.status_code
+    except Exception:
+        logger.exception("Error during image compression")
         return jsonify({"message": "An error occurred while processing the image."}), 500
-@app.before_request
-def debug_token():
-    print("Received Authentication-Token:", request.headers.get('Authentication-Token'))
 
     
 
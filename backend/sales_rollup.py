@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+
+from flask import request
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .models import db, Order, Restaurant, DailyRestaurantSales
+from .aggregates import add_to_counters
+
+# --- Daily sales rollup ---
+# DailyRestaurantSales holds, per restaurant and UTC day the orders were
+# placed, the number of completed orders and their revenue, discount and fees.
+# Handlers change an order's status through set_order_status(), which adds the
+# order in the same transaction when it becomes 'completed' and takes it out
+# again if it leaves that status (a refund, say), so the rollup always equals
+# the totals over orders whose status is 'completed'. The change is a
+# conditional UPDATE on the status in the database, not on the copy the
+# request loaded: when checkout verification and the payment webhook complete
+# the same order at once, only the one whose UPDATE matches counts the sale.
+# Analytics and admin reports read it instead of the order table, which keeps
+# them cheap for any date range. `flask rebuild-daily-sales` recomputes it.
+
+DEFAULT_REPORT_DAYS = 7
+MAX_REPORT_DAYS = 366
+
+SALES_COUNTERS = ['orders', 'revenue', 'discount', 'fees']
+
+
+class ReportError(Exception):
+    """ Raised for an invalid report date range. """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _sale_row(order, sign):
+    return {
+        'restaurant_id': order.restaurant_id,
+        'day': (order.created_at or datetime.utcnow()).date(),
+        'orders': sign,
+        'revenue': sign * (order.total_amount or 0.0),
+        'discount': sign * (order.discount_amount or 0.0),
+        'fees': sign * ((order.delivery_fee or 0.0) + (order.platform_fee or 0.0))
+    }
+
+
+def record_sale(order):
+    """ Adds a newly completed order to its day's totals. Caller commits. """
+    add_to_counters(DailyRestaurantSales, [_sale_row(order, 1)], ['restaurant_id', 'day'], SALES_COUNTERS)
+
+
+def forget_sale(order):
+    """ Removes a completed order (e.g. one being refunded) from its day's totals. Caller commits. """
+    add_to_counters(DailyRestaurantSales, [_sale_row(order, -1)], ['restaurant_id', 'day'], SALES_COUNTERS)
+
+
+def _change_status(order, status, *conditions):
+    """ UPDATEs the order's row to `status` if it matches `conditions`. Returns whether it did. """
+    result = db.session.execute(
+        update(Order).where(Order.id == order.id, *conditions).values(status=status),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount == 1
+
+
+def set_order_status(order, status):
+    """
+    Sets an order's status, keeping the rollup in step as it enters or leaves
+    'completed'. Returns False, leaving the order as the database has it, when
+    the order already had `status` (e.g. another request completed it first).
+    Caller commits.
+    """
+    if status == 'completed':
+        changed = _change_status(order, status, Order.status != 'completed')
+        if changed:
+            record_sale(order)
+    else:
+        changed = _change_status(order, status, Order.status == 'completed')
+        if changed:
+            forget_sale(order)
+        else:
+            changed = _change_status(order, status, Order.status.notin_(['completed', status]))
+    if changed:
+        set_committed_value(order, 'status', status)
+    else:
+        db.session.expire(order, ['status'])
+    return changed
+
+
+def rebuild_daily_sales():
+    """ Recomputes the whole rollup from completed orders in one INSERT ... SELECT. Returns rows written. """
+    day = func.date(Order.created_at)
+    totals = select(
+        Order.restaurant_id,
+        day,
+        func.count(Order.id),
+        func.coalesce(func.sum(Order.total_amount), 0.0),
+        func.coalesce(func.sum(Order.discount_amount), 0.0),
+        func.coalesce(func.sum(func.coalesce(Order.delivery_fee, 0.0) + func.coalesce(Order.platform_fee, 0.0)), 0.0)
+    ).where(Order.status == 'completed').group_by(Order.restaurant_id, day)
+
+    db.session.execute(delete(DailyRestaurantSales))
+    result = db.session.execute(insert(DailyRestaurantSales).from_select(
+        ['restaurant_id', 'day'] + SALES_COUNTERS, totals
+    ))
+    db.session.commit()
+    return result.rowcount
+
+
+# --- Reading ---
+
+def report_range(default_days=DEFAULT_REPORT_DAYS):
+    """
+    (first_day, last_day) from ?from=YYYY-MM-DD&to=YYYY-MM-DD, both inclusive.
+    Defaults to the `default_days` days up to today (UTC).
+    """
+    args = request.args
+    try:
+        last_day = datetime.strptime(args['to'], '%Y-%m-%d').date() if args.get('to') else datetime.utcnow().date()
+        first_day = datetime.strptime(args['from'], '%Y-%m-%d').date() if args.get('from') \
+            else last_day - timedelta(days=default_days - 1)
+    except ValueError:
+        raise ReportError("Dates must be in YYYY-MM-DD format.")
+    if first_day > last_day:
+        raise ReportError("'from' must not be after 'to'.")
+    if (last_day - first_day).days >= MAX_REPORT_DAYS:
+        raise ReportError(f"Reports can cover at most {MAX_REPORT_DAYS} days.")
+    return first_day, last_day
+
+
+def _filtered(query, restaurant_id=None, first_day=None, last_day=None):
+    if restaurant_id is not None:
+        query = query.filter(DailyRestaurantSales.restaurant_id == restaurant_id)
+    if first_day is not None:
+        query = query.filter(DailyRestaurantSales.day >= first_day)
+    if last_day is not None:
+        query = query.filter(DailyRestaurantSales.day <= last_day)
+    return query
+
+
+def sales_totals(restaurant_id=None, first_day=None, last_day=None):
+    """ {'orders', 'revenue', 'discount', 'fees'} summed over the rollup (all of it by default). """
+    query = db.session.query(*[func.coalesce(func.sum(getattr(DailyRestaurantSales, name)), 0)
+                               for name in SALES_COUNTERS])
+    return dict(zip(SALES_COUNTERS, _filtered(query, restaurant_id, first_day, last_day).one()))
+
+
+def daily_sales(first_day, last_day, restaurant_id=None):
+    """ [{'day': date, 'orders', 'revenue', 'discount', 'fees'}] for every day in the range, zeros included. """
+    query = db.session.query(DailyRestaurantSales.day, *[func.sum(getattr(DailyRestaurantSales, name))
+                                                         for name in SALES_COUNTERS])
+    query = _filtered(query, restaurant_id, first_day, last_day).group_by(DailyRestaurantSales.day)
+    by_day = {day: values for day, *values in query}
+
+    days = []
+    for offset in range((last_day - first_day).days + 1):
+        day = first_day + timedelta(days=offset)
+        values = by_day.get(day, [0, 0.0, 0.0, 0.0])
+        days.append({'day': day, **dict(zip(SALES_COUNTERS, values))})
+    return days
+
+
+def top_restaurants(limit=5, first_day=None, last_day=None):
+    """ [(name, revenue)] for the highest-earning restaurants (over all time by default). """
+    revenue = func.sum(DailyRestaurantSales.revenue)
+    query = db.session.query(Restaurant.name, revenue) \
+        .select_from(DailyRestaurantSales) \
+        .join(Restaurant, Restaurant.id == DailyRestaurantSales.restaurant_id)
+    return _filtered(query, None, first_day, last_day) \
+        .group_by(Restaurant.id, Restaurant.name) \
+        .order_by(revenue.desc()).limit(limit).all()
@@ -0,0 +1,123 @@
+import logging
+from datetime import datetime, timedelta
+
+from celery import shared_task
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.orm import joinedload, selectinload
+
+from .models import db, Order, OrderItem
+from .aggregates import prune_popular_items
+from .order_events import publish_order_event
+
+logger = logging.getLogger(__name__)
+
+# --- Delayed actions ---
+# Work that has to happen "some time after" an event is persisted as a due
+# timestamp on the row itself (e.g. Order.otp_expires_at) and carried out by
+# sweeps: set-based statements that act on every row whose time has come.
+# A single background process runs all sweeps every SWEEP_INTERVAL_SECONDS,
+# either Celery beat (celery -A backend.worker beat) or `flask run-sweeps --loop`,
+# so nothing sleeps in web workers and nothing is lost when they restart.
+#
+# To add a delayed action, store its due time on the row and register a
+# function with @sweep that performs it in bulk and returns the row count.
+# Readers must not depend on a sweep having run: anything that returns a value
+# with a due time treats it as gone once the time has passed (see order_otp()).
+
+SWEEPS = {}
+
+
+def sweep(name):
+    """ Registers `fn(now)` as a sweep run by run_sweeps(). """
+    def decorator(fn):
+        SWEEPS[name] = fn
+        return fn
+    return decorator
+
+
+def schedule_otp_expiry(order, now=None):
+    """ Marks a verified order's OTP for clearing after OTP_CLEAR_DELAY_SECONDS. """
+    now = now or datetime.utcnow()
+    order.otp_expires_at = now + timedelta(seconds=current_app.config['OTP_CLEAR_DELAY_SECONDS'])
+
+
+def order_otp(order, now=None):
+    """ The order's OTP, or None once its expiry has passed (whether or not the sweep has cleared it yet). """
+    if order.otp_expires_at is not None and order.otp_expires_at <= (now or datetime.utcnow()):
+        return None
+    return order.otp
+
+
+@sweep('otp-expiry')
+def expire_otps(now):
+    """ Clears every OTP whose expiry has passed, in one UPDATE. """
+    result = db.session.execute(
+        update(Order)
+        .where(Order.otp_expires_at <= now)
+        .values(otp=None, otp_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+@sweep('unpaid-order-cancel')
+def cancel_unpaid_orders(now):
+    """
+    Cancels orders still 'placed' and unpaid UNPAID_ORDER_CANCEL_MINUTES after
+    they were created (disabled when the setting is 0). Orders are handled a
+    batch at a time so their restaurants' queues can be told about them.
+    """
+    minutes = current_app.config['UNPAID_ORDER_CANCEL_MINUTES']
+    if not minutes:
+        return 0
+    cutoff = now - timedelta(minutes=minutes)
+    due = (Order.status == 'placed') & (Order.payment_status == 'pending') & (Order.created_at <= cutoff)
+
+    order_ids = [order_id for (order_id,) in db.session.query(Order.id).filter(due).limit(current_app.config['SWEEP_BATCH_SIZE'])]
+    if not order_ids:
+        return 0
+    # Re-check the condition so an order paid in the meantime is left alone
+    result = db.session.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids), due)
+        .values(status='cancelled')
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    cancelled = Order.query.options(
+        joinedload(Order.customer),
+        selectinload(Order.items).joinedload(OrderItem.menu_item)
+    ).filter(Order.id.in_(order_ids), Order.status == 'cancelled')
+    for order in cancelled:
+        publish_order_event(order)
+    return result.rowcount
+
+
+@sweep('popular-items-prune')
+def prune_popular_item_counters(now):
+    """ Drops popular-item counter days that have left the dashboard's window. """
+    return prune_popular_items(today=now.date())
+
+
+def run_sweeps(now=None, names=None):
+    """ Runs the registered sweeps (or just `names`), committing each one. Returns {name: rows}. """
+    now = now or datetime.utcnow()
+    results = {}
+    for name, fn in SWEEPS.items():
+        if names and name not in names:
+            continue
+        try:
+            results[name] = fn(now)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Sweep '%s' failed", name)
+            results[name] = None
+    return results
+
+
+@shared_task(name='backend.scheduler.run_sweeps', ignore_result=True)
+def run_sweeps_task():
+    run_sweeps()
@@ -0,0 +1,315 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+from flask import Response, current_app, request, send_from_directory
+from whitenoise import WhiteNoise
+from whitenoise.compress import Compressor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# --- Content-hashed static assets ---
+# At startup every file under frontend/ (except runtime uploads) is hashed.
+# Each file is copied into a build directory twice: under its own name and as
+# name.<hash>.ext. Both copies get .gz (and .br, with the brotli package)
+# siblings, which WhiteNoise serves to clients that accept them. Hashed URLs
+# never change content, so they are served with `Cache-Control: immutable`.
+#
+# index.html is rewritten to point at the hashed names. It also gets an import
+# map, so the ES-module imports between pages and components (which use plain
+# relative paths) load the hashed files too, without rewriting any JavaScript.
+# index.html, sw.js and manifest.json keep fixed URLs and are sent with
+# `no-cache`, so a deploy is picked up on the next navigation.
+#
+# A build lives in STATIC_BUILD_DIR/<build id>, where the id is a hash of the
+# build's content. Workers that start with identical files reuse the same
+# build; the first one to finish renames its temp dir into place.
+#
+# Client-side routes (/restaurant/12, /orders, ...) get the SPA shell: the
+# built index.html held in memory, pre-compressed, with a strong ETag, so a
+# navigation costs no filesystem access. reload_static_assets() rebuilds from
+# disk and swaps the shell and WhiteNoise's file table in place. It runs in the
+# worker that receives POST /api/admin/static-assets/reload (or
+# `flask reload-static`); it bumps a generation in the shared cache that the
+# other workers check at most every STATIC_RELOAD_CHECK_SECONDS.
+
+BUILD_FORMAT = '1'
+MANIFEST_NAME = 'staticfiles.json'
+HASH_LENGTH = 12
+KEEP_BUILDS = 3
+# Served from frontend/ as they are; uploads arrive after startup
+EXCLUDED_DIRS = (os.path.join('assets', 'uploads'),)
+STABLE_URL_FILES = ('index.html', 'sw.js', 'manifest.json')
+
+HASHED_URL = re.compile(r'\.[0-9a-f]{%d}\.[A-Za-z0-9]+$' % HASH_LENGTH)
+# backend/images.py names upload directories by content hash
+UPLOAD_URL = re.compile(r'^/assets/uploads/[0-9a-f]{24}/')
+_LOCAL_REFERENCE = re.compile(r'''\b(src|href)=(["'])(/[^"'?#]+)\2''')
+RELOAD_GENERATION_KEY = 'static-assets:generation'
+
+
+class AssetBuild:
+    """ A finished build: its directory and the original -> hashed path mapping. """
+
+    def __init__(self, directory, paths):
+        self.directory = directory
+        self.paths = paths
+
+    def url(self, path):
+        """ Hashed URL for a path under frontend/ ('/app.js' -> '/app.<hash>.js'); unknown paths unchanged. """
+        hashed = self.paths.get(path.lstrip('/'))
+        return '/' + hashed if hashed else path
+
+
+def hashed_name(path, digest):
+    root, extension = os.path.splitext(path)
+    return f'{root}.{digest[:HASH_LENGTH]}{extension}'
+
+
+def _source_files(source):
+    """ Relative paths (with '/') of the files to build. """
+    for directory, dirnames, filenames in os.walk(source):
+        relative_dir = os.path.relpath(directory, source)
+        dirnames[:] = sorted(d for d in dirnames
+                             if not d.startswith('.') and os.path.normpath(os.path.join(relative_dir, d)) not in EXCLUDED_DIRS)
+        for filename in sorted(filenames):
+            if not filename.startswith('.'):
+                yield os.path.normpath(os.path.join(relative_dir, filename)).replace(os.sep, '/')
+
+
+def hash_sources(source):
+    """ {relative path: sha256 hex} for every file to build. """
+    digests = {}
+    for path in _source_files(source):
+        with open(os.path.join(source, path), 'rb') as f:
+            digests[path] = hashlib.sha256(f.read()).hexdigest()
+    return digests
+
+
+def rewrite_index(html, paths):
+    """ Points index.html's local src/href references at hashed names and adds an import map. """
+    def replace(match):
+        hashed = paths.get(match.group(3).lstrip('/'))
+        if not hashed:
+            return match.group(0)
+        return f'{match.group(1)}={match.group(2)}/{hashed}{match.group(2)}'
+
+    html = _LOCAL_REFERENCE.sub(replace, html)
+    imports = {'/' + path: '/' + hashed for path, hashed in paths.items() if path.endswith('.js')}
+    import_map = json.dumps({'imports': imports}, indent=2, sort_keys=True)
+    # Must come before the first module script
+    return html.replace('</head>', f'    <script type="importmap">\n{import_map}\n    </script>\n</head>', 1)
+
+
+def _write_build(source, directory, digests):
+    paths = {path: hashed_name(path, digest) for path, digest in digests.items()
+             if os.path.basename(path) not in STABLE_URL_FILES}
+    compressor = Compressor(log=logger.debug, quiet=True)
+    for path in digests:
+        targets = [path] + ([paths[path]] if path in paths else [])
+        for target in targets:
+            destination = os.path.join(directory, target)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            if path == 'index.html':
+                with open(os.path.join(source, path), encoding='utf-8') as f:
+                    html = rewrite_index(f.read(), paths)
+                with open(destination, 'w', encoding='utf-8', newline='') as f:
+                    f.write(html)
+            else:
+                shutil.copyfile(os.path.join(source, path), destination)
+            if compressor.should_compress(destination):
+                list(compressor.compress(destination))
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as f:
+        json.dump({'version': BUILD_FORMAT, 'paths': paths}, f, indent=2, sort_keys=True)
+    return paths
+
+
+def _prune(root, keep):
+    """ Removes all but the `keep` newest builds (older workers may still be serving recent ones). """
+    builds = sorted((entry for entry in os.scandir(root) if entry.is_dir() and not entry.name.startswith('.')),
+                    key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in builds[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def build(source, root):
+    """ Builds (or reuses) the asset build for `source` under `root`. Returns an AssetBuild. """
+    digests = hash_sources(source)
+    build_id = hashlib.sha256(json.dumps([BUILD_FORMAT, digests], sort_keys=True).encode()).hexdigest()[:HASH_LENGTH]
+    directory = os.path.join(root, build_id)
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return AssetBuild(directory, json.load(f)['paths'])
+
+    os.makedirs(root, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix='.build-', dir=root)
+    try:
+        paths = _write_build(source, work_dir, digests)
+        try:
+            os.rename(work_dir, directory)
+        except OSError:
+            pass # Another worker finished the same build first
+        else:
+            logger.info("Built static assets %s (%d files)", build_id, len(digests))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    _prune(root, KEEP_BUILDS)
+    return AssetBuild(directory, paths)
+
+
+def is_immutable(path, url):
+    return bool(HASHED_URL.search(url) or UPLOAD_URL.match(url))
+
+
+def _add_headers(headers, path, url):
+    if os.path.basename(path) in STABLE_URL_FILES:
+        headers['Cache-Control'] = 'no-cache'
+
+
+# --- SPA shell ---
+
+class SpaShell:
+    """ index.html in memory: identity, gzip and (with brotli) br bodies sharing one ETag base. """
+
+    def __init__(self, html):
+        self.etag = hashlib.sha256(html).hexdigest()[:20]
+        self.bodies = {'identity': html, 'gzip': gzip.compress(html, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(html)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def _encoding(self, accept_encodings):
+        for encoding in ('br', 'gzip'):
+            if encoding in self.bodies and accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def response(self, req):
+        """ The shell for `req`, or a 304 when its If-None-Match still matches. """
+        encoding = self._encoding(req.accept_encodings)
+        # Strong ETags differ per encoding; any of ours means the client has this version
+        etag = self.etag if encoding == 'identity' else f'{self.etag}-{encoding}'
+        headers = {'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding', 'ETag': f'"{etag}"'}
+        if any(tag == self.etag or tag.startswith(self.etag + '-') for tag in req.if_none_match.as_set()):
+            return Response(status=304, headers=headers)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(self.bodies[encoding], mimetype='text/html', headers=headers)
+
+
+# --- Serving and reloading ---
+
+class StaticAssets:
+    """ Per-process serving state: the WhiteNoise wrapper, the current build and the SPA shell. """
+
+    def __init__(self, app, whitenoise):
+        self.app = app
+        self.whitenoise = whitenoise
+        self.build = None
+        self.shell = None
+        self.generation = None
+        self._checked_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """ (Re)builds from frontend/ and swaps in the new build and shell. """
+        app = self.app
+        self.whitenoise.add_files(app.static_folder)
+        if app.config['STATIC_ASSET_HASHING']:
+            root = app.config['STATIC_BUILD_DIR'] or os.path.join(app.instance_path, 'static')
+            asset_build = build(app.static_folder, root)
+            self.whitenoise.add_files(asset_build.directory) # Takes precedence over the plain frontend/ files
+            self.build = asset_build
+            self.shell = SpaShell.load(os.path.join(asset_build.directory, 'index.html'))
+        else:
+            self.build = None
+            self.shell = SpaShell.load(os.path.join(app.static_folder, 'index.html'))
+
+    def reload_if_stale(self):
+        """ Reloads when another worker has reloaded since this one last did (rate-limited). """
+        interval = self.app.config['STATIC_RELOAD_CHECK_SECONDS']
+        now = time.monotonic()
+        if not interval or now - self._checked_at < interval:
+            return
+        with self._lock:
+            if now - self._checked_at < interval:
+                return
+            self._checked_at = now
+            generation = _reload_generation()
+            if generation is None or generation == self.generation:
+                return
+            self.generation = generation
+            self.load()
+            logger.info("Reloaded static assets (generation %s)", generation)
+
+
+def _reload_generation():
+    from .extensions import cache
+    try:
+        return cache.get(RELOAD_GENERATION_KEY)
+    except Exception as e:
+        logger.warning("Could not read the static asset generation: %s", e)
+        return None
+
+
+def get_static_assets(app=None):
+    app = app or current_app._get_current_object()
+    return app.extensions['static_assets']
+
+
+def get_asset_build(app=None):
+    """ The app's AssetBuild, or None when STATIC_ASSET_HASHING is off. """
+    return get_static_assets(app).build
+
+
+def spa_shell_response():
+    """ The in-memory index.html for the current request. """
+    assets = get_static_assets()
+    assets.reload_if_stale()
+    return assets.shell.response(request)
+
+
+def reload_static_assets(app=None):
+    """ Reloads this process now and tells the other workers to follow. Returns the build id (or None). """
+    from .extensions import cache
+    assets = get_static_assets(app)
+    with assets._lock:
+        assets.load()
+        assets.generation = os.urandom(8).hex()
+        try:
+            cache.set(RELOAD_GENERATION_KEY, assets.generation, timeout=0)
+        except Exception as e:
+            logger.warning("Could not publish the static asset generation: %s", e)
+    return os.path.basename(assets.build.directory) if assets.build else None
+
+
+def init_app(app):
+    """ Serves frontend/ through WhiteNoise (hashed and precompressed when enabled) and loads the SPA shell. """
+    # No index_file: '/' is a client-side route like any other and gets the in-memory shell
+    whitenoise = WhiteNoise(app.wsgi_app, immutable_file_test=is_immutable, add_headers_function=_add_headers)
+    assets = StaticAssets(app, whitenoise)
+    app.extensions['static_assets'] = assets
+    assets.load()
+    app.wsgi_app = whitenoise
+
+    # WhiteNoise only knows the files present at startup; images uploaded since are served from disk here
+    @app.route('/assets/uploads/<path:filename>')
+    def uploaded_file(filename):
+        return send_from_directory(os.path.join(app.static_folder, 'assets', 'uploads'), filename)
@@ -0,0 +1,13 @@
+from datetime import timedelta
+
+# --- Display time zone ---
+# Timestamps are stored in UTC; customers and restaurants see Indian Standard
+# Time, which has a fixed offset and no daylight saving, so one shared
+# timedelta is all the conversion needs.
+
+IST_OFFSET = timedelta(hours=5, minutes=30)
+
+
+def to_ist(dt):
+    """ A naive UTC datetime as naive IST (None stays None). """
+    return dt + IST_OFFSET if dt is not None else None
@@ -0,0 +1,12 @@
+"""
+Celery worker entry point:
+
+    celery -A backend.worker worker --loglevel=info
+    celery -A backend.worker beat --loglevel=info   # one instance: delayed-action sweeps
+
+Set REDIS_URL (or CELERY_BROKER_URL) so the web app and the worker share a
+broker; without one the web app runs jobs in-process instead.
+"""
+from app import app
+
+celery_app = app.extensions['celery']
@@ -0,0 +1,81 @@
+"""
+Authentication token cache benchmark.
+
+Sends the same authenticated requests through the test client with the
+token cache off (Flask-Security loading the user and roles every time) and
+on, and reports SQL statements and time per request for each.
+
+    python benchmarks/bench_auth_cache.py --requests 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'auth_cache.sqlite3')
+
+from flask_security.core import _request_loader  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.auth_cache import cached_request_loader, get_token_cache  # noqa: E402
+from backend.create_initial_data import init_app as seed_initial_data  # noqa: E402
+
+# (label, path, email, password): a cheap customer read and an owner read behind roles_required
+ENDPOINTS = [
+    ('customer favorites', '/api/favorites', 'customer1@email.com', 'cust123'),
+    ('owner promotions', '/api/restaurant/promotions', 'owner1@email.com', 'owner123'),
+]
+
+
+def run(client, path, token, count):
+    """ (statements per request, ms per request) """
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_execute)
+    start = time.perf_counter()
+    try:
+        for _ in range(count):
+            response = client.get(path, headers={'Authentication-Token': token})
+            assert response.status_code == 200, (path, response.status_code)
+    finally:
+        elapsed = time.perf_counter() - start
+        event.remove(engine, 'before_cursor_execute', before_execute)
+    return len(statements) / count, elapsed / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        seed_initial_data(app)
+
+    client = app.test_client()
+    print(f"{'':20}{'uncached':>24}{'cached':>24}")
+    for label, path, email, password in ENDPOINTS:
+        token = client.post('/api/login', json={'email': email, 'password': password}).get_json()['token']
+        app.login_manager.request_loader(_request_loader)
+        off = run(client, path, token, args.requests)
+        app.login_manager.request_loader(cached_request_loader)
+        with app.app_context():
+            get_token_cache().clear()
+        on = run(client, path, token, args.requests)
+        print(f'{label:20}{off[0]:8.1f} stmts {off[1]:6.2f} ms{on[0]:10.1f} stmts {on[1]:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
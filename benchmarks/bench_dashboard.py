@@ -0,0 +1,127 @@
+"""
+Restaurant dashboard metrics benchmark: single-statement metrics + popular-item
+counters vs the old per-metric queries over the full order history.
+
+Seeds a few restaurants, then grows their order history in steps (a year of
+orders, those from the last hour partly still pending) and after each step times both ways of
+computing today's revenue, today's orders, pending orders and the top five
+items for one restaurant. The new timings should stay flat as history grows.
+
+    python benchmarks/bench_dashboard.py --steps 50000,200000,500000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'dashboard.sqlite3')
+
+from sqlalchemy import Date, func, insert, select, text  # noqa: E402
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import MenuItem, Order, OrderItem  # noqa: E402
+from backend.aggregates import popular_items, rebuild_popular_items  # noqa: E402
+from explain_indexes import seed, CHUNK  # noqa: E402
+
+RESTAURANTS = 20
+RESTAURANT_ID = 1
+REPEATS = 20
+
+
+def add_orders(first_id, count, rng):
+    now = datetime.utcnow()
+    for start in range(first_id, first_id + count, CHUNK):
+        orders, items = [], []
+        for order_id in range(start, min(start + CHUNK, first_id + count)):
+            restaurant_id = rng.randint(1, RESTAURANTS)
+            created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+            # Only orders from the last hour can still be waiting in the kitchen
+            status = rng.choice(['placed', 'preparing', 'completed']) if now - created_at < timedelta(hours=1) else 'completed'
+            orders.append({'id': order_id, 'user_id': rng.randint(1, 1000), 'restaurant_id': restaurant_id,
+                           'total_amount': 250.0, 'status': status, 'order_type': 'takeaway',
+                           'qr_payload': f'qr{order_id}', 'created_at': created_at})
+            items.append({'order_id': order_id, 'quantity': 1, 'price_at_order': 100.0,
+                          'menu_item_id': (restaurant_id - 1) * 25 + rng.randint(1, 25)})
+        db.session.execute(insert(Order), orders)
+        db.session.execute(insert(OrderItem), items)
+        db.session.commit()
+
+
+def legacy_metrics(restaurant_id):
+    """ The previous restaurant_dashboard_stats: three scalar queries and an all-time item count. """
+    today = date.today()
+    revenue = db.session.query(func.sum(Order.total_amount)) \
+        .filter(Order.restaurant_id == restaurant_id, func.cast(Order.created_at, Date) == today).scalar() or 0.0
+    orders = db.session.query(func.count(Order.id)) \
+        .filter(Order.restaurant_id == restaurant_id, func.cast(Order.created_at, Date) == today).scalar() or 0
+    pending = db.session.query(func.count(Order.id)) \
+        .filter(Order.restaurant_id == restaurant_id, Order.status.in_(['placed', 'preparing'])).scalar() or 0
+    popular = db.session.query(MenuItem.name, func.count(OrderItem.id)) \
+        .join(OrderItem, MenuItem.id == OrderItem.menu_item_id) \
+        .filter(MenuItem.restaurant_id == restaurant_id) \
+        .group_by(MenuItem.name).order_by(func.count(OrderItem.id).desc()).limit(5).all()
+    return revenue, orders, pending, popular
+
+
+def one_pass_metrics(restaurant_id):
+    """ What restaurant_dashboard_stats runs now. """
+    day_start = datetime.combine(date.today(), datetime.min.time())
+    pending_count = select(func.count(Order.id)) \
+        .where(Order.restaurant_id == restaurant_id, Order.status.in_(['placed', 'preparing'])).scalar_subquery()
+    revenue, orders, pending = db.session.query(
+        func.coalesce(func.sum(Order.total_amount), 0.0), func.count(Order.id), pending_count
+    ).filter(
+        Order.restaurant_id == restaurant_id,
+        Order.created_at >= day_start, Order.created_at < day_start + timedelta(days=1)
+    ).one()
+    return revenue, orders, pending, popular_items(restaurant_id, limit=5)
+
+
+def timed(fn, *args):
+    """ Best of REPEATS runs, in milliseconds. """
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', default='50000,200000,500000', help='total order counts to measure at')
+    args = parser.parse_args()
+    steps = [int(step) for step in args.steps.split(',')]
+
+    rng = random.Random(42)
+    with app.app_context():
+        seed(0, 1000, RESTAURANTS)
+        total = 0
+        print(f"{'orders':>9}  {'per-metric queries':>18}  {'one statement + counters':>24}")
+        for step in steps:
+            add_orders(total + 1, step - total, rng)
+            total = step
+            # Bulk-inserted orders bypass place_order, so fill the counters the way a deploy would
+            rebuild_popular_items()
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+
+            # Only pending counts are compared: on SQLite the old CAST(created_at AS DATE) = today
+            # never matched, so its "today" figures were always zero
+            old, new = legacy_metrics(RESTAURANT_ID), one_pass_metrics(RESTAURANT_ID)
+            assert old[2] == new[2], (old, new)
+            print(f'{total:9}  {timed(legacy_metrics, RESTAURANT_ID):15.2f} ms  '
+                  f'{timed(one_pass_metrics, RESTAURANT_ID):21.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Upload pipeline timing and bytes sent per menu card.
+
+Generates --count photo-like JPEGs (--width x --height), stores each with the
+old pipeline (one 800px JPEG, quality 85) and with backend/images.py, and
+reports the time per upload and the bytes a card downloads: the old 800px JPEG
+versus the 'card' WebP (and JPEG) a browser picks from the srcset.
+
+    python benchmarks/bench_images.py --count 20
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_images.sqlite3'))
+
+from PIL import Image, ImageFilter  # noqa: E402
+
+from app import app  # noqa: E402
+from backend import images  # noqa: E402
+
+
+def photo(width, height, seed):
+    """ A noisy, blurred gradient: compresses roughly like a food photo. """
+    rng = random.Random(seed)
+    image = Image.radial_gradient('L').resize((width, height)).convert('RGB')
+    noise = Image.effect_noise((width, height), 90).convert('RGB')
+    tint = Image.new('RGB', (width, height), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    image = Image.blend(Image.blend(image, noise, 0.5), tint, 0.4).filter(ImageFilter.GaussianBlur(0.6))
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=92)
+    return buffer.getvalue()
+
+
+def old_pipeline(data):
+    image = Image.open(io.BytesIO(data)).convert('RGB')
+    image.thumbnail((800, 800))
+    buffer = io.BytesIO()
+    image.save(buffer, 'jpeg', quality=85, optimize=True)
+    return len(buffer.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=10)
+    parser.add_argument('--width', type=int, default=3000)
+    parser.add_argument('--height', type=int, default=2000)
+    args = parser.parse_args()
+
+    uploads = [photo(args.width, args.height, n) for n in range(args.count)]
+    static_folder = app.static_folder
+    app.static_folder = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        old_bytes = sum(old_pipeline(data) for data in uploads)
+        old_time = (time.perf_counter() - start) / args.count
+
+        with app.app_context():
+            start = time.perf_counter()
+            manifests = [images.store_image(data) for data in uploads]
+            new_time = (time.perf_counter() - start) / args.count
+            root = images.upload_root()
+
+        def size(manifest, name, extension):
+            return os.path.getsize(os.path.join(root, manifest['hash'], f'{name}.{extension}'))
+
+        card_jpeg = sum(size(m, 'card', 'jpg') for m in manifests)
+        card_webp = sum(size(m, 'card', 'webp') for m in manifests) if images.webp_supported() else None
+    finally:
+        shutil.rmtree(app.static_folder, ignore_errors=True)
+        app.static_folder = static_folder
+
+    print(f'{args.count} uploads of {args.width}x{args.height}')
+    print(f'  old pipeline: {old_time * 1000:8.1f} ms/upload   800px JPEG {old_bytes / args.count / 1024:7.1f} KiB/card')
+    print(f'  new pipeline: {new_time * 1000:8.1f} ms/upload   card JPEG  {card_jpeg / args.count / 1024:7.1f} KiB/card'
+          f'  ({old_bytes / card_jpeg:.1f}x fewer bytes)')
+    if card_webp:
+        print(f'{"":50}card WebP  {card_webp / args.count / 1024:7.1f} KiB/card  ({old_bytes / card_webp:.1f}x fewer bytes)')
+
+
+if __name__ == '__main__':
+    main()
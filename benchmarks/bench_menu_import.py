@@ -0,0 +1,125 @@
+"""
+Bulk menu import benchmark: set-based upsert vs the old row-by-row importer.
+
+Builds a menu workbook (and the same rows as CSV) with the given number of
+rows spread over a few dozen categories, then times each importer on a fresh
+restaurant, and times a second upload of the same file, which now updates the
+existing items instead of duplicating them.
+
+    python benchmarks/bench_menu_import.py --rows 20000
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'menu_import.sqlite3')
+
+import openpyxl  # noqa: E402
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import User, Restaurant, Category, MenuItem  # noqa: E402
+from backend.menu_import import import_menu_file  # noqa: E402
+
+HEADER = ["Category", "Name", "Description", "Price", "Food Type (Veg/Non-Veg)"]
+
+
+def build_files(rows, directory):
+    data = [[f"Category {i % 40}", f"Item {i}", f"Description of item {i}", 50 + i % 500, "Veg" if i % 2 else "Non-Veg"]
+            for i in range(rows)]
+    xlsx_path = os.path.join(directory, 'menu.xlsx')
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(HEADER)
+    for row in data:
+        sheet.append(row)
+    workbook.save(xlsx_path)
+
+    csv_path = os.path.join(directory, 'menu.csv')
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(data)
+    return xlsx_path, csv_path
+
+
+def legacy_import(restaurant_id, path):
+    """ The previous implementation: full workbook load, a query and flush per category, ORM adds. """
+    workbook = openpyxl.load_workbook(path)
+    sheet = workbook.active
+    category_cache = {}
+    items_to_add = []
+    for row in sheet.iter_rows(min_row=2, values_only=True):
+        category_name, item_name, description, price, food_type = row
+        if not category_name or not item_name or price is None:
+            continue
+        if category_name in category_cache:
+            category_id = category_cache[category_name]
+        else:
+            category = Category.query.filter_by(name=category_name, restaurant_id=restaurant_id).first()
+            if category:
+                category_id = category.id
+            else:
+                category = Category(name=category_name, restaurant_id=restaurant_id)
+                db.session.add(category)
+                db.session.flush()
+                category_id = category.id
+            category_cache[category_name] = category_id
+        items_to_add.append(MenuItem(name=item_name, description=description or "", price=float(price),
+                                     category_id=category_id, restaurant_id=restaurant_id, food_type=food_type))
+    db.session.add_all(items_to_add)
+    db.session.commit()
+    db.session.expunge_all()
+    return len(items_to_add)
+
+
+def new_restaurant(owner_id, name):
+    restaurant = Restaurant(owner_id=owner_id, name=name, address='1 Bench Road', city='Bench')
+    db.session.add(restaurant)
+    db.session.commit()
+    return restaurant.id
+
+
+def timed(label, fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    print(f'  {label:28} {time.perf_counter() - start:6.2f} s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--skip-legacy', action='store_true', help='do not run the row-by-row importer')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        owner = User.query.first()
+        if owner is None:
+            owner = User(email='bench-owner@example.com', password='x', name='Bench Owner', fs_uniquifier='bench-owner')
+            db.session.add(owner)
+            db.session.commit()
+        owner_id = owner.id
+
+        xlsx_path, csv_path = build_files(args.rows, tempfile.mkdtemp())
+        print(f'{args.rows} menu rows')
+        if not args.skip_legacy:
+            timed('row-by-row xlsx', legacy_import, new_restaurant(owner_id, 'Legacy'), xlsx_path)
+
+        restaurant_id = new_restaurant(owner_id, 'Bulk xlsx')
+        timed('set-based xlsx (new items)', import_menu_file, restaurant_id, xlsx_path, 'xlsx')
+        timed('set-based xlsx (re-upload)', import_menu_file, restaurant_id, xlsx_path, 'xlsx')
+        timed('set-based csv (new items)', import_menu_file, new_restaurant(owner_id, 'Bulk csv'), csv_path, 'csv')
+        items = MenuItem.query.filter_by(restaurant_id=restaurant_id).count()
+        print(f'items after re-upload: {items}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Nearby-restaurant lookup benchmark: grid index vs the old full haversine scan.
+
+Scatters N restaurants over a metro-sized area, checks that the grid returns
+exactly what a brute-force scan returns, and prints median/p95 latency.
+
+    python benchmarks/bench_nearby.py --restaurants 50000 --radius 7
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from backend.geo import GridIndex, haversine  # noqa: E402
+
+
+def full_scan(points, lat, lng, radius_km, limit):
+    hits = []
+    for restaurant_id, r_lat, r_lng in points:
+        distance = haversine(lat, lng, r_lat, r_lng)
+        if distance <= radius_km:
+            hits.append((distance, restaurant_id))
+    hits.sort()
+    return [(restaurant_id, distance) for distance, restaurant_id in hits[:limit]]
+
+
+def timed(fn, queries):
+    timings = []
+    for lat, lng in queries:
+        start = time.perf_counter()
+        fn(lat, lng)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--restaurants', type=int, default=50000)
+    parser.add_argument('--radius', type=float, default=7.0)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=200)
+    # Roughly the Bengaluru metro area
+    parser.add_argument('--box', type=float, nargs=4, default=[12.75, 13.25, 77.35, 77.85],
+                        metavar=('MIN_LAT', 'MAX_LAT', 'MIN_LNG', 'MAX_LNG'))
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    min_lat, max_lat, min_lng, max_lng = args.box
+    points = [(i, rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng))
+              for i in range(1, args.restaurants + 1)]
+    queries = [(rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng)) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = GridIndex(points)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    for lat, lng in queries[:20]:
+        expected = [rid for rid, _ in full_scan(points, lat, lng, args.radius, args.limit)]
+        got = [rid for rid, _ in index.query(lat, lng, args.radius, args.limit)]
+        assert got == expected, 'grid index disagrees with the full scan'
+
+    grid_median, grid_p95 = timed(lambda lat, lng: index.query(lat, lng, args.radius, args.limit), queries)
+    scan_median, scan_p95 = timed(lambda lat, lng: full_scan(points, lat, lng, args.radius, args.limit),
+                                  queries[:20])
+
+    print(f'{args.restaurants} restaurants, radius {args.radius} km, limit {args.limit}')
+    print(f'grid build:  {build_ms:8.1f} ms (once per refresh)')
+    print(f'grid query:  median {grid_median:6.2f} ms   p95 {grid_p95:6.2f} ms')
+    print(f'full scan:   median {scan_median:6.2f} ms   p95 {scan_p95:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
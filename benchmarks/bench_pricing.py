@@ -0,0 +1,116 @@
+"""
+Cart pricing benchmark: statement count and latency against cart size.
+
+Compares the old per-line MenuItem.query.get() loop with the batched
+backend.pricing.price_cart engine on a throwaway database.
+
+    python benchmarks/bench_pricing.py
+    DATABASE_URL=postgresql://... python benchmarks/bench_pricing.py --sizes 1 10 25 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+
+from sqlalchemy import event  # noqa: E402
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import User, Restaurant, Category, MenuItem, Coupon  # noqa: E402
+from backend.pricing import price_cart, compute_discount, find_coupon  # noqa: E402
+
+
+def legacy_price_cart(restaurant, cart_items, coupon_code):
+    """ The pre-engine algorithm: one lookup per cart line, then the coupon. """
+    subtotal = 0
+    for item_data in cart_items:
+        menu_item = MenuItem.query.get(item_data['menu_item_id'])
+        if not menu_item or not menu_item.is_available or menu_item.restaurant_id != restaurant.id:
+            raise ValueError('invalid item')
+        subtotal += menu_item.price * item_data['quantity']
+    coupon = find_coupon(coupon_code, restaurant.id)
+    discount = compute_discount(coupon, subtotal) if coupon else 0
+    return max(0, subtotal - discount) + (restaurant.delivery_fee or 0) + (restaurant.platform_fee or 0)
+
+
+def seed(menu_size):
+    db.create_all()
+    owner = User(email='bench-owner@example.com', password='x', name='Bench', active=True,
+                 fs_uniquifier='bench-owner')
+    db.session.add(owner)
+    db.session.flush()
+    restaurant = Restaurant(owner_id=owner.id, name='Bench Kitchen', address='1 Bench St', city='Bench',
+                            delivery_fee=40.0, platform_fee=15.0, is_verified=True, is_active=True)
+    db.session.add(restaurant)
+    db.session.flush()
+    category = Category(name='Bench', restaurant_id=restaurant.id)
+    db.session.add(category)
+    db.session.flush()
+    db.session.add_all([
+        MenuItem(name=f'Item {i}', price=10 + i % 7, restaurant_id=restaurant.id, category_id=category.id)
+        for i in range(menu_size)
+    ])
+    db.session.add(Coupon(code='BENCH10', discount_type='Percentage', discount_value=10,
+                          restaurant_id=restaurant.id))
+    db.session.commit()
+    return restaurant.id
+
+
+def measure(fn, repeat):
+    counter = {'n': 0}
+
+    def count(*args, **kwargs):
+        counter['n'] += 1
+
+    engine = db.engine
+    timings = []
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        for _ in range(repeat):
+            db.session.expunge_all()  # cold identity map, like a fresh request
+            counter['n'] = 0
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return counter['n'], statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 5, 10, 25, 50, 100])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with app.app_context():
+        restaurant_id = seed(max(args.sizes))
+        menu_ids = [item.id for item in MenuItem.query.filter_by(restaurant_id=restaurant_id).all()]
+
+        print(f"{'lines':>6} | {'legacy stmts':>12} {'legacy ms':>10} | {'engine stmts':>12} {'engine ms':>10}")
+        for size in args.sizes:
+            cart = [{'menu_item_id': menu_id, 'quantity': 2} for menu_id in menu_ids[:size]]
+
+            def legacy():
+                restaurant = db.session.get(Restaurant, restaurant_id)
+                legacy_price_cart(restaurant, cart, 'BENCH10')
+
+            def engine():
+                restaurant = db.session.get(Restaurant, restaurant_id)
+                price_cart(restaurant, cart, coupon_code='BENCH10').total
+
+            legacy_stmts, legacy_ms = measure(legacy, args.repeat)
+            engine_stmts, engine_ms = measure(engine, args.repeat)
+            print(f"{size:>6} | {legacy_stmts:>12} {legacy_ms:>10.2f} | {engine_stmts:>12} {engine_ms:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Analytics and admin report benchmark: daily sales rollup vs scanning orders.
+
+Seeds a throwaway database (a year of orders), rebuilds the daily sales
+rollup, checks it against the order table, then times the restaurant
+analytics and admin report figures both the old way (aggregating completed
+orders, or loading them into Python) and from the rollup, for a 7-day and a
+365-day range.
+
+    python benchmarks/bench_reports.py --orders 500000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'reports.sqlite3')
+
+from sqlalchemy import func  # noqa: E402
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import Order, Restaurant  # noqa: E402
+from backend.sales_rollup import rebuild_daily_sales, sales_totals, daily_sales, top_restaurants  # noqa: E402
+from explain_indexes import seed  # noqa: E402
+
+RESTAURANT_ID = 7
+REPEATS = 5
+
+
+def legacy_analytics(restaurant_id, days):
+    """ The previous get_restaurant_analytics figures, over `days` days instead of a fixed 7. """
+    completed = (Order.restaurant_id == restaurant_id) & (Order.status == 'completed')
+    revenue = db.session.query(func.sum(Order.total_amount)).filter(completed).scalar() or 0.0
+    orders = db.session.query(func.count(Order.id)).filter(completed).scalar() or 0
+    since = datetime.utcnow() - timedelta(days=days)
+    daily = db.session.query(func.date(Order.created_at), func.sum(Order.total_amount)) \
+        .filter(completed, Order.created_at >= since).group_by(func.date(Order.created_at)).all()
+    return revenue, orders, daily
+
+
+def rollup_analytics(restaurant_id, days):
+    last_day = datetime.utcnow().date()
+    totals = sales_totals(restaurant_id=restaurant_id)
+    return totals['revenue'], totals['orders'], daily_sales(last_day - timedelta(days=days - 1), last_day, restaurant_id)
+
+
+def legacy_reports(days):
+    """ The previous get_admin_reports: completed orders loaded and summed in Python, all-time top five. """
+    since = datetime.utcnow() - timedelta(days=days)
+    revenue_by_date = {}
+    for created_at, amount in db.session.query(Order.created_at, Order.total_amount).filter(
+            Order.status == 'completed', Order.created_at >= since):
+        revenue_by_date[created_at.date()] = revenue_by_date.get(created_at.date(), 0.0) + amount
+    top = db.session.query(Restaurant.name, func.sum(Order.total_amount)) \
+        .join(Order, Restaurant.id == Order.restaurant_id).filter(Order.status == 'completed') \
+        .group_by(Restaurant.name).order_by(func.sum(Order.total_amount).desc()).limit(5).all()
+    return revenue_by_date, top
+
+
+def rollup_reports(days):
+    last_day = datetime.utcnow().date()
+    return daily_sales(last_day - timedelta(days=days - 1), last_day), top_restaurants(limit=5)
+
+
+def timed(fn, *args):
+    """ Best of REPEATS runs, in milliseconds. """
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=500000)
+    parser.add_argument('--restaurants', type=int, default=200)
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(f'Seeding {args.orders} orders...')
+        seed(args.orders, 5000, args.restaurants)
+        start = time.perf_counter()
+        rows = rebuild_daily_sales()
+        print(f'rebuild-daily-sales: {rows} rows in {time.perf_counter() - start:.2f} s')
+
+        old_revenue, old_orders, _ = legacy_analytics(RESTAURANT_ID, 7)
+        new_revenue, new_orders, _ = rollup_analytics(RESTAURANT_ID, 7)
+        assert old_orders == new_orders and round(old_revenue, 2) == round(new_revenue, 2), \
+            ((old_revenue, old_orders), (new_revenue, new_orders))
+
+        print(f"{'':24}{'orders table':>14}{'rollup':>12}")
+        for days in (7, 365):
+            print(f"{f'analytics, {days} days':24}{timed(legacy_analytics, RESTAURANT_ID, days):11.1f} ms"
+                  f"{timed(rollup_analytics, RESTAURANT_ID, days):9.1f} ms")
+            print(f"{f'admin reports, {days} days':24}{timed(legacy_reports, days):11.1f} ms"
+                  f"{timed(rollup_reports, days):9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Startup time: module imports and app boot.
+
+Seeds a throwaway database (so the startup seeding hook finds its marker, as on
+a running deploy), then starts --runs fresh interpreters per SEED_ON_STARTUP
+mode that each `import app` and report the median boot time. One extra run
+with -X importtime lists the slowest imports, and the heavy optional
+libraries that should no longer load at boot are checked.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_startup.sqlite3')
+
+# Loaded on first use, never at boot
+DEFERRED_MODULES = ('openpyxl', 'razorpay', 'PIL.Image', 'google.oauth2', 'requests')
+
+BOOT = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import app\n"
+    "print(time.perf_counter() - start)\n"
+    "print(','.join(m for m in sys.argv[1:] if m in sys.modules))\n"
+)
+
+
+def boot(mode, extra_args=()):
+    env = dict(os.environ, SEED_ON_STARTUP=mode)
+    result = subprocess.run([sys.executable, *extra_args, '-c', BOOT, *DEFERRED_MODULES], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    seconds, loaded = result.stdout.splitlines()[-2:]
+    return float(seconds), [m for m in loaded.split(',') if m], result.stderr
+
+
+def slowest_imports(stderr, limit):
+    rows = []
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to list')
+    args = parser.parse_args()
+
+    subprocess.run([sys.executable, '-c', 'from app import app\n'
+                    'from backend.extensions import db\n'
+                    'from backend.create_initial_data import seed_once\n'
+                    'with app.app_context(): db.create_all()\n'
+                    'seed_once(app)'],
+                   cwd=ROOT, env=dict(os.environ, SEED_ON_STARTUP='once'), check=True, capture_output=True)
+
+    print(f"{'SEED_ON_STARTUP':>16}{'median boot ms':>16}{'min ms':>10}")
+    for mode in ('once', 'off'):
+        times = [boot(mode)[0] for _ in range(args.runs)]
+        print(f'{mode:>16}{statistics.median(times) * 1000:16.0f}{min(times) * 1000:10.0f}')
+
+    _, loaded, stderr = boot('off', ('-X', 'importtime'))
+    print('\nSlowest imports (cumulative ms):')
+    for microseconds, name in slowest_imports(stderr, args.top):
+        print(f'{microseconds / 1000:10.1f}  {name}')
+    print(f"\nDeferred libraries loaded at boot: {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+Payment gateway adapter check against a local Razorpay stub.
+
+Starts a small HTTP server that speaks the two Razorpay endpoints the adapter
+uses (create order, list orders by receipt) and can be told to stall or fail,
+then checks backend/payments.py's RazorpayGateway:
+  - calls reuse one pooled connection;
+  - a read timeout is retried, and the retry finds the order the stalled
+    request created instead of creating a second one (idempotency);
+  - repeated 5xx answers open the circuit, which then fails fast, and a
+    successful trial call after the reset period closes it;
+  - checkout signatures are verified with the key secret;
+  - concurrent /api/payments/create calls for one order (a double click)
+    create a single gateway order and all get its id.
+Exits non-zero if any check fails.
+
+    python benchmarks/check_payment_gateway.py
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+KEY_ID, KEY_SECRET = 'rzp_test_stub', 'stub-secret'
+DATABASE = os.path.join(tempfile.mkdtemp(), 'payments.sqlite3')
+os.environ['DATABASE_URL'] = 'sqlite:///' + DATABASE
+os.environ['RAZORPAY_KEY_ID'], os.environ['RAZORPAY_KEY_SECRET'] = KEY_ID, KEY_SECRET
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import MenuItem  # noqa: E402
+from backend.create_initial_data import init_app as seed_initial_data  # noqa: E402
+from backend.payments import RazorpayGateway, CircuitBreaker, GatewayUnavailable, sign_payment  # noqa: E402
+
+CUSTOMER = ('customer1@email.com', 'cust123')
+CONCURRENT_CREATES = 4
+
+
+class StubState:
+    def __init__(self):
+        self.orders = []
+        self.connections = 0
+        self.create_calls = 0
+        self.stall_next = 0 # Seconds the next create waits before answering (after storing the order)
+        self.fail_with = None # HTTP status for every create while set
+
+
+STATE = StubState()
+
+
+class RazorpayStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        STATE.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])) or b'{}')
+        STATE.create_calls += 1
+        if STATE.fail_with:
+            return self._send(STATE.fail_with, {'error': {'code': 'SERVER_ERROR', 'description': 'stub outage'}})
+        order = {'id': 'order_%014d' % (len(STATE.orders) + 1), 'entity': 'order', 'status': 'created',
+                 'amount': payload['amount'], 'currency': payload['currency'], 'receipt': payload['receipt']}
+        STATE.orders.append(order)
+        stall, STATE.stall_next = STATE.stall_next, 0
+        time.sleep(stall)
+        self._send(200, order)
+
+    def do_GET(self):
+        receipt = parse_qs(urlparse(self.path).query).get('receipt', [None])[0]
+        items = [order for order in STATE.orders if order['receipt'] == receipt]
+        self._send(200, {'entity': 'collection', 'count': len(items), 'items': items})
+
+
+def concurrent_creates(base_url):
+    """ Gateway order ids returned by CONCURRENT_CREATES simultaneous create calls for one new order. """
+    app.config.update(RAZORPAY_BASE_URL=base_url, PAYMENT_GATEWAY='razorpay')
+    with app.app_context():
+        db.create_all()
+        seed_initial_data(app)
+        item = MenuItem.query.first()
+        restaurant_id, menu_item_id = item.restaurant_id, item.id
+    client = app.test_client()
+    token = client.post('/api/login', json={'email': CUSTOMER[0], 'password': CUSTOMER[1]}).get_json()['token']
+    headers = {'Authentication-Token': token}
+    response = client.post('/api/orders', headers=headers,
+                           json={'restaurant_id': restaurant_id, 'items': [{'menu_item_id': menu_item_id, 'quantity': 1}]})
+    order_id = response.get_json()['order_id']
+
+    def create(_):
+        response = app.test_client().post('/api/payments/create', headers=headers, json={'order_id': order_id})
+        return (response.get_json() or {}).get('razorpay_order_id')
+
+    STATE.stall_next = 0.2 # Keeps the first create in flight while the others arrive
+    with ThreadPoolExecutor(CONCURRENT_CREATES) as pool:
+        ids = list(pool.map(create, range(CONCURRENT_CREATES)))
+    return ids, [order for order in STATE.orders if order['receipt'] == str(order_id)]
+
+
+class StubServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass # The client gave up on a stalled answer (read timeout)
+
+
+def main():
+    server = StubServer(('127.0.0.1', 0), RazorpayStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}/v1'
+
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=0.5)
+    gateway = RazorpayGateway(KEY_ID, KEY_SECRET, breaker, connect_timeout=1, read_timeout=0.3,
+                              max_attempts=3, backoff_seconds=0.01, backoff_max_seconds=0.05, base_url=base_url)
+    checks = []
+
+    for n in range(5):
+        gateway.create_order(1000 + n, f'receipt-{n}')
+    checks.append(('five calls share one pooled connection', STATE.connections == 1))
+
+    STATE.stall_next = 1 # Longer than the read timeout: the order is created but the answer is late
+    before = len(STATE.orders)
+    order = gateway.create_order(4200, 'receipt-slow')
+    checks.append(('a timed-out create is not duplicated on retry',
+                   len(STATE.orders) == before + 1 and order['id'] == STATE.orders[-1]['id']))
+
+    STATE.fail_with = 500
+    try:
+        gateway.create_order(100, 'receipt-outage')
+        outage_raised = False
+    except GatewayUnavailable:
+        outage_raised = True
+    calls = STATE.create_calls
+    start = time.perf_counter()
+    try:
+        gateway.create_order(100, 'receipt-outage')
+        fast_fail = False
+    except GatewayUnavailable:
+        fast_fail = STATE.create_calls == calls and time.perf_counter() - start < 0.05
+    checks.append(('repeated 5xx answers raise GatewayUnavailable', outage_raised))
+    checks.append(('the open circuit fails fast without calling the gateway', fast_fail and breaker.state == 'open'))
+
+    STATE.fail_with = None
+    time.sleep(0.6)
+    gateway.create_order(100, 'receipt-recovered')
+    checks.append(('a successful trial call closes the circuit', breaker.state == 'closed'))
+
+    signature = sign_payment('order_00000000000001', 'pay_1', KEY_SECRET)
+    checks.append(('checkout signatures are verified',
+                   gateway.verify_payment_signature('order_00000000000001', 'pay_1', signature)
+                   and not gateway.verify_payment_signature('order_00000000000001', 'pay_2', signature)))
+
+    ids, gateway_orders = concurrent_creates(base_url)
+    checks.append(('concurrent creates for one order make one gateway order',
+                   len(gateway_orders) == 1 and ids == [gateway_orders[0]['id']] * CONCURRENT_CREATES))
+
+    server.shutdown()
+    for label, ok in checks:
+        print(f"{'ok  ' if ok else 'FAIL'}  {label}")
+    if not all(ok for _, ok in checks):
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
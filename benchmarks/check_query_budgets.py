@@ -0,0 +1,118 @@
+"""
+Per-endpoint SQL query budgets, checked with backend/query_profiler.py.
+
+Seeds a throwaway database with one owner's restaurant and its active order
+queue, a few dozen nearby restaurants and a customer with many favorites,
+then requests each endpoint below inside query_budget(). Budgets are fixed
+numbers of statements, so a lazy-loading loop (which grows with the data)
+fails the check and its report shows the repeated statement and the line it
+came from. Exits non-zero if any endpoint is over budget.
+
+    python benchmarks/check_query_budgets.py --rows 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'query_budgets.sqlite3')
+
+from sqlalchemy import func, insert  # noqa: E402
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import User, Restaurant, MenuItem, Order, OrderItem, Favorite  # noqa: E402
+from backend.create_initial_data import init_app as seed_initial_data  # noqa: E402
+from backend.query_profiler import query_budget, QueryBudgetExceeded  # noqa: E402
+
+LAT, LNG = 12.9716, 77.5946
+OWNER = ('owner1@email.com', 'owner123')
+CUSTOMER = ('customer1@email.com', 'cust123')
+
+# (label, path, login, max statements); one statement may run at most once per request.
+# Budgets include loading the User when the view needs more than the cached token identity.
+BUDGETS = [
+    ('favorites', '/api/favorites', CUSTOMER, 2),
+    ('nearby restaurants', f'/api/restaurants/nearby?lat={LAT}&lng={LNG}', CUSTOMER, 2),
+    ('restaurant dashboard', '/api/restaurant/dashboard', OWNER, 5),
+    ('restaurant order queue', '/api/restaurant/orders', OWNER, 3),
+    ('restaurant menu', '/api/restaurant/menu', OWNER, 3),
+    ('order history', '/api/orders', CUSTOMER, 2),
+]
+
+
+def seed(rows):
+    """ `rows` nearby restaurants (all favorites of the customer) and `rows` active orders for the owner. """
+    db.create_all()
+    seed_initial_data(app)
+    customer = User.query.filter_by(email=CUSTOMER[0]).one()
+    owner_restaurant = Restaurant.query.join(User, User.id == Restaurant.owner_id).filter(User.email == OWNER[0]).one()
+    menu_item_ids = [item.id for item in MenuItem.query.filter_by(restaurant_id=owner_restaurant.id)]
+
+    first_restaurant = db.session.query(func.max(Restaurant.id)).scalar() + 1
+    restaurants = [{'id': first_restaurant + n, 'owner_id': owner_restaurant.owner_id, 'name': f'Nearby {n}',
+                    'address': 'x', 'city': 'x', 'latitude': LAT + n * 0.001, 'longitude': LNG,
+                    'is_verified': True, 'is_active': True} for n in range(rows)]
+    db.session.execute(insert(Restaurant), restaurants)
+    db.session.execute(insert(Favorite), [{'user_id': customer.id, 'restaurant_id': row['id']} for row in restaurants])
+
+    now = datetime.utcnow()
+    first_user = db.session.query(func.max(User.id)).scalar() + 1
+    first_order = (db.session.query(func.max(Order.id)).scalar() or 0) + 1
+    users, orders, items = [], [], []
+    for n in range(rows):
+        user_id, order_id = first_user + n, first_order + n
+        users.append({'id': user_id, 'email': f'budget{n}@example.com', 'password': 'x', 'name': f'Customer {n}',
+                      'active': True, 'fs_uniquifier': f'budget{n}'})
+        for order_user, offset in ((user_id, 0), (customer.id, rows)):
+            orders.append({'id': order_id + offset, 'user_id': order_user, 'restaurant_id': owner_restaurant.id,
+                           'total_amount': 300.0, 'status': ('placed', 'preparing', 'completed')[n % 3],
+                           'order_type': 'takeaway', 'qr_payload': f'budget{order_id + offset}',
+                           'created_at': now - timedelta(minutes=n)})
+            items += [{'order_id': order_id + offset, 'menu_item_id': menu_item_ids[(n + k) % len(menu_item_ids)],
+                       'quantity': 1, 'price_at_order': 100.0} for k in range(2)]
+    db.session.execute(insert(User), users)
+    db.session.execute(insert(Order), orders)
+    db.session.execute(insert(OrderItem), items)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50, help='restaurants, favorites and orders to seed')
+    args = parser.parse_args()
+
+    with app.app_context():
+        seed(args.rows)
+
+    client = app.test_client()
+    tokens = {login: client.post('/api/login', json={'email': login[0], 'password': login[1]}).get_json()['token']
+              for login in (OWNER, CUSTOMER)}
+
+    failures = []
+    for label, path, login, budget in BUDGETS:
+        headers = {'Authentication-Token': tokens[login]}
+        client.get(path, headers=headers) # Warm caches (token, geo index) so only steady-state queries count
+        try:
+            with query_budget(max_queries=budget, max_repeats=1, label=label) as profile:
+                response = client.get(path, headers=headers)
+            status = 'ok'
+        except QueryBudgetExceeded as e:
+            failures.append(str(e))
+            status = 'OVER BUDGET'
+        assert response.status_code == 200, (path, response.status_code)
+        print(f'{label:24}{profile.queries:4} / {budget} statements  {profile.ms:6.1f} ms  {status}')
+
+    if failures:
+        print('\nFAILED:\n' + '\n\n'.join(failures))
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Query-count regression check for the restaurant order queue and dashboard.
+
+Seeds a restaurant with 200 active orders (three items each, every order from
+a different customer), then counts the SQL statements issued while building
+the queue payload and the dashboard's recent orders, both the old lazy-loading
+way and with backend/order_queue.py. Exits non-zero if the new builders use
+more than MAX_STATEMENTS statements or return different payloads.
+
+    python benchmarks/check_queue_queries.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'queue.sqlite3')
+
+from sqlalchemy import event, insert  # noqa: E402
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import User, Order, OrderItem, TERMINAL_ORDER_STATUSES  # noqa: E402
+from backend.order_queue import active_queue, recent_orders  # noqa: E402
+from explain_indexes import seed  # noqa: E402
+
+MAX_STATEMENTS = 3
+RESTAURANT_ID = 1
+
+
+def seed_active_orders(count):
+    """ `count` active orders for RESTAURANT_ID, each by a new customer, with three items. """
+    now = datetime.utcnow()
+    first_user = db.session.query(db.func.max(User.id)).scalar() + 1
+    first_order = db.session.query(db.func.max(Order.id)).scalar() + 1
+    users, orders, items = [], [], []
+    for n in range(count):
+        user_id, order_id = first_user + n, first_order + n
+        users.append({'id': user_id, 'email': f'queue{n}@example.com', 'password': 'x', 'name': f'Queue Customer {n}',
+                      'active': True, 'fs_uniquifier': f'queue{n}'})
+        orders.append({'id': order_id, 'user_id': user_id, 'restaurant_id': RESTAURANT_ID, 'total_amount': 300.0,
+                       'status': ('placed', 'preparing', 'ready')[n % 3], 'order_type': 'takeaway',
+                       'qr_payload': f'queue{order_id}', 'created_at': now - timedelta(minutes=count - n),
+                       'is_scheduled': n % 10 == 0,
+                       'scheduled_time': now + timedelta(hours=2) if n % 10 == 0 else None})
+        for k in range(3):
+            items.append({'order_id': order_id, 'menu_item_id': (RESTAURANT_ID - 1) * 25 + (n + k) % 25 + 1,
+                          'quantity': k + 1, 'price_at_order': 100.0})
+    db.session.execute(insert(User), users)
+    db.session.execute(insert(Order), orders)
+    db.session.execute(insert(OrderItem), items)
+    db.session.commit()
+
+
+def legacy_queue(restaurant_id):
+    """ The previous get_restaurant_orders: ORM orders, then lazy customer/items/menu_item loads. """
+    orders = Order.query.filter(
+        Order.restaurant_id == restaurant_id, Order.status.notin_(TERMINAL_ORDER_STATUSES)
+    ).order_by(Order.created_at.asc()).all()
+    orders_data = []
+    for order in orders:
+        ist_created_time = order.created_at + timedelta(hours=5, minutes=30)
+        info = {
+            'id': order.id,
+            'customerName': order.customer.name,
+            'createdAt': ist_created_time.strftime('%I:%M %p'),
+            'status': order.status,
+            'order_type': order.order_type,
+            'items': [{'name': item.menu_item.name, 'quantity': item.quantity} for item in order.items],
+            'is_scheduled': order.is_scheduled,
+            'scheduled_date': None,
+            'scheduled_time': None
+        }
+        if order.is_scheduled and order.scheduled_time:
+            ist_scheduled_time = order.scheduled_time + timedelta(hours=5, minutes=30)
+            info['scheduled_date'] = ist_scheduled_time.strftime('%b %d, %Y')
+            info['scheduled_time'] = ist_scheduled_time.strftime('%I:%M %p')
+        orders_data.append(info)
+    return orders_data
+
+
+def legacy_recent_orders(restaurant_id, limit=5):
+    orders = Order.query.filter_by(restaurant_id=restaurant_id).order_by(Order.created_at.desc()).limit(limit).all()
+    return [{'id': order.id, 'customerName': order.customer.name, 'items': len(order.items),
+             'total': order.total_amount, 'status': order.status.capitalize()} for order in orders]
+
+
+def counted(fn, *args):
+    """ (result, statements, seconds) for fn(*args) on a fresh session. """
+    db.session.expunge_all()
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_execute)
+    start = time.perf_counter()
+    try:
+        result = fn(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        event.remove(engine, 'before_cursor_execute', before_execute)
+    return result, len(statements), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--active', type=int, default=200, help='active orders in the queue')
+    args = parser.parse_args()
+
+    failures = []
+    with app.app_context():
+        seed(5000, 200, 10)
+        seed_active_orders(args.active)
+
+        checks = [
+            ('order queue', legacy_queue, active_queue),
+            ('dashboard recent orders', legacy_recent_orders, recent_orders),
+        ]
+        for label, old, new in checks:
+            old_result, old_count, old_time = counted(old, RESTAURANT_ID)
+            new_result, new_count, new_time = counted(new, RESTAURANT_ID)
+            print(f'{label}: {len(new_result)} orders')
+            print(f'  lazy loading   {old_count:5} statements  {old_time * 1000:7.1f} ms')
+            print(f'  projection     {new_count:5} statements  {new_time * 1000:7.1f} ms')
+            if new_count > MAX_STATEMENTS:
+                failures.append(f'{label} used {new_count} statements (max {MAX_STATEMENTS})')
+            if new_result != old_result:
+                failures.append(f'{label} payload differs from the lazy-loading version')
+
+    if failures:
+        print('\nFAILED:\n  ' + '\n  '.join(failures))
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Read-replica routing check with two SQLite files.
+
+Seeds a primary database, copies it to a "replica" file, then lets the two
+drift apart and checks backend/replica.py routing:
+  - @read_only_view views and `with read_only():` read the replica;
+  - writes inside a read-only block still go to the primary;
+  - a customer who just placed an order reads their history from the primary
+    (read-your-writes), and from the replica once the window is cleared;
+  - the shared nearby grid, rebuilt inside a routed request, loads from the
+    primary, so a restaurant moved there is found at once;
+  - routed views fall back to the primary when the replica is unreachable.
+Exits non-zero if any check fails.
+
+    python benchmarks/check_replica_routing.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORK_DIR = tempfile.mkdtemp()
+PRIMARY = os.path.join(WORK_DIR, 'primary.sqlite3')
+REPLICA = os.path.join(WORK_DIR, 'replica.sqlite3')
+os.environ['DATABASE_URL'] = 'sqlite:///' + PRIMARY
+os.environ['DATABASE_REPLICA_URL'] = 'sqlite:///' + REPLICA
+os.environ['REPLICA_HEALTH_CHECK_SECONDS'] = '0'
+
+from sqlalchemy import update  # noqa: E402
+
+from app import app  # noqa: E402
+from backend.extensions import db, cache  # noqa: E402
+from backend.models import Restaurant, MenuItem  # noqa: E402
+from backend.create_initial_data import init_app as seed_initial_data  # noqa: E402
+from backend.replica import read_only, get_replica_health, RECENT_WRITE_PREFIX, REPLICA_BIND  # noqa: E402
+
+CUSTOMER = ('customer1@email.com', 'cust123')
+
+
+def restaurant_name(engine, restaurant_id):
+    with engine.connect() as connection:
+        return connection.execute(db.select(Restaurant.name).where(Restaurant.id == restaurant_id)).scalar()
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        seed_initial_data(app)
+        db.engine.dispose()
+        shutil.copy(PRIMARY, REPLICA)
+        restaurant_id = db.session.query(Restaurant.id).order_by(Restaurant.id).first()[0]
+        menu_item_id = db.session.query(MenuItem.id).filter_by(restaurant_id=restaurant_id).first()[0]
+        customer_id = db.session.execute(db.text('SELECT id FROM user WHERE email = :email'),
+                                         {'email': CUSTOMER[0]}).scalar()
+
+    client = app.test_client()
+    token = client.post('/api/login', json={'email': CUSTOMER[0], 'password': CUSTOMER[1]}).get_json()['token']
+    headers = {'Authentication-Token': token}
+
+    checks = []
+
+    with app.app_context():
+        primary, replica = db.engine, db.engines[REPLICA_BIND]
+        db.session.execute(update(Restaurant).where(Restaurant.id == restaurant_id).values(name='Renamed on primary'))
+        db.session.commit()
+        with read_only() as route:
+            checks.append(('read_only() routes to the replica', route == REPLICA_BIND))
+            name = db.session.get(Restaurant, restaurant_id).name
+            checks.append(('reads inside read_only() see the replica', name != 'Renamed on primary'))
+            db.session.execute(update(Restaurant).where(Restaurant.id == restaurant_id).values(name='Written in block'))
+            db.session.commit()
+        db.session.remove()
+        checks.append(('writes inside read_only() go to the primary',
+                       restaurant_name(primary, restaurant_id) == 'Written in block'
+                       and restaurant_name(replica, restaurant_id) != 'Written in block'))
+
+        restaurant = db.session.get(Restaurant, restaurant_id)
+        restaurant.latitude, restaurant.longitude = 12.9716, 77.5946 # Moved on the primary only
+        db.session.commit()
+    nearby = client.get('/api/restaurants/nearby?lat=12.9716&lng=77.5946&radius=1').get_json()
+    checks.append(('nearby grid rebuilt in a routed request reads the primary',
+                   [r['id'] for r in nearby] == [restaurant_id]))
+
+    response = client.post('/api/orders', headers=headers,
+                           json={'restaurant_id': restaurant_id, 'items': [{'menu_item_id': menu_item_id, 'quantity': 1}]})
+    assert response.status_code == 201, response.get_json()
+    history = client.get('/api/orders', headers=headers).get_json()
+    checks.append(('new order visible right after placing it (read-your-writes)', len(history) == 1))
+
+    with app.app_context():
+        cache.delete(RECENT_WRITE_PREFIX + str(customer_id))
+    history = client.get('/api/orders', headers=headers).get_json()
+    checks.append(('order history reads the replica once the window ends', len(history) == 0))
+
+    with app.app_context():
+        db.engines[REPLICA_BIND].dispose()
+        os.remove(REPLICA)
+        os.mkdir(REPLICA) # Not a database any more: every connection attempt fails
+        get_replica_health().reset()
+    history = client.get('/api/orders', headers=headers).get_json()
+    checks.append(('falls back to the primary when the replica is unreachable', len(history) == 1))
+
+    failed = [label for label, ok in checks if not ok]
+    for label, ok in checks:
+        print(f"{'ok  ' if ok else 'FAIL'}  {label}")
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    if failed:
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
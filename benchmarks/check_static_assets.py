@@ -0,0 +1,98 @@
+"""
+Static asset build check.
+
+Builds the hashed asset set for frontend/ into a temp directory and checks,
+through the app's WhiteNoise wrapper, that:
+  - index.html is sent with no-cache and references only hashed local assets;
+  - every hashed URL is served as immutable, gzip-encoded when compressible;
+  - every ES-module import in frontend/ resolves to an import-map entry, so no
+    module is ever loaded twice under its hashed and unhashed names;
+  - client-side routes get the in-memory shell (gzip, ETag, 304 on revalidation)
+    and unknown API paths a JSON 404.
+Exits non-zero if any check fails.
+
+    python benchmarks/check_static_assets.py
+"""
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORK_DIR = tempfile.mkdtemp()
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(WORK_DIR, 'check_static_assets.sqlite3'))
+os.environ['STATIC_ASSET_HASHING'] = 'true'
+os.environ['STATIC_BUILD_DIR'] = os.path.join(WORK_DIR, 'static')
+
+from app import app  # noqa: E402
+from backend.static_assets import get_asset_build, STABLE_URL_FILES  # noqa: E402
+
+IMPORT = re.compile(r'''^\s*import\s+(?:[^'"]*?\s+from\s+)?['"]([^'"]+)['"]''', re.MULTILINE)
+LOCAL_REFERENCE = re.compile(r'''\b(?:src|href)=["'](/[^"'?#]*)["']''')
+
+
+def main():
+    asset_build = get_asset_build(app)
+    client = app.test_client()
+    checks = []
+
+    response = client.get('/')
+    html = response.get_data(as_text=True)
+    checks.append(('index.html is sent with no-cache', response.headers.get('Cache-Control') == 'no-cache'))
+    import_map = json.loads(re.search(r'<script type="importmap">(.*?)</script>', html, re.S).group(1))['imports']
+    unhashed = [url for url in LOCAL_REFERENCE.findall(html)
+                if url.lstrip('/') in asset_build.paths and url not in import_map.values()
+                and posixpath.basename(url) not in STABLE_URL_FILES]
+    checks.append(('index.html references hashed asset names', not unhashed))
+
+    bad_headers = []
+    for path, hashed in sorted(asset_build.paths.items()):
+        response = client.get('/' + hashed, headers={'Accept-Encoding': 'gzip'})
+        gzip_expected = os.path.exists(os.path.join(asset_build.directory, hashed + '.gz'))
+        if response.status_code != 200 or 'immutable' not in response.headers.get('Cache-Control', '') \
+                or (response.headers.get('Content-Encoding') == 'gzip') != gzip_expected:
+            bad_headers.append(hashed)
+        response.close()
+    checks.append((f'{len(asset_build.paths)} hashed URLs are immutable (and gzipped when useful)', not bad_headers))
+
+    response = client.get('/restaurant/12', headers={'Accept-Encoding': 'gzip'})
+    etag = response.headers.get('ETag')
+    checks.append(('client-side routes get the gzipped shell',
+                   response.status_code == 200 and response.headers.get('Content-Encoding') == 'gzip' and etag))
+    response = client.get('/orders', headers={'If-None-Match': etag})
+    checks.append(('the shell revalidates with 304', response.status_code == 304))
+    response = client.get('/api/no-such-endpoint')
+    checks.append(('unknown API paths answer a JSON 404', response.status_code == 404 and response.is_json))
+
+    unmapped = []
+    source = app.static_folder
+    for directory, _, filenames in os.walk(source):
+        for filename in filenames:
+            if not filename.endswith('.js') or filename == 'sw.js':
+                continue
+            url = '/' + os.path.relpath(os.path.join(directory, filename), source).replace(os.sep, '/')
+            with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                for specifier in IMPORT.findall(f.read()):
+                    if specifier.startswith(('.', '/')):
+                        target = posixpath.normpath(posixpath.join(posixpath.dirname(url), specifier))
+                        if target not in import_map:
+                            unmapped.append(f'{url}: {specifier}')
+    checks.append(('every module import is in the import map', not unmapped))
+
+    for label, ok in checks:
+        print(f"{'ok  ' if ok else 'FAIL'}  {label}")
+    for name in unhashed + bad_headers + unmapped:
+        print('      ', name)
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    if not all(ok for _, ok in checks):
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+EXPLAIN check for the hot access paths.
+
+Seeds a throwaway database (1M orders by default), then EXPLAINs the queries
+the dashboard, queue, history, review and menu endpoints run and exits
+non-zero if any of them falls back to a sequential scan of a large table.
+
+    python benchmarks/explain_indexes.py --orders 200000
+    DATABASE_URL=postgresql://localhost/crav_explain python benchmarks/explain_indexes.py
+
+Point DATABASE_URL at a scratch database: the script creates and fills tables.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'explain.sqlite3')
+
+from sqlalchemy import select, func, insert, text, and_, or_  # noqa: E402
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import (  # noqa: E402
+    User, Restaurant, Category, MenuItem, Order, OrderItem, Review, RewardPoint, MenuItemDailyCount,
+    TERMINAL_ORDER_STATUSES
+)
+
+STATUSES = ['completed'] * 17 + ['cancelled', 'rejected', 'placed', 'preparing', 'ready']
+CHUNK = 10000
+
+
+def _bulk(model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(insert(model), rows[start:start + CHUNK])
+
+
+def seed(n_orders, n_users, n_restaurants):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    db.create_all()
+
+    _bulk(User, [{'id': i, 'email': f'user{i}@example.com', 'password': 'x', 'name': f'User {i}',
+                  'active': True, 'fs_uniquifier': f'u{i}'} for i in range(1, n_users + 1)])
+    _bulk(Restaurant, [{'id': i, 'owner_id': i, 'name': f'Restaurant {i}', 'address': 'x', 'city': 'x',
+                        'is_verified': True, 'is_active': True} for i in range(1, n_restaurants + 1)])
+    _bulk(Category, [{'id': i, 'name': f'Category {i}', 'restaurant_id': (i - 1) // 5 + 1}
+                     for i in range(1, n_restaurants * 5 + 1)])
+    _bulk(MenuItem, [{'id': i, 'name': f'Item {i}', 'price': 100.0, 'restaurant_id': (i - 1) // 25 + 1,
+                      'category_id': (i - 1) // 5 + 1} for i in range(1, n_restaurants * 25 + 1)])
+    db.session.commit()
+
+    for start in range(1, n_orders + 1, CHUNK):
+        ids = range(start, min(start + CHUNK, n_orders + 1))
+        orders, items, reviews, points = [], [], [], []
+        for order_id in ids:
+            restaurant_id = rng.randint(1, n_restaurants)
+            user_id = rng.randint(1, n_users)
+            created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+            status = rng.choice(STATUSES)
+            orders.append({'id': order_id, 'user_id': user_id, 'restaurant_id': restaurant_id,
+                           'total_amount': 250.0, 'status': status, 'order_type': 'takeaway',
+                           'qr_payload': f'qr{order_id}', 'created_at': created_at,
+                           'razorpay_order_id': f'order_{order_id}' if status == 'completed' else None})
+            items.append({'order_id': order_id, 'quantity': 1, 'price_at_order': 100.0,
+                          'menu_item_id': (restaurant_id - 1) * 25 + rng.randint(1, 25)})
+            if status == 'completed' and order_id % 10 == 0:
+                reviews.append({'user_id': user_id, 'restaurant_id': restaurant_id, 'order_id': order_id,
+                                'rating': rng.randint(1, 5), 'created_at': created_at})
+            if order_id % 5 == 0:
+                points.append({'user_id': user_id, 'order_id': order_id, 'points': 10,
+                               'transaction_type': 'earned', 'created_at': created_at})
+        _bulk(Order, orders)
+        _bulk(OrderItem, items)
+        if reviews:
+            _bulk(Review, reviews)
+        if points:
+            _bulk(RewardPoint, points)
+        db.session.commit()
+
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+
+def hot_queries():
+    """ (label, statement) pairs mirroring the filters used in backend/routes.py. """
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    return [
+        ('restaurant by owner', select(Restaurant).where(Restaurant.owner_id == 7)),
+        ('order queue (partial index)', select(Order).where(
+            Order.restaurant_id == 7, Order.status.notin_(TERMINAL_ORDER_STATUSES)).order_by(Order.created_at.asc())),
+        ('pending count', select(func.count(Order.id)).where(
+            Order.restaurant_id == 7, Order.status.in_(['placed', 'preparing']))),
+        ('today revenue', select(func.sum(Order.total_amount)).where(
+            Order.restaurant_id == 7, Order.created_at >= today, Order.created_at < today + timedelta(days=1))),
+        ('dashboard metrics (one statement)', select(
+            func.sum(Order.total_amount), func.count(Order.id),
+            select(func.count(Order.id)).where(
+                Order.restaurant_id == 7, Order.status.in_(['placed', 'preparing'])).scalar_subquery()
+        ).where(Order.restaurant_id == 7, Order.created_at >= today, Order.created_at < today + timedelta(days=1))),
+        ('popular item counters', select(MenuItemDailyCount.menu_item_id, func.sum(MenuItemDailyCount.orders)).where(
+            MenuItemDailyCount.restaurant_id == 7, MenuItemDailyCount.day >= today.date() - timedelta(days=29)
+        ).group_by(MenuItemDailyCount.menu_item_id)),
+        ('recent orders', select(Order).where(Order.restaurant_id == 7).order_by(Order.created_at.desc()).limit(5)),
+        ('completed orders for analytics', select(func.sum(Order.total_amount)).where(
+            Order.restaurant_id == 7, Order.status == 'completed')),
+        ('customer order history', select(Order).where(Order.user_id == 7).order_by(Order.created_at.desc())),
+        ('platform report window', select(Order.created_at, Order.total_amount).where(
+            Order.status == 'completed', Order.created_at >= today - timedelta(days=7))),
+        ('admin order list', select(Order).order_by(Order.created_at.desc()).limit(50)),
+        ('admin order list after cursor', select(Order).where(
+            Order.created_at <= today,
+            or_(Order.created_at < today, and_(Order.created_at == today, Order.id < 500))
+        ).order_by(Order.created_at.desc(), Order.id.desc()).limit(51)),
+        ('admin order list by status after cursor', select(Order).where(
+            Order.status == 'completed',
+            Order.created_at <= today,
+            or_(Order.created_at < today, and_(Order.created_at == today, Order.id < 500))
+        ).order_by(Order.created_at.desc(), Order.id.desc()).limit(51)),
+        ('admin review list after cursor', select(Review).where(
+            Review.created_at <= today,
+            or_(Review.created_at < today, and_(Review.created_at == today, Review.id < 500))
+        ).order_by(Review.created_at.desc(), Review.id.desc()).limit(51)),
+        ('payment webhook', select(Order).where(Order.razorpay_order_id == 'order_abc')),
+        ('order items of order', select(OrderItem).where(OrderItem.order_id == 7)),
+        ('reviews of restaurant', select(Review).where(Review.restaurant_id == 7).order_by(Review.created_at.desc())),
+        ('menu of restaurant', select(MenuItem).where(MenuItem.restaurant_id == 7)),
+        ('items of category', select(MenuItem).where(MenuItem.category_id == 7)),
+        ('reward history', select(RewardPoint).where(RewardPoint.user_id == 7).order_by(RewardPoint.created_at.desc())),
+    ]
+
+
+def explain(statement):
+    engine = db.engine
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+    if engine.dialect.name == 'sqlite':
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)).all()
+        return [row[-1] for row in rows]
+    return [row[0] for row in db.session.execute(text('EXPLAIN ' + sql)).all()]
+
+
+def sequential_scans(plan_lines, dialect):
+    tables = ('order', 'order_item', 'review', 'menu_item', 'restaurant', 'reward_point', 'category',
+              'menu_item_daily_count')
+    bad = []
+    for line in plan_lines:
+        stripped = line.strip().lstrip('-> ').strip()
+        if dialect == 'sqlite':
+            # "SCAN order" is a full table scan; "SCAN order USING INDEX ..." walks an index
+            for table in tables:
+                if stripped in (f'SCAN {table}', f'SCAN "{table}"'):
+                    bad.append(stripped)
+        elif stripped.startswith('Seq Scan on'):
+            table = stripped.split()[3].strip('"')
+            if table in tables:
+                bad.append(stripped)
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--restaurants', type=int, default=2000)
+    parser.add_argument('--skip-seed', action='store_true', help='reuse an already seeded DATABASE_URL')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if not args.skip_seed:
+            print(f'Seeding {args.orders} orders...')
+            seed(args.orders, args.users, args.restaurants)
+
+        dialect = db.engine.dialect.name
+        failures = 0
+        for label, statement in hot_queries():
+            plan = explain(statement)
+            bad = sequential_scans(plan, dialect)
+            print(f"[{'FAIL' if bad else ' ok '}] {label}")
+            for line in plan:
+                print(f'         {line}')
+            failures += bool(bad)
+
+        if failures:
+            print(f'{failures} access path(s) fell back to a sequential scan.')
+            sys.exit(1)
+        print('All access paths use an index.')
+
+
+if __name__ == '__main__':
+    main()
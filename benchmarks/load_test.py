@@ -0,0 +1,155 @@
+"""
+Load test across gunicorn worker/thread counts and connection pool profiles.
+
+Seeds a database (a throwaway SQLite file unless DATABASE_URL is set; use a
+PostgreSQL URL for meaningful pool numbers), then for every workers x threads
+combination starts gunicorn twice: once with SQLAlchemy's stock pool (5 + 10
+overflow, no pre-ping or recycling) and once with the pool sized to the thread
+count by engine_options() in backend/config.py. Each run sends a mix of
+catalog and authenticated requests from --concurrency client threads for
+--duration seconds and reports requests per second, p50/p95 latency and errors.
+
+    DATABASE_URL=postgresql://... python benchmarks/load_test.py --matrix 1x1,2x8,4x16 --concurrency 64
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+if not os.environ.get('DATABASE_URL'):
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'load_test.sqlite3')
+
+from app import app  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.create_initial_data import init_app as seed_initial_data  # noqa: E402
+from explain_indexes import seed  # noqa: E402
+
+HOST = '127.0.0.1'
+CUSTOMER = ('customer1@email.com', 'cust123')
+
+# (path, needs the customer's token)
+REQUESTS = [
+    ('/api/restaurants/featured', False),
+    ('/api/restaurants/1', False),
+    ('/api/restaurants/nearby?lat=12.9716&lng=77.5946', False),
+    ('/api/orders', True),
+    ('/api/favorites', True),
+]
+
+
+def pool_environment(profile, threads):
+    """ DB_* overrides for a pool profile. """
+    if profile == 'stock':
+        return {'DB_POOL_SIZE': '5', 'DB_MAX_OVERFLOW': '10', 'DB_POOL_PRE_PING': 'false',
+                'DB_POOL_RECYCLE': '-1', 'DB_STATEMENT_TIMEOUT_MS': '0'}
+    return {'DB_POOL_SIZE': str(threads), 'DB_MAX_OVERFLOW': str(max(2, threads // 2))}
+
+
+def start_server(port, workers, threads, profile):
+    env = dict(os.environ, **pool_environment(profile, threads))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--chdir', ROOT, '-b', f'{HOST}:{port}',
+         '-w', str(workers), '--threads', str(threads), '--log-level', 'warning', 'app:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(HOST, port, timeout=2)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f'gunicorn did not start on port {port}')
+
+
+def login(port):
+    connection = http.client.HTTPConnection(HOST, port, timeout=10)
+    connection.request('POST', '/api/login', body=json.dumps({'email': CUSTOMER[0], 'password': CUSTOMER[1]}),
+                       headers={'Content-Type': 'application/json'})
+    return json.loads(connection.getresponse().read())['token']
+
+
+def run_load(port, token, concurrency, duration):
+    """ (requests per second, p50 ms, p95 ms, errors) """
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection(HOST, port, timeout=30)
+        mine, failed, n = [], 0, offset
+        while time.monotonic() < stop_at:
+            path, authenticated = REQUESTS[n % len(REQUESTS)]
+            n += 1
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers={'Authentication-Token': token} if authenticated else {})
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 500:
+                    failed += 1
+                mine.append(time.perf_counter() - start)
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection(HOST, port, timeout=30)
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    clients = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+
+    latencies.sort()
+    if not latencies:
+        return 0.0, 0.0, 0.0, errors[0]
+    return (len(latencies) / duration, latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.95)] * 1000, errors[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--matrix', default='1x1,2x4,4x8', help='comma-separated WORKERSxTHREADS')
+    parser.add_argument('--profiles', default='stock,tuned')
+    parser.add_argument('--concurrency', type=int, default=32, help='client threads')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per run')
+    parser.add_argument('--orders', type=int, default=20000, help='order history to seed')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    with app.app_context():
+        seed(args.orders, 2000, 50)
+        seed_initial_data(app)
+        db.session.remove()
+
+    print(f"{'workers x threads':>18}{'pool':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for combination in args.matrix.split(','):
+        workers, threads = (int(part) for part in combination.lower().split('x'))
+        for profile in args.profiles.split(','):
+            server = start_server(args.port, workers, threads, profile)
+            try:
+                token = login(args.port)
+                run_load(args.port, token, args.concurrency, min(2, args.duration)) # Warm-up
+                rate, p50, p95, errors = run_load(args.port, token, args.concurrency, args.duration)
+            finally:
+                server.terminate()
+                server.wait()
+            print(f'{combination:>18}{profile:>8}{rate:10.0f}{p50:10.1f}{p95:10.1f}{errors:8}')
+
+
+if __name__ == '__main__':
+    main()
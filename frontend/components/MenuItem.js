@@ -1,8 +1,11 @@
+import ResponsiveImage from './ResponsiveImage.js';
+
 const MenuItem = {
     props: ['item'],
+    components: { ResponsiveImage },
     template: `
         <div class="card menu-card h-100">
-            <img :src="item.image" class="card-img-top" :alt="item.name">
+            <responsive-image :src="item.image" :srcset="item.imageSrcset" :webp-srcset="item.imageWebpSrcset" :alt="item.name"></responsive-image>
             <div class="card-body d-flex flex-column">
                 <h5 class="card-title">{{ item.name }}</h5>
                 
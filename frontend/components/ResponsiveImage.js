@@ -0,0 +1,23 @@
+// <picture> for an image from the upload pipeline: the browser picks the
+// smallest WebP (or JPEG) size that fits `sizes`. Images without a srcset
+// (placeholders, external URLs) render as a plain <img>.
+const ResponsiveImage = {
+    props: {
+        src: String,
+        srcset: String,
+        webpSrcset: String,
+        alt: String,
+        sizes: { type: String, default: '(max-width: 767px) 100vw, (max-width: 991px) 50vw, 33vw' },
+        imgClass: { type: String, default: 'card-img-top' },
+        imgStyle: String
+    },
+    template: `
+        <picture>
+            <source v-if="webpSrcset" type="image/webp" :srcset="webpSrcset" :sizes="sizes">
+            <img :src="src" :srcset="srcset || null" :sizes="srcset ? sizes : null"
+                 :class="imgClass" :style="imgStyle" :alt="alt" loading="lazy" decoding="async">
+        </picture>
+    `
+};
+
+export default ResponsiveImage;
@@ -1,8 +1,12 @@
+import ResponsiveImage from './ResponsiveImage.js';
+
 const RestaurantCard = {
     props: ['restaurant'],
+    components: { ResponsiveImage },
     template: `
         <div class="card restaurant-card h-100 shadow-sm border-0">
-            <img :src="restaurant.image" class="card-img-top" :alt="restaurant.name" style="height: 220px; object-fit: cover;">
+            <responsive-image :src="restaurant.image" :srcset="restaurant.imageSrcset" :webp-srcset="restaurant.imageWebpSrcset"
+                              :alt="restaurant.name" img-style="height: 220px; object-fit: cover;"></responsive-image>
             <div class="card-body">
                 <h5 class="card-title font-weight-bold">{{ restaurant.name }}</h5>
                 <p class="card-text text-muted mb-3">{{ restaurant.cuisine }}</p>
@@ -1,12 +1,18 @@
+import { runJob, downloadJobFile, jobProgressLabel } from '../../utils/jobs.js';
+
 const AdminOrderManagementPage = {
     template: `
         <div class="admin-container">
             <div class="d-flex justify-content-between align-items-center mb-4">
                 <h2 class="admin-page-title">Global Order Management</h2>
-                <button class="btn btn-outline-secondary" @click="exportData" :disabled="isExporting">
-                    <span v-if="isExporting" class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span>
-                    {{ isExporting ? 'Exporting...' : 'Export to Excel' }}
-                </button>
+                <div class="d-flex align-items-center">
+                    <input type="date" v-model="exportFrom" class="form-control form-control-sm mr-2" title="Export from">
+                    <input type="date" v-model="exportTo" class="form-control form-control-sm mr-2" title="Export to">
+                    <button class="btn btn-outline-secondary text-nowrap" @click="exportData" :disabled="isExporting">
+                        <span v-if="isExporting" class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span>
+                        {{ isExporting ? 'Exporting... ' + exportProgress : 'Export to Excel' }}
+                    </button>
+                </div>
             </div>
 
             <div v-if="loading" class="alert alert-info">Loading all orders...</div>
@@ -16,10 +22,10 @@ const AdminOrderManagementPage = {
                 <div class="card-header bg-white">
                     <div class="row align-items-center">
                         <div class="col-md-4">
-                            <input type="text" v-model="searchQuery" @input="fetchOrders" class="form-control" placeholder="Search by Order ID, Customer, or Restaurant...">
+                            <input type="text" v-model="searchQuery" @input="fetchOrders()" class="form-control" placeholder="Search by Order ID, Customer, or Restaurant...">
                         </div>
                         <div class="col-md-3">
-                            <select class="form-control" v-model="filterStatus" @change="fetchOrders">
+                            <select class="form-control" v-model="filterStatus" @change="fetchOrders()">
                                 <option value="All">All Statuses</option>
                                 <option value="Placed">Placed</option>
                                 <option value="Preparing">Preparing</option>
@@ -72,6 +78,12 @@ const AdminOrderManagementPage = {
                             </tbody>
                         </table>
                     </div>
+                    <div v-if="orders.length > 0" class="d-flex justify-content-between align-items-center">
+                        <small class="text-muted">Showing {{ orders.length }}<span v-if="total !== null"> of {{ total }}</span> orders</small>
+                        <button v-if="nextCursor" class="btn btn-sm btn-outline-secondary" @click="fetchOrders(true)" :disabled="loadingMore">
+                            {{ loadingMore ? 'Loading...' : 'Load more' }}
+                        </button>
+                    </div>
                 </div>
             </div>
         </div>
@@ -83,16 +95,25 @@ const AdminOrderManagementPage = {
             searchQuery: '',
             filterStatus: 'All',
             orders: [],
+            nextCursor: null,
+            total: null,
+            loadingMore: false,
             isExporting: false,
+            exportProgress: '',
+            exportFrom: '',
+            exportTo: '',
         };
     },
     mounted() {
         this.fetchOrders();
     },
     methods: {
-        async fetchOrders() {
+        // Pass append=true to fetch the next page after the current cursor
+        async fetchOrders(append = false) {
             this.error = null;
-            if (this.orders.length === 0) {
+            if (append) {
+                this.loadingMore = true;
+            } else if (this.orders.length === 0) {
                 this.loading = true;
             }
             try {
@@ -104,17 +125,25 @@ const AdminOrderManagementPage = {
                 if (this.filterStatus) {
                     url.searchParams.append('status', this.filterStatus);
                 }
+                if (append) {
+                    url.searchParams.append('cursor', this.nextCursor);
+                } else {
+                    url.searchParams.append('count', 'true');
+                }
 
                 const response = await fetch(url, {
                     headers: { 'Authentication-Token': token }
                 });
                 const data = await response.json();
                 if (!response.ok) throw new Error(data.message || "Failed to fetch orders.");
-                this.orders = data;
+                this.orders = append ? this.orders.concat(data.items) : data.items;
+                this.nextCursor = data.nextCursor;
+                if (!append) this.total = data.total;
             } catch (err) {
                 this.error = err.message;
             } finally {
                 this.loading = false;
+                this.loadingMore = false;
             }
         },
         viewDetails(orderId) {
@@ -139,28 +168,18 @@ const AdminOrderManagementPage = {
         },
         async exportData() {
             this.isExporting = true;
+            this.exportProgress = '';
             try {
-                const token = this.$store.state.token;
-                const response = await fetch('/api/admin/orders/export', {
-                    headers: { 'Authentication-Token': token }
+                // The export honours the status filter and the optional date range
+                const exportUrl = new URL('/api/admin/orders/export/jobs', window.location.origin);
+                if (this.filterStatus) exportUrl.searchParams.append('status', this.filterStatus);
+                if (this.exportFrom) exportUrl.searchParams.append('from', this.exportFrom);
+                if (this.exportTo) exportUrl.searchParams.append('to', this.exportTo);
+                // Runs as a background job; the file is downloaded once it is ready
+                const job = await runJob(exportUrl, {
+                    onProgress: (running) => { this.exportProgress = jobProgressLabel(running); }
                 });
-
-                if (!response.ok) {
-                    const errorData = await response.json();
-                    throw new Error(errorData.message || 'Failed to download file.');
-                }
-
-                const blob = await response.blob();
-                const url = window.URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.style.display = 'none';
-                a.href = url;
-                a.download = 'orders_export.xlsx';
-                document.body.appendChild(a);
-                a.click();
-                window.URL.revokeObjectURL(url);
-                document.body.removeChild(a);
-
+                await downloadJobFile(job, 'orders_export.xlsx');
             } catch (err) {
                 alert('Error exporting data: ' + err.message);
             } finally {
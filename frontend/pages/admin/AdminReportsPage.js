@@ -1,7 +1,14 @@
 const AdminReportsPage = {
     template: `
         <div class="admin-container">
-            <h2 class="admin-page-title">Reports & Analytics</h2>
+            <div class="d-flex justify-content-between align-items-center mb-4">
+                <h2 class="admin-page-title">Reports & Analytics</h2>
+                <div class="d-flex align-items-center">
+                    <input type="date" v-model="rangeFrom" class="form-control form-control-sm mr-2" title="From">
+                    <input type="date" v-model="rangeTo" class="form-control form-control-sm mr-2" title="To">
+                    <button class="btn btn-outline-secondary btn-sm text-nowrap" @click="fetchReports" :disabled="loading">Apply</button>
+                </div>
+            </div>
 
             <!-- Loading and Error States -->
             <div v-if="loading" class="alert alert-info">Loading report data...</div>
@@ -14,7 +21,7 @@ const AdminReportsPage = {
                 <div class="col-lg-8 mb-4">
                     <div class="card h-100">
                         <div class="card-body">
-                            <h4 class="card-title">Daily Revenue Trends (Last 7 Days)</h4>
+                            <h4 class="card-title">Daily Revenue Trends ({{ rangeLabel }})</h4>
                             <!-- The chart container is only displayed if there is data -->
                             <div v-if="revenueData.length > 0 && maxRevenue > 0" class="chart-container">
                                 <div v-for="data in revenueData" :key="data.day" class="chart-bar-wrapper">
@@ -56,10 +63,19 @@ const AdminReportsPage = {
             loading: true,
             error: null,
             rawRevenueData: [],
-            topRestaurants: []
+            topRestaurants: [],
+            // Empty means the server default (the last 7 days)
+            rangeFrom: '',
+            rangeTo: '',
+            // The range the displayed data covers, as returned by the server
+            shownRange: null
         };
     },
     computed: {
+        rangeLabel() {
+            if (!this.shownRange || this.shownRange.isDefault) return 'Last 7 Days';
+            return this.shownRange.from + ' to ' + this.shownRange.to;
+        },
         // This computed property calculates the maximum revenue from the fetched data.
         // It's used to determine the relative height of the chart bars.
         maxRevenue() {
@@ -94,7 +110,10 @@ const AdminReportsPage = {
             this.error = null;
             try {
                 const token = this.$store.state.token;
-                const response = await fetch('/api/admin/reports', {
+                const url = new URL('/api/admin/reports', window.location.origin);
+                if (this.rangeFrom) url.searchParams.append('from', this.rangeFrom);
+                if (this.rangeTo) url.searchParams.append('to', this.rangeTo);
+                const response = await fetch(url, {
                     headers: { 'Authentication-Token': token }
                 });
                 
@@ -107,6 +126,7 @@ const AdminReportsPage = {
                 const data = await response.json();
                 this.rawRevenueData = data.dailyRevenue;
                 this.topRestaurants = data.topRestaurants;
+                this.shownRange = { from: data.from, to: data.to, isDefault: !this.rangeFrom && !this.rangeTo };
 
             } catch (err) {
                 this.error = err.message;
@@ -1,3 +1,5 @@
+import { runJob, downloadJobFile, jobProgressLabel } from '../../utils/jobs.js';
+
 const AdminRestaurantManagementPage = {
      template: `
         <div class="admin-container">
@@ -6,7 +8,7 @@ const AdminRestaurantManagementPage = {
                 <div>
                     <button class="btn btn-outline-secondary mr-2" @click="exportData" :disabled="isExporting">
                         <span v-if="isExporting" class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span>
-                        {{ isExporting ? 'Exporting...' : 'Export to Excel' }}
+                        {{ isExporting ? 'Exporting... ' + exportProgress : 'Export to Excel' }}
                     </button>
                     <button class="btn btn-brand" @click="openAddModal">Add Restaurant</button>
                 </div>
@@ -20,10 +22,10 @@ const AdminRestaurantManagementPage = {
                 <div class="card-header bg-white">
                     <div class="row align-items-center">
                         <div class="col-md-4">
-                            <input type="text" v-model="searchQuery" @input="fetchRestaurants" class="form-control" placeholder="Search by name, owner, or city...">
+                            <input type="text" v-model="searchQuery" @input="fetchRestaurants()" class="form-control" placeholder="Search by name, owner, or city...">
                         </div>
                         <div class="col-md-3">
-                            <select class="form-control" v-model="filterStatus" @change="fetchRestaurants">
+                            <select class="form-control" v-model="filterStatus" @change="fetchRestaurants()">
                                 <option value="All">All Statuses</option>
                                 <option value="Verified">Verified</option>
                                 <option value="Pending">Pending</option>
@@ -77,6 +79,12 @@ const AdminRestaurantManagementPage = {
                             </tbody>
                         </table>
                     </div>
+                    <div v-if="restaurants.length > 0" class="d-flex justify-content-between align-items-center">
+                        <small class="text-muted">Showing {{ restaurants.length }}<span v-if="total !== null"> of {{ total }}</span> restaurants</small>
+                        <button v-if="nextCursor" class="btn btn-sm btn-outline-secondary" @click="fetchRestaurants(true)" :disabled="loadingMore">
+                            {{ loadingMore ? 'Loading...' : 'Load more' }}
+                        </button>
+                    </div>
                 </div>
             </div>
 
@@ -156,6 +164,9 @@ const AdminRestaurantManagementPage = {
                searchQuery: '',
                filterStatus: 'All',
                restaurants: [],
+               nextCursor: null,
+               total: null,
+               loadingMore: false,
                isEditMode: false,
                currentRestaurant: {
                     id: null,
@@ -169,6 +180,7 @@ const AdminRestaurantManagementPage = {
                     platformFee: 0.0
                },
                isExporting: false,
+               exportProgress: '',
                isGeocoding: false, // For the modal's geocoding button
                modalError: null, // For errors inside the modal
           };
@@ -178,9 +190,14 @@ const AdminRestaurantManagementPage = {
      },
      methods: {
           // --- ✅ MODIFIED: Improved error handling ---
-          async fetchRestaurants() {
+          // Pass append=true to fetch the next page after the current cursor
+          async fetchRestaurants(append = false) {
                this.error = null;
-               this.loading = true;
+               if (append) {
+                    this.loadingMore = true;
+               } else {
+                    this.loading = true;
+               }
                try {
                     const token = this.$store.state.token;
                     if (!token) {
@@ -190,6 +207,11 @@ const AdminRestaurantManagementPage = {
                     const url = new URL('/api/admin/restaurants', window.location.origin);
                     if (this.searchQuery) url.searchParams.append('search', this.searchQuery);
                     if (this.filterStatus) url.searchParams.append('status', this.filterStatus);
+                    if (append) {
+                         url.searchParams.append('cursor', this.nextCursor);
+                    } else {
+                         url.searchParams.append('count', 'true');
+                    }
 
                     const response = await fetch(url, { headers: { 'Authentication-Token': token } });
 
@@ -209,13 +231,16 @@ const AdminRestaurantManagementPage = {
 
                     // Now it's safe to parse the JSON
                     const data = await response.json();
-                    this.restaurants = data;
+                    this.restaurants = append ? this.restaurants.concat(data.items) : data.items;
+                    this.nextCursor = data.nextCursor;
+                    if (!append) this.total = data.total;
 
                } catch (err) {
                     // This will now show the *real* error, not "Unexpected token"
                     this.error = err.message;
                } finally {
                     this.loading = false;
+                    this.loadingMore = false;
                }
           },
           statusBadgeClass(status) {
@@ -314,24 +339,14 @@ const AdminRestaurantManagementPage = {
           // --- ✅ MODIFIED: Removed alert() ---
           async exportData() {
                this.isExporting = true;
+               this.exportProgress = '';
                this.error = null; // Clear previous page errors
                try {
-                    const token = this.$store.state.token;
-                    const response = await fetch('/api/admin/restaurants/export', { headers: { 'Authentication-Token': token } });
-                    if (!response.ok) {
-                         const errorData = await response.json();
-                         throw new Error(errorData.message || 'Failed to download file.');
-                    }
-                    const blob = await response.blob();
-                    const url = window.URL.createObjectURL(blob);
-                    const a = document.createElement('a');
-                    a.style.display = 'none';
-                    a.href = url;
-                    a.download = 'restaurants_export.xlsx';
-                    document.body.appendChild(a);
-                    a.click();
-                    window.URL.revokeObjectURL(url); // Clean up the object URL
-                    document.body.removeChild(a);
+                    // Runs as a background job; the file is downloaded once it is ready
+                    const job = await runJob('/api/admin/restaurants/export/jobs', {
+                         onProgress: (running) => { this.exportProgress = jobProgressLabel(running); }
+                    });
+                    await downloadJobFile(job, 'restaurants_export.xlsx');
                } catch (err) {
                     this.error = 'Error exporting data: ' + err.message; // Show error on the page
                } finally {
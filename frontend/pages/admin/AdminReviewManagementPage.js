@@ -42,6 +42,12 @@ const AdminReviewManagementPage = {
                             </tbody>
                         </table>
                     </div>
+                    <div v-if="reviews.length > 0" class="d-flex justify-content-between align-items-center">
+                        <small class="text-muted">Showing {{ reviews.length }}<span v-if="total !== null"> of {{ total }}</span> reviews</small>
+                        <button v-if="nextCursor" class="btn btn-sm btn-outline-secondary" @click="fetchReviews(true)" :disabled="loadingMore">
+                            {{ loadingMore ? 'Loading...' : 'Load more' }}
+                        </button>
+                    </div>
                 </div>
             </div>
         </div>
@@ -50,28 +56,45 @@ const AdminReviewManagementPage = {
         return {
             loading: true,
             error: null,
-            reviews: []
+            reviews: [],
+            nextCursor: null,
+            total: null,
+            loadingMore: false
         };
     },
     mounted() {
         this.fetchReviews();
     },
     methods: {
-        async fetchReviews() {
-            this.loading = true;
+        // Pass append=true to fetch the next page after the current cursor
+        async fetchReviews(append = false) {
+            if (append) {
+                this.loadingMore = true;
+            } else {
+                this.loading = true;
+            }
             this.error = null;
             try {
                 const token = this.$store.state.token;
-                const response = await fetch('/api/admin/reviews', {
+                const url = new URL('/api/admin/reviews', window.location.origin);
+                if (append) {
+                    url.searchParams.append('cursor', this.nextCursor);
+                } else {
+                    url.searchParams.append('count', 'true');
+                }
+                const response = await fetch(url, {
                     headers: { 'Authentication-Token': token }
                 });
                 const data = await response.json();
                 if (!response.ok) throw new Error(data.message || "Failed to fetch reviews.");
-                this.reviews = data;
+                this.reviews = append ? this.reviews.concat(data.items) : data.items;
+                this.nextCursor = data.nextCursor;
+                if (!append) this.total = data.total;
             } catch (err) {
                 this.error = err.message;
             } finally {
                 this.loading = false;
+                this.loadingMore = false;
             }
         },
         async deleteReview(reviewId) {
@@ -1,3 +1,5 @@
+import { runJob, downloadJobFile, jobProgressLabel } from '../../utils/jobs.js';
+
 const AdminUserManagementPage = {
     template: `
         <div class="admin-container">
@@ -5,7 +7,7 @@ const AdminUserManagementPage = {
                 <h2 class="admin-page-title">User Management</h2>
                 <button class="btn btn-outline-secondary" @click="exportData" :disabled="isExporting">
                     <span v-if="isExporting" class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span>
-                    {{ isExporting ? 'Exporting...' : 'Export to Excel' }}
+                    {{ isExporting ? 'Exporting... ' + exportProgress : 'Export to Excel' }}
                 </button>
             </div>
 
@@ -16,7 +18,7 @@ const AdminUserManagementPage = {
                 <div class="card-header bg-white">
                     <div class="row align-items-center">
                         <div class="col-md-4">
-                            <input type="text" v-model="searchQuery" @input="fetchUsers" class="form-control" placeholder="Search by name or email...">
+                            <input type="text" v-model="searchQuery" @input="fetchUsers()" class="form-control" placeholder="Search by name or email...">
                         </div>
                     </div>
                 </div>
@@ -57,6 +59,12 @@ const AdminUserManagementPage = {
                             </tbody>
                         </table>
                     </div>
+                    <div v-if="users.length > 0" class="d-flex justify-content-between align-items-center">
+                        <small class="text-muted">Showing {{ users.length }}<span v-if="total !== null"> of {{ total }}</span> users</small>
+                        <button v-if="nextCursor" class="btn btn-sm btn-outline-secondary" @click="fetchUsers(true)" :disabled="loadingMore">
+                            {{ loadingMore ? 'Loading...' : 'Load more' }}
+                        </button>
+                    </div>
                 </div>
             </div>
         </div>
@@ -67,17 +75,24 @@ const AdminUserManagementPage = {
             error: null,
             searchQuery: '',
             users: [],
+            nextCursor: null,
+            total: null,
+            loadingMore: false,
             isExporting: false,
+            exportProgress: '',
         };
     },
     mounted() {
         this.fetchUsers();
     },
     methods: {
-        async fetchUsers() {
+        // Pass append=true to fetch the next page after the current cursor
+        async fetchUsers(append = false) {
             this.error = null;
             // Set loading to true only for the initial load
-            if (this.users.length === 0) {
+            if (append) {
+                this.loadingMore = true;
+            } else if (this.users.length === 0) {
                 this.loading = true;
             }
             try {
@@ -86,16 +101,24 @@ const AdminUserManagementPage = {
                 if (this.searchQuery) {
                     url.searchParams.append('search', this.searchQuery);
                 }
+                if (append) {
+                    url.searchParams.append('cursor', this.nextCursor);
+                } else {
+                    url.searchParams.append('count', 'true');
+                }
                 const response = await fetch(url, {
                     headers: { 'Authentication-Token': token }
                 });
                 const data = await response.json();
                 if (!response.ok) throw new Error(data.message || "Failed to fetch users.");
-                this.users = data;
+                this.users = append ? this.users.concat(data.items) : data.items;
+                this.nextCursor = data.nextCursor;
+                if (!append) this.total = data.total;
             } catch (err) {
                 this.error = err.message;
             } finally {
                 this.loading = false;
+                this.loadingMore = false;
             }
         },
         async handleUserAction(url, method, confirmMessage) {
@@ -122,28 +145,13 @@ const AdminUserManagementPage = {
         },
         async exportData() {
             this.isExporting = true;
+            this.exportProgress = '';
             try {
-                const token = this.$store.state.token;
-                const response = await fetch('/api/admin/users/export', {
-                    headers: { 'Authentication-Token': token }
+                // Runs as a background job; the file is downloaded once it is ready
+                const job = await runJob('/api/admin/users/export/jobs', {
+                    onProgress: (running) => { this.exportProgress = jobProgressLabel(running); }
                 });
-
-                if (!response.ok) {
-                    const errorData = await response.json();
-                    throw new Error(errorData.message || 'Failed to download file.');
-                }
-                
-                const blob = await response.blob();
-                const url = window.URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.style.display = 'none';
-                a.href = url;
-                a.download = 'users_export.xlsx';
-                document.body.appendChild(a);
-                a.click();
-                window.URL.revokeObjectURL(url);
-                document.body.removeChild(a);
-
+                await downloadJobFile(job, 'users_export.xlsx');
             } catch (err) {
                 alert('Error exporting data: ' + err.message);
             } finally {
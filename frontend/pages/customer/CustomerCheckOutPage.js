@@ -242,7 +242,8 @@ data() {
                 const data = await apiService.post('/api/coupons/apply', {
                     code: this.couponCode,
                     subtotal: this.subtotal,
-                    restaurant_id: this.cartRestaurantId
+                    restaurant_id: this.cartRestaurantId,
+                    items: this.cartItems.map(item => ({ menu_item_id: item.id, quantity: item.quantity }))
                 });
                 this.discountAmount = data.discount;
                 this.appliedCoupon = this.couponCode;
@@ -1,8 +1,10 @@
 import RestaurantCard from '../../components/RestaurantCard.js';
+import ResponsiveImage from '../../components/ResponsiveImage.js';
 
 const CustomerHomePage = {
     components: {
-        RestaurantCard
+        RestaurantCard,
+        ResponsiveImage
     },
     template: `
         <div>
@@ -78,7 +80,8 @@ const CustomerHomePage = {
                          <div v-for="item in menu" :key="item.id" class="col-lg-4 col-md-6 mb-4">
                             <div class="card menu-card h-100 shadow-sm border-0">
                                 <div class="menu-img-container">
-                                    <img :src="item.image" class="card-img-top" :alt="item.name" style="height: 220px; object-fit: cover;">
+                                    <responsive-image :src="item.image" :srcset="item.imageSrcset" :webp-srcset="item.imageWebpSrcset"
+                                                      :alt="item.name" img-style="height: 220px; object-fit: cover;"></responsive-image>
                                 </div>
                                 <div class="card-body d-flex flex-column">
                                     <h5 class="card-title font-weight-bold">{{ item.name }}</h5>
@@ -1,7 +1,14 @@
 const RestaurantAnalyticsPage = {
     template: `
         <div class="admin-container">
-            <h2 class="admin-page-title">Business Analytics</h2>
+            <div class="d-flex justify-content-between align-items-center mb-4">
+                <h2 class="admin-page-title">Business Analytics</h2>
+                <div class="d-flex align-items-center">
+                    <input type="date" v-model="rangeFrom" class="form-control form-control-sm mr-2" title="From">
+                    <input type="date" v-model="rangeTo" class="form-control form-control-sm mr-2" title="To">
+                    <button class="btn btn-outline-secondary btn-sm text-nowrap" @click="fetchAnalyticsData" :disabled="loading">Apply</button>
+                </div>
+            </div>
 
             <div v-if="loading" class="alert alert-info">Loading analytics data...</div>
             <div v-if="error" class="alert alert-danger">{{ error }}</div>
@@ -38,7 +45,7 @@ const RestaurantAnalyticsPage = {
                     <div class="col-lg-8 mb-4">
                         <div class="card h-100">
                             <div class="card-body">
-                                <h4 class="card-title">Daily Sales (Last 7 Days)</h4>
+                                <h4 class="card-title">Daily Sales ({{ rangeLabel }})</h4>
                                 <div v-if="dailySalesData.length > 0" class="chart-container">
                                     <div v-for="data in dailySalesData" :key="data.day" class="chart-bar-wrapper">
                                         <div class="chart-bar" :style="{ height: data.height + '%' }">
@@ -76,10 +83,19 @@ const RestaurantAnalyticsPage = {
             error: null,
             stats: { totalRevenue: 0, totalOrders: 0, avgOrderValue: 0 },
             rawDailySales: [],
-            popularItems: []
+            popularItems: [],
+            // Empty means the server default (the last 7 days)
+            rangeFrom: '',
+            rangeTo: '',
+            // The range the displayed data covers, as returned by the server
+            shownRange: null
         };
     },
     computed: {
+        rangeLabel() {
+            if (!this.shownRange || this.shownRange.isDefault) return 'Last 7 Days';
+            return this.shownRange.from + ' to ' + this.shownRange.to;
+        },
         dailySalesData() {
             if (!this.rawDailySales || this.rawDailySales.length === 0) return [];
             const maxSales = Math.max(...this.rawDailySales.map(d => d.sales));
@@ -100,7 +116,10 @@ const RestaurantAnalyticsPage = {
             this.error = null;
             try {
                 const token = this.$store.state.token;
-                const response = await fetch('/api/restaurant/analytics', {
+                const url = new URL('/api/restaurant/analytics', window.location.origin);
+                if (this.rangeFrom) url.searchParams.append('from', this.rangeFrom);
+                if (this.rangeTo) url.searchParams.append('to', this.rangeTo);
+                const response = await fetch(url, {
                     headers: { 'Authentication-Token': token }
                 });
                 const data = await response.json();
@@ -109,6 +128,7 @@ const RestaurantAnalyticsPage = {
                 this.stats = data.stats;
                 this.rawDailySales = data.dailySales;
                 this.popularItems = data.popularItems;
+                this.shownRange = { from: data.from, to: data.to, isDefault: !this.rangeFrom && !this.rangeTo };
 
             } catch (err) {
                 this.error = err.message;
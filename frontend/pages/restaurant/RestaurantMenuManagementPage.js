@@ -1,3 +1,5 @@
+import { runJob, jobProgressLabel } from '../../utils/jobs.js';
+
 const RestaurantMenuManagementPage = {
     template: `
         <div class="admin-container">
@@ -16,20 +18,26 @@ const RestaurantMenuManagementPage = {
                 <div class="card mb-4">
                     <div class="card-body">
                         <h4 class="card-title">Bulk Upload Menu</h4>
-                        <p class="text-muted">Save time by uploading all your categories and menu items at once using our Excel template.</p>
+                        <p class="text-muted">Save time by uploading all your categories and menu items at once using our Excel template (a CSV with the same columns works too). Items already on your menu are updated, matched by category and name.</p>
                         <div v-if="uploadError" class="alert alert-danger">{{ uploadError }}</div>
                         <div v-if="uploadSuccess" class="alert alert-success">{{ uploadSuccess }}</div>
+                        <div v-if="uploadRowErrors.length" class="alert alert-warning">
+                            <strong>Rows that were skipped:</strong>
+                            <ul class="mb-0 mt-1">
+                                <li v-for="rowError in uploadRowErrors" :key="rowError.row">Row {{ rowError.row }}: {{ rowError.message }}</li>
+                            </ul>
+                        </div>
                         <div class="d-flex align-items-center">
                             <button class="btn btn-outline-secondary mr-3" @click="downloadTemplate">
                                 <i class="fas fa-download mr-2"></i>Download Template
                             </button>
                             <div class="custom-file">
-                                <input type="file" class="custom-file-input" id="menuFile" @change="handleFileSelect" accept=".xlsx">
-                                <label class="custom-file-label" for="menuFile">{{ selectedFile ? selectedFile.name : 'Choose Excel file...' }}</label>
+                                <input type="file" class="custom-file-input" id="menuFile" @change="handleFileSelect" accept=".xlsx,.csv">
+                                <label class="custom-file-label" for="menuFile">{{ selectedFile ? selectedFile.name : 'Choose Excel or CSV file...' }}</label>
                             </div>
                             <button class="btn btn-brand ml-3" @click="handleFileUpload" :disabled="!selectedFile || isUploading">
                                 <span v-if="isUploading" class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span>
-                                {{ isUploading ? 'Uploading...' : 'Upload' }}
+                                {{ isUploading ? 'Importing... ' + uploadProgress : 'Upload' }}
                             </button>
                         </div>
                     </div>
@@ -129,7 +137,7 @@ const RestaurantMenuManagementPage = {
     data() {
         return { 
             loading: true, error: null, categories: [], isEditMode: false, currentItem: {},
-            isUploading: false, uploadError: null, uploadSuccess: null, selectedFile: null,
+            isUploading: false, uploadProgress: '', uploadRowErrors: [], uploadError: null, uploadSuccess: null, selectedFile: null,
             isSaving: false, imageFile: null, imagePreview: null,
             isGeneratingDesc: false,
         };
@@ -264,7 +272,7 @@ const RestaurantMenuManagementPage = {
             XLSX.writeFile(workbook, "menu_template.xlsx");
         },
         handleFileSelect(event) {
-            this.uploadSuccess = null; this.uploadError = null;
+            this.uploadSuccess = null; this.uploadError = null; this.uploadRowErrors = [];
             this.selectedFile = event.target.files[0];
         },
         async handleFileUpload() {
@@ -272,19 +280,17 @@ const RestaurantMenuManagementPage = {
                 this.uploadError = "Please select a file first.";
                 return;
             }
-            this.isUploading = true; this.uploadError = null; this.uploadSuccess = null;
+            this.isUploading = true; this.uploadProgress = ''; this.uploadRowErrors = []; this.uploadError = null; this.uploadSuccess = null;
             const formData = new FormData();
             formData.append('menu_file', this.selectedFile);
             try {
-                const token = this.$store.state.token;
-                const response = await fetch('/api/restaurant/menu/bulk-upload', {
-                    method: 'POST',
-                    headers: { 'Authentication-Token': token },
-                    body: formData
+                // The import runs as a background job; poll it until it finishes
+                const job = await runJob('/api/restaurant/menu/bulk-upload/jobs', {
+                    body: formData,
+                    onProgress: (running) => { this.uploadProgress = jobProgressLabel(running); }
                 });
-                const data = await response.json();
-                if (!response.ok) throw new Error(data.message);
-                this.uploadSuccess = data.message;
+                this.uploadSuccess = job.message;
+                this.uploadRowErrors = (job.result && job.result.errors) || [];
                 this.selectedFile = null; document.getElementById('menuFile').value = null;
                 await this.fetchMenu();
             } catch (err) {
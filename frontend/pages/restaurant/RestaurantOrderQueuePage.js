@@ -2,7 +2,10 @@ const RestaurantOrderQueuePage = {
     template: `
         <div class="admin-container">
             <h2 class="admin-page-title">Live Order Queue</h2>
-            <p class="text-muted">This page automatically refreshes every 30 seconds with new and updated orders.</p>
+            <p class="text-muted">
+                <span v-if="isLive"><i class="fas fa-circle text-success mr-1"></i>Live: new and updated orders appear instantly.</span>
+                <span v-else>This page automatically refreshes every 30 seconds with new and updated orders.</span>
+            </p>
 
             <div v-if="loading" class="text-center p-5">
                 <div class="spinner-border text-brand" role="status">
@@ -124,6 +127,9 @@ const RestaurantOrderQueuePage = {
             error: null,
             orders: [],
             intervalId: null,
+            eventSource: null,
+            isLive: false,
+            streamFailures: 0,
             otpInputs: {}, 
         };
     },
@@ -133,13 +139,73 @@ const RestaurantOrderQueuePage = {
         readyForPickupOrders() { return this.orders.filter(o => o.status === 'ready'); }
     },
     mounted() {
-        this.fetchOrders();
-        this.intervalId = setInterval(this.fetchOrders, 30000); // Auto-refresh every 30 seconds
+        this.connectStream();
     },
     beforeDestroy() {
-        clearInterval(this.intervalId); // Clear interval when leaving the page
+        this.closeStream();
+        this.stopPolling(); // Clear interval when leaving the page
     },
     methods: {
+        // Live updates over Server-Sent Events; falls back to polling if the stream is unavailable
+        connectStream() {
+            if (!window.EventSource) {
+                this.startPolling();
+                return;
+            }
+            // EventSource cannot send headers, so the token goes in the query string
+            const token = encodeURIComponent(this.$store.state.token);
+            this.eventSource = new EventSource(`/api/restaurant/orders/stream?auth_token=${token}`);
+            this.eventSource.addEventListener('ready', () => {
+                // (Re)connected: resync once, then rely on events
+                this.isLive = true;
+                this.streamFailures = 0;
+                this.stopPolling();
+                this.fetchOrders();
+            });
+            this.eventSource.addEventListener('order.created', this.applyOrderEvent);
+            this.eventSource.addEventListener('order.updated', this.applyOrderEvent);
+            this.eventSource.onerror = () => {
+                this.isLive = false;
+                this.streamFailures += 1;
+                // The browser reconnects by itself; give up if the server refused us or it keeps failing
+                if (this.eventSource.readyState === EventSource.CLOSED || this.streamFailures >= 3) {
+                    this.closeStream();
+                    this.startPolling();
+                }
+            };
+        },
+        closeStream() {
+            if (this.eventSource) {
+                this.eventSource.close();
+                this.eventSource = null;
+            }
+            this.isLive = false;
+        },
+        startPolling() {
+            if (this.intervalId) return;
+            this.fetchOrders();
+            this.intervalId = setInterval(this.fetchOrders, 30000); // Auto-refresh every 30 seconds
+        },
+        stopPolling() {
+            clearInterval(this.intervalId);
+            this.intervalId = null;
+        },
+        applyOrderEvent(event) {
+            const { order, active } = JSON.parse(event.data);
+            const index = this.orders.findIndex(o => o.id === order.id);
+            if (!active) {
+                if (index !== -1) this.orders.splice(index, 1);
+                return;
+            }
+            if (index === -1) {
+                this.orders.push(order);
+            } else {
+                this.$set(this.orders, index, order);
+            }
+            if (!this.otpInputs.hasOwnProperty(order.id)) {
+                this.$set(this.otpInputs, order.id, '');
+            }
+        },
         async fetchOrders() {
             this.error = null;
             try {
@@ -156,7 +222,7 @@ const RestaurantOrderQueuePage = {
                 });
             } catch (err) {
                 this.error = err.message;
-                clearInterval(this.intervalId); // Stop polling on error
+                this.stopPolling(); // Stop polling on error
             } finally {
                 this.loading = false;
             }
@@ -173,7 +239,7 @@ const RestaurantOrderQueuePage = {
                 });
                 const data = await response.json();
                 if (!response.ok) throw new Error(data.message);
-                this.fetchOrders(); // Refresh list after status update
+                if (!this.isLive) this.fetchOrders(); // Refresh list after status update (the stream pushes it otherwise)
             } catch (err) {
                 alert('Error: ' + err.message);
             }
@@ -195,7 +261,7 @@ const RestaurantOrderQueuePage = {
                 if (!response.ok) throw new Error(data.message);
                 alert(data.message);
                 this.otpInputs[orderId] = '';
-                this.fetchOrders(); // Refresh list after verification
+                if (!this.isLive) this.fetchOrders(); // Refresh list after verification
             } catch (err) {
                 alert('Verification Failed: ' + err.message);
             }
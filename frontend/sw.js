@@ -1,4 +1,4 @@
-const CACHE_NAME = 'crav-v2';
+const CACHE_NAME = 'crav-v4';
 const ASSETS_TO_CACHE = [
     '/',
     '/index.html',
@@ -11,6 +11,7 @@ const ASSETS_TO_CACHE = [
     '/utils/store.js',
     '/utils/apiService.js',
     '/utils/router.js',
+    '/utils/jobs.js',
 
     // Components
     '/components/Navbar.js',
@@ -18,6 +19,7 @@ const ASSETS_TO_CACHE = [
     '/components/MenuItem.js',
     '/components/CartItem.js',
     '/components/ReviewForm.js',
+    '/components/ResponsiveImage.js',
 
     // Pages - Customer
     '/pages/customer/CustomerHomePage.js',
@@ -0,0 +1,70 @@
+/*
+* Helpers for background jobs (exports, bulk menu uploads).
+* A job is submitted with a POST that answers 202 and the job's status;
+* we then poll /api/jobs/<id> until it succeeds or fails, reporting
+* progress along the way, and download the file it produced if any.
+*/
+import store from './store.js';
+
+const POLL_INTERVAL_MS = 1000;
+
+function authHeaders() {
+    const token = store.state.token;
+    return token ? { 'Authentication-Token': token } : {};
+}
+
+async function readJson(response) {
+    let data = {};
+    try {
+        data = await response.json();
+    } catch (e) {
+        console.error("Could not parse job response as JSON");
+    }
+    if (!response.ok) {
+        throw new Error(data.message || `HTTP error! Status: ${response.status}`);
+    }
+    return data;
+}
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+// Submits a job (body may be FormData) and resolves with the finished job.
+// onProgress(job) is called after every poll while the job is running.
+export async function runJob(url, { body = null, onProgress = null } = {}) {
+    let job = await readJson(await fetch(url, { method: 'POST', headers: authHeaders(), body }));
+    while (job.status === 'queued' || job.status === 'running') {
+        if (onProgress) onProgress(job);
+        await sleep(POLL_INTERVAL_MS);
+        job = await readJson(await fetch(`/api/jobs/${job.id}`, { headers: authHeaders() }));
+    }
+    if (job.status === 'failed') {
+        throw new Error(job.message || 'The job failed.');
+    }
+    return job;
+}
+
+// Saves the file a finished job produced, using the name the server gives it.
+export async function downloadJobFile(job, fallbackName = 'download') {
+    const response = await fetch(job.downloadUrl, { headers: authHeaders() });
+    if (!response.ok) {
+        await readJson(response);
+    }
+    const disposition = response.headers.get('Content-Disposition') || '';
+    const match = disposition.match(/filename="?([^";]+)"?/);
+    const blob = await response.blob();
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.style.display = 'none';
+    a.href = url;
+    a.download = match ? match[1] : fallbackName;
+    document.body.appendChild(a);
+    a.click();
+    window.URL.revokeObjectURL(url);
+    document.body.removeChild(a);
+}
+
+// "40%" style label for a running job, or '' while the total is unknown.
+export function jobProgressLabel(job) {
+    if (!job || !job.total) return '';
+    return `${Math.min(100, Math.round((job.progress / job.total) * 100))}%`;
+}
@@ -0,0 +1,44 @@
+"""Add job table for background exports and bulk uploads
+
+Revision ID: 2af8d64ace12
+Revises: c41b7d09e6a2
+Create Date: 2026-10-18 11:51:29.859115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2af8d64ace12'
+down_revision = 'c41b7d09e6a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('params', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progress', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('artifact_path', sa.String(length=512), nullable=True),
+    sa.Column('artifact_name', sa.String(length=255), nullable=True),
+    sa.Column('artifact_mimetype', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_created_at', 'job', ['created_at'], unique=False)
+    op.create_index('ix_job_user_id_created_at', 'job', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_job_user_id_created_at', table_name='job')
+    op.drop_index('ix_job_created_at', table_name='job')
+    op.drop_table('job')
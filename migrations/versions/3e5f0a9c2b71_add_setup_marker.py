@@ -0,0 +1,28 @@
+"""Add the setup_marker table
+
+Revision ID: 3e5f0a9c2b71
+Revises: 71f8990cdffd
+Create Date: 2026-10-18 12:40:12.418530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e5f0a9c2b71'
+down_revision = '71f8990cdffd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('setup_marker',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('setup_marker')
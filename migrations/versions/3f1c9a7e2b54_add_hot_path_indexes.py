@@ -0,0 +1,66 @@
+"""Add indexes for the hot order, review and menu access paths
+
+Revision ID: 3f1c9a7e2b54
+Revises: d8b510a7d338
+Create Date: 2026-10-18 09:12:41.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7e2b54'
+down_revision = 'd8b510a7d338'
+branch_labels = None
+depends_on = None
+
+ACTIVE_ORDER_PREDICATE = "status NOT IN ('completed', 'cancelled', 'rejected', 'refunded')"
+
+
+def upgrade():
+    op.create_index('ix_roles_users_user_id', 'roles_users', ['user_id'], unique=False)
+    op.create_index('ix_restaurant_owner_id', 'restaurant', ['owner_id'], unique=False)
+    op.create_index('ix_category_restaurant_id', 'category', ['restaurant_id'], unique=False)
+    op.create_index('ix_menu_item_restaurant_id_category_id', 'menu_item', ['restaurant_id', 'category_id'], unique=False)
+    op.create_index('ix_menu_item_category_id', 'menu_item', ['category_id'], unique=False)
+    op.create_index('ix_order_restaurant_id_status_created_at', 'order', ['restaurant_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_order_restaurant_id_created_at', 'order', ['restaurant_id', 'created_at'], unique=False)
+    op.create_index('ix_order_user_id_created_at', 'order', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_order_status_created_at', 'order', ['status', 'created_at'], unique=False)
+    op.create_index('ix_order_created_at', 'order', ['created_at'], unique=False)
+    op.create_index('ix_order_razorpay_order_id', 'order', ['razorpay_order_id'], unique=False)
+    op.create_index(
+        'ix_order_active_restaurant_id_created_at', 'order', ['restaurant_id', 'created_at'], unique=False,
+        postgresql_where=sa.text(ACTIVE_ORDER_PREDICATE),
+        sqlite_where=sa.text(ACTIVE_ORDER_PREDICATE)
+    )
+    op.create_index('ix_order_item_order_id', 'order_item', ['order_id'], unique=False)
+    op.create_index('ix_order_item_menu_item_id', 'order_item', ['menu_item_id'], unique=False)
+    op.create_index('ix_review_restaurant_id_created_at', 'review', ['restaurant_id', 'created_at'], unique=False)
+    op.create_index('ix_review_created_at', 'review', ['created_at'], unique=False)
+    op.create_index('ix_favorite_user_id_restaurant_id', 'favorite', ['user_id', 'restaurant_id'], unique=False)
+    op.create_index('ix_reward_point_user_id_created_at', 'reward_point', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_time_slot_restaurant_id', 'time_slot', ['restaurant_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_time_slot_restaurant_id', table_name='time_slot')
+    op.drop_index('ix_reward_point_user_id_created_at', table_name='reward_point')
+    op.drop_index('ix_favorite_user_id_restaurant_id', table_name='favorite')
+    op.drop_index('ix_review_created_at', table_name='review')
+    op.drop_index('ix_review_restaurant_id_created_at', table_name='review')
+    op.drop_index('ix_order_item_menu_item_id', table_name='order_item')
+    op.drop_index('ix_order_item_order_id', table_name='order_item')
+    op.drop_index('ix_order_active_restaurant_id_created_at', table_name='order')
+    op.drop_index('ix_order_razorpay_order_id', table_name='order')
+    op.drop_index('ix_order_created_at', table_name='order')
+    op.drop_index('ix_order_status_created_at', table_name='order')
+    op.drop_index('ix_order_user_id_created_at', table_name='order')
+    op.drop_index('ix_order_restaurant_id_created_at', table_name='order')
+    op.drop_index('ix_order_restaurant_id_status_created_at', table_name='order')
+    op.drop_index('ix_menu_item_category_id', table_name='menu_item')
+    op.drop_index('ix_menu_item_restaurant_id_category_id', table_name='menu_item')
+    op.drop_index('ix_category_restaurant_id', table_name='category')
+    op.drop_index('ix_restaurant_owner_id', table_name='restaurant')
+    op.drop_index('ix_roles_users_user_id', table_name='roles_users')
@@ -0,0 +1,39 @@
+"""Add menu_item_daily_count counters for the dashboard's popular items
+
+Revision ID: 544be59d7e40
+Revises: 9b944b62cc23
+Create Date: 2026-10-18 12:03:53.721144
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '544be59d7e40'
+down_revision = '9b944b62cc23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('menu_item_daily_count',
+    sa.Column('menu_item_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['menu_item_id'], ['menu_item.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+    sa.PrimaryKeyConstraint('menu_item_id', 'day')
+    )
+    with op.batch_alter_table('menu_item_daily_count', schema=None) as batch_op:
+        batch_op.create_index('ix_menu_item_daily_count_day', ['day'], unique=False)
+        batch_op.create_index('ix_menu_item_daily_count_restaurant_id_day', ['restaurant_id', 'day'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('menu_item_daily_count', schema=None) as batch_op:
+        batch_op.drop_index('ix_menu_item_daily_count_restaurant_id_day')
+        batch_op.drop_index('ix_menu_item_daily_count_day')
+
+    op.drop_table('menu_item_daily_count')
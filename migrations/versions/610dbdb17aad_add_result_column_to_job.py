@@ -0,0 +1,26 @@
+"""Add result column to job for structured outcomes such as import errors
+
+Revision ID: 610dbdb17aad
+Revises: 2af8d64ace12
+Create Date: 2026-10-18 11:54:38.286754
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '610dbdb17aad'
+down_revision = '2af8d64ace12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('result', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_column('result')
@@ -0,0 +1,46 @@
+"""Add the daily_restaurant_sales rollup
+
+Revision ID: 71f8990cdffd
+Revises: 544be59d7e40
+Create Date: 2026-10-18 12:11:39.197021
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '71f8990cdffd'
+down_revision = '544be59d7e40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_restaurant_sales',
+    sa.Column('restaurant_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('discount', sa.Float(), nullable=False),
+    sa.Column('fees', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+    sa.PrimaryKeyConstraint('restaurant_id', 'day')
+    )
+    with op.batch_alter_table('daily_restaurant_sales', schema=None) as batch_op:
+        batch_op.create_index('ix_daily_restaurant_sales_day', ['day'], unique=False)
+
+    # Backfill from existing completed orders
+    op.execute(
+        "INSERT INTO daily_restaurant_sales (restaurant_id, day, orders, revenue, discount, fees) "
+        "SELECT restaurant_id, DATE(created_at), COUNT(id), COALESCE(SUM(total_amount), 0), "
+        "COALESCE(SUM(discount_amount), 0), COALESCE(SUM(COALESCE(delivery_fee, 0) + COALESCE(platform_fee, 0)), 0) "
+        "FROM \"order\" WHERE status = 'completed' GROUP BY restaurant_id, DATE(created_at)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('daily_restaurant_sales', schema=None) as batch_op:
+        batch_op.drop_index('ix_daily_restaurant_sales_day')
+
+    op.drop_table('daily_restaurant_sales')
@@ -0,0 +1,28 @@
+"""Add order otp_expires_at for the OTP expiry sweep
+
+Revision ID: 9b944b62cc23
+Revises: 610dbdb17aad
+Create Date: 2026-10-18 11:59:54.269330
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b944b62cc23'
+down_revision = '610dbdb17aad'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('otp_expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_order_otp_expires_at', ['otp_expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_otp_expires_at')
+        batch_op.drop_column('otp_expires_at')
@@ -0,0 +1,35 @@
+"""Add denormalised rating aggregates to restaurant
+
+Revision ID: a6d2e4f81c03
+Revises: 3f1c9a7e2b54
+Create Date: 2026-10-18 10:02:17.540391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2e4f81c03'
+down_revision = '3f1c9a7e2b54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from existing reviews
+    op.execute(
+        "UPDATE restaurant SET "
+        "rating_sum = COALESCE((SELECT SUM(review.rating) FROM review WHERE review.restaurant_id = restaurant.id), 0), "
+        "rating_count = (SELECT COUNT(review.id) FROM review WHERE review.restaurant_id = restaurant.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('restaurant', schema=None) as batch_op:
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_sum')
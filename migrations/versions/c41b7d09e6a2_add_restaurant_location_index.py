@@ -0,0 +1,24 @@
+"""Add restaurant latitude/longitude index for nearby search
+
+Revision ID: c41b7d09e6a2
+Revises: a6d2e4f81c03
+Create Date: 2026-10-18 10:47:55.203114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41b7d09e6a2'
+down_revision = 'a6d2e4f81c03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_restaurant_latitude_longitude', 'restaurant', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_restaurant_latitude_longitude', table_name='restaurant')